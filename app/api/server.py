@@ -0,0 +1,229 @@
+"""
+Headless asynchronous HTTP API for the RAG engine, streaming tokens as Server-Sent Events
+
+Run with: python -m app.api.server
+"""
+
+import os
+import sys
+import json
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+
+# Add the project root to the Python path when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils.config import DATA_PATH, API_HOST, API_PORT, API_WORKERS, API_MAX_SESSIONS, ensure_directories
+from app.utils.logging_utils import setup_logging
+from app.core.chat_memory import ChatMemory
+from app.core.rag_engine import aget_answer, astream_answer
+from app.core.resources import get_shared_resources
+from app.core.indexing_jobs import SUCCEEDED, IndexingWorker
+from app.utils.metrics import PROMETHEUS_CONTENT_TYPE, render_prometheus
+
+class ApiState:
+    """
+    Everything the handlers share: the process-wide models and index, the
+    thread pools for blocking work, and per-session chat memory.
+    """
+
+    def __init__(self, resources, data_path=DATA_PATH, workers=API_WORKERS, max_sessions=API_MAX_SESSIONS):
+        self.resources = resources
+        self.data_path = data_path
+        self.max_sessions = max_sessions
+        # Default executor of the event loop: index loading and the blocking
+        # parts of retrieval that LangChain runs in threads
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-worker")
+        # Indexing jobs run on their own thread so a long build never starves answers
+        self.indexer = IndexingWorker(resources)
+        self._memories = OrderedDict()
+        self._memories_lock = threading.Lock()
+
+    def memory(self, session_id):
+        """Returns the chat memory of a session, evicting the least recently used beyond max_sessions."""
+        if session_id is None:
+            return None
+        with self._memories_lock:
+            memory = self._memories.get(session_id)
+            if memory is None:
+                memory = self._memories[session_id] = ChatMemory()
+                while len(self._memories) > self.max_sessions:
+                    self._memories.popitem(last=False)
+            else:
+                self._memories.move_to_end(session_id)
+            return memory
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.indexer.shutdown()
+
+STATE_KEY = web.AppKey("state", ApiState)
+
+def _error(status, message):
+    """Build a JSON error response."""
+    return web.json_response({"error": message}, status=status)
+
+async def _read_question(request):
+    """
+    Parses an answer request body.
+
+    Returns:
+        tuple: (query, chat history, chatgpt_enabled, session_id)
+
+    Raises:
+        ValueError: If the body is not a valid question
+    """
+    try:
+        payload = await request.json()
+    except json.JSONDecodeError:
+        raise ValueError("Request body must be JSON.")
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object.")
+    query = payload.get("query")
+    if not isinstance(query, str) or not query.strip():
+        raise ValueError("'query' must be a non-empty string.")
+    history = payload.get("history", [])
+    if not isinstance(history, list) or not all(isinstance(turn, list) and len(turn) == 2 for turn in history):
+        raise ValueError("'history' must be a list of [question, answer] pairs.")
+    session_id = payload.get("session_id")
+    if session_id is not None and not isinstance(session_id, str):
+        raise ValueError("'session_id' must be a string.")
+    return query, [tuple(turn) for turn in history], bool(payload.get("chatgpt_enabled", True)), session_id
+
+async def _ensure_index(state):
+    """Loads the index on first use without blocking the event loop."""
+    await asyncio.get_running_loop().run_in_executor(state.executor, state.resources.ensure_index_loaded)
+    return state.resources.vector_store is not None
+
+async def health(request):
+    """GET /health: registry statistics."""
+    state = request.app[STATE_KEY]
+    return web.json_response({"status": "ok", **state.resources.stats()})
+
+async def metrics(request):
+    """GET /metrics: latency histograms and counters in the Prometheus text format."""
+    return web.Response(body=render_prometheus().encode("utf-8"), headers={"Content-Type": PROMETHEUS_CONTENT_TYPE})
+
+async def index(request):
+    """
+    POST /index: queue an incremental re-index of the data directory, hot-swapped in once verified.
+    Responds 202 with the job (poll GET /index/jobs/{id}); with ?wait=true, responds when it has finished.
+    """
+    state = request.app[STATE_KEY]
+    job = state.indexer.submit(state.data_path)
+    if request.query.get("wait", "").lower() not in ("1", "true", "yes"):
+        return web.json_response(job.to_dict(), status=202, headers={"Location": f"/index/jobs/{job.id}"})
+
+    await asyncio.get_running_loop().run_in_executor(state.executor, job.wait)
+    if job.state != SUCCEEDED:
+        return _error(500, job.describe())
+    return web.json_response({"indexed": True, "job": job.to_dict(), **state.resources.stats()})
+
+async def index_job(request):
+    """GET /index/jobs/{job_id}: state and progress of an indexing job."""
+    job = request.app[STATE_KEY].indexer.get(request.match_info["job_id"])
+    if job is None:
+        return _error(404, "Unknown indexing job.")
+    return web.json_response(job.to_dict())
+
+async def answer(request):
+    """POST /answer: the complete answer as JSON."""
+    state = request.app[STATE_KEY]
+    try:
+        query, history, chatgpt_enabled, session_id = await _read_question(request)
+    except ValueError as e:
+        return _error(400, str(e))
+    if not await _ensure_index(state):
+        return _error(503, "Vector store not loaded. Please index documents first.")
+
+    resources = state.resources
+    with resources.lease() as vectorstore:
+        result, _ = await aget_answer(query, history, vectorstore, resources.llm, chatgpt_enabled, memory=state.memory(session_id))
+    return web.json_response({"answer": result})
+
+def _sse(event, data):
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+async def stream_answer(request):
+    """
+    POST /answer/stream: the answer as Server-Sent Events, one `token` event
+    per chunk followed by a `done` event. Generation stops when the client
+    disconnects.
+    """
+    state = request.app[STATE_KEY]
+    try:
+        query, history, chatgpt_enabled, session_id = await _read_question(request)
+    except ValueError as e:
+        return _error(400, str(e))
+    if not await _ensure_index(state):
+        return _error(503, "Vector store not loaded. Please index documents first.")
+
+    resources = state.resources
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    await response.prepare(request)
+    try:
+        with resources.lease() as vectorstore:
+            chunks = astream_answer(query, history, vectorstore, resources.llm, chatgpt_enabled, memory=state.memory(session_id))
+            # Leaving the block early closes the stream, which stops generation
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    await response.write(_sse("token", {"text": chunk}))
+        await response.write(_sse("done", {}))
+    except ConnectionResetError:
+        logging.info("Client disconnected; generation stopped.")
+        return response
+    await response.write_eof()
+    return response
+
+def create_app(resources=None, data_path=DATA_PATH, workers=API_WORKERS, max_sessions=API_MAX_SESSIONS):
+    """
+    Builds the API application. Every connection shares one set of models and
+    one index, and requests run as coroutines on a single event loop, so
+    waits on the LLM and embeddings APIs overlap.
+
+    Args:
+        resources (SharedResources): Models and index, the process-wide ones if None
+        data_path (str): Directory indexed by POST /index
+        workers (int): Threads for blocking work
+        max_sessions (int): Chat sessions whose memory is kept
+
+    Returns:
+        web.Application: The application
+    """
+    app = web.Application()
+    app[STATE_KEY] = ApiState(resources or get_shared_resources(), data_path, workers, max_sessions)
+
+    async def startup(app):
+        asyncio.get_running_loop().set_default_executor(app[STATE_KEY].executor)
+
+    async def shutdown(app):
+        app[STATE_KEY].shutdown()
+
+    app.on_startup.append(startup)
+    app.on_cleanup.append(shutdown)
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metrics)
+    app.router.add_post("/index", index)
+    app.router.add_get("/index/jobs/{job_id}", index_job)
+    app.router.add_post("/answer", answer)
+    app.router.add_post("/answer/stream", stream_answer)
+    return app
+
+def main():
+    """Serve the API until interrupted."""
+    setup_logging()
+    ensure_directories()
+    web.run_app(create_app(), host=API_HOST, port=API_PORT)
+
+if __name__ == "__main__":
+    main()
@@ -47,4 +47,18 @@ Context:
 
 Question: {question}
 Answer:"""
-RAG_ONLY_ANSWER_PROMPT = PromptTemplate.from_template(RAG_ONLY_ANSWER_PROMPT_TEMPLATE) 
\ No newline at end of file
+RAG_ONLY_ANSWER_PROMPT = PromptTemplate.from_template(RAG_ONLY_ANSWER_PROMPT_TEMPLATE) 
+
+# --- Chat Memory Summary Prompt ---
+# This prompt folds turns that leave the verbatim history window into a running summary
+SUMMARY_PROMPT_TEMPLATE = """Progressively summarize the conversation between a user and an insurance assistant, adding onto the previous summary and returning a new summary.
+Keep the facts the user shared (policy numbers, products, names, dates, amounts) and the questions already answered. Use at most {max_words} words.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{new_lines}
+
+New summary:"""
+SUMMARY_PROMPT = PromptTemplate.from_template(SUMMARY_PROMPT_TEMPLATE)
@@ -0,0 +1,232 @@
+"""
+Configurable FAISS index types (Flat, HNSW, IVF-Flat, IVF-PQ, scalar-quantized) for the vector store
+"""
+
+import re
+import logging
+import numpy as np
+import faiss
+from ..utils.config import FAISS_INDEX_FACTORY, FAISS_TRAIN_SAMPLE, FAISS_NPROBE, FAISS_EF_SEARCH, FAISS_RERANK_FACTOR
+
+FLAT_FACTORY = "Flat"
+
+def normalize_factory(factory):
+    """Strip whitespace from a FAISS index factory string; an empty string means Flat."""
+    factory = re.sub(r"\s+", "", factory or "")
+    return factory or FLAT_FACTORY
+
+def is_lossy(factory):
+    """Whether an index type stores compressed codes (SQfp16, SQ8, PQ) instead of the exact vectors."""
+    return bool(re.search(r"SQ|PQ", normalize_factory(factory)))
+
+def min_training_vectors(factory):
+    """
+    Returns the smallest number of vectors a factory string can be trained on.
+    IVF needs at least one vector per list and PQ one per centroid of each
+    sub-quantizer; indexes that need no training return 0.
+
+    Args:
+        factory (str): FAISS index factory string, e.g. "IVF1024,PQ16"
+
+    Returns:
+        int: Minimum number of training vectors
+    """
+    needed = 0
+    ivf = re.search(r"IVF(\d+)", factory)
+    if ivf:
+        needed = max(needed, int(ivf.group(1)))
+    pq = re.search(r"PQ\d+(?:x(\d+))?", factory)
+    if pq:
+        needed = max(needed, 2 ** int(pq.group(1) or 8))
+    return needed
+
+def effective_factory(factory, ntotal):
+    """
+    Returns the factory string that can actually be built for `ntotal` vectors:
+    the configured one, or Flat while the corpus is too small to train it.
+    """
+    factory = normalize_factory(factory)
+    if ntotal < min_training_vectors(factory):
+        return FLAT_FACTORY
+    return factory
+
+def set_search_params(index, nprobe=FAISS_NPROBE, ef_search=FAISS_EF_SEARCH):
+    """
+    Applies search-time parameters to an index.
+    Parameters the index type does not have (nprobe on HNSW, efSearch on IVF) are skipped.
+
+    Args:
+        index: The FAISS index
+        nprobe (int): Inverted lists visited per query by IVF indexes
+        ef_search (int): Candidate list size of HNSW searches
+    """
+    params = faiss.ParameterSpace()
+    for name, value in (("nprobe", nprobe), ("efSearch", ef_search)):
+        if value:
+            try:
+                params.set_index_parameter(index, name, value)
+            except RuntimeError:
+                pass
+
+class RerankIndex:
+    """
+    A compressed FAISS index searched in two passes: the compressed codes
+    select k * `rerank_factor` candidates, which are then rescored exactly
+    against full-precision vectors, usually memory-mapped from disk so only
+    the candidates' pages are read.
+
+    It answers search() like a FAISS index, so the LangChain FAISS store uses
+    it unchanged. It cannot be modified: add or remove vectors on a flat copy
+    (to_flat) and convert back.
+    """
+
+    def __init__(self, base, full_vectors, rerank_factor=FAISS_RERANK_FACTOR):
+        """
+        Args:
+            base: The compressed FAISS index
+            full_vectors (np.ndarray): float32 (ntotal, d) matrix in the index's order
+            rerank_factor (int): Candidates rescored per requested result
+        """
+        self.base = base
+        self.full = full_vectors
+        self.rerank_factor = max(rerank_factor, 1)
+
+    @property
+    def d(self):
+        return self.base.d
+
+    @property
+    def ntotal(self):
+        return self.base.ntotal
+
+    @property
+    def metric_type(self):
+        return self.base.metric_type
+
+    @property
+    def is_trained(self):
+        return self.base.is_trained
+
+    def search(self, x, k):
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        inner_product = self.metric_type == faiss.METRIC_INNER_PRODUCT
+        _, candidates = self.base.search(x, min(k * self.rerank_factor, max(self.ntotal, k)))
+
+        distances = np.full((len(x), k), -np.inf if inner_product else np.inf, dtype=np.float32)
+        labels = np.full((len(x), k), -1, dtype=np.int64)
+        for row, ids in enumerate(candidates):
+            # Sorted ids read the memory-mapped vectors front to back
+            ids = np.sort(ids[ids >= 0])
+            if not len(ids):
+                continue
+            vectors = np.asarray(self.full[ids], dtype=np.float32)
+            if inner_product:
+                scores = vectors @ x[row]
+                order = np.argsort(-scores)[:k]
+            else:
+                scores = ((vectors - x[row]) ** 2).sum(axis=1)
+                order = np.argsort(scores)[:k]
+            distances[row, :len(order)] = scores[order]
+            labels[row, :len(order)] = ids[order]
+        return distances, labels
+
+    def reconstruct(self, i):
+        return np.array(self.full[i], dtype=np.float32)
+
+    def reconstruct_n(self, i0, n):
+        return np.array(self.full[i0:i0 + n], dtype=np.float32)
+
+    def add(self, x):
+        raise RuntimeError("RerankIndex is read-only; add vectors to a flat copy.")
+
+    def remove_ids(self, ids):
+        raise RuntimeError("RerankIndex is read-only; remove vectors from a flat copy.")
+
+def base_index(index):
+    """Returns the FAISS index itself, unwrapping a RerankIndex."""
+    return index.base if isinstance(index, RerankIndex) else index
+
+def all_vectors(index):
+    """
+    Returns every vector stored in an index as a float32 matrix.
+    PQ indexes return their (lossy) reconstructions.
+    """
+    if index.ntotal == 0:
+        return np.zeros((0, index.d), dtype=np.float32)
+    try:
+        return index.reconstruct_n(0, index.ntotal)
+    except RuntimeError:
+        # IVF indexes can only reconstruct once they keep a direct id -> list map
+        faiss.extract_index_ivf(index).make_direct_map()
+        return index.reconstruct_n(0, index.ntotal)
+
+def build_index(vectors, factory=FAISS_INDEX_FACTORY, metric=faiss.METRIC_L2, train_sample=FAISS_TRAIN_SAMPLE):
+    """
+    Builds a FAISS index from a factory string, training it on a random sample
+    of the vectors when the index type requires it.
+
+    Args:
+        vectors (np.ndarray): float32 matrix of shape (n, d)
+        factory (str): FAISS index factory string
+        metric (int): FAISS metric type
+        train_sample (int): Maximum vectors used for training, 0 uses all
+
+    Returns:
+        faiss.Index: The populated index
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    factory = effective_factory(factory, len(vectors))
+    index = faiss.index_factory(vectors.shape[1], factory, metric)
+
+    if not index.is_trained:
+        sample = vectors
+        if train_sample and len(vectors) > train_sample:
+            rng = np.random.default_rng(0)
+            sample = vectors[np.sort(rng.choice(len(vectors), train_sample, replace=False))]
+        index.train(sample)
+
+    index.add(vectors)
+    set_search_params(index)
+    return index
+
+def convert_index(vectorstore, factory=FAISS_INDEX_FACTORY):
+    """
+    Rebuilds a vector store's index as the configured index type, keeping the
+    same vector order so the docstore mapping stays valid. Nothing is
+    re-embedded. Does nothing when the store already has that type.
+
+    Args:
+        vectorstore (FAISS): The vector store
+        factory (str): FAISS index factory string
+
+    Returns:
+        str: The factory string of the store's index afterwards
+    """
+    target = effective_factory(factory, vectorstore.index.ntotal)
+    current = getattr(vectorstore, "index_factory", FLAT_FACTORY)
+    if target == current:
+        return current
+
+    vectors = all_vectors(vectorstore.index)
+    index = build_index(vectors, target, metric=vectorstore.index.metric_type)
+    # The exact vectors are kept for reranking; saving the store moves them to disk
+    vectorstore.index = RerankIndex(index, vectors) if is_lossy(target) and FAISS_RERANK_FACTOR else index
+    vectorstore.index_factory = target
+    logging.info(f"Rebuilt FAISS index as {target} ({len(vectors)} vectors, previously {current}).")
+    if is_lossy(target):
+        try:
+            code_size = index.sa_code_size()
+            logging.info(f"{target} stores {code_size} bytes per vector instead of {4 * index.d} ({4 * index.d / code_size:.1f}x smaller).")
+        except RuntimeError:
+            pass
+    return target
+
+def to_flat(vectorstore):
+    """
+    Replaces a vector store's index with an exact flat copy, used when the
+    current index cannot remove vectors (HNSW) or add them (RerankIndex). The
+    next final save converts it back to the configured type.
+    """
+    vectors = all_vectors(vectorstore.index)
+    vectorstore.index = build_index(vectors, FLAT_FACTORY, metric=vectorstore.index.metric_type)
+    vectorstore.index_factory = FLAT_FACTORY
@@ -0,0 +1,239 @@
+"""
+Semantic answer cache for the RAG application
+"""
+
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+from ..utils.config import (
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_TTL_SECONDS,
+    ANSWER_CACHE_SIMILARITY
+)
+
+# Index versions whose answers are kept; a hot swap briefly serves two at once
+_KEPT_INDEX_VERSIONS = 2
+
+def normalize_query(query):
+    """Lower-case a query, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", query.lower()).strip().rstrip("?!. ")
+
+class AnswerCache:
+    """
+    LRU + TTL cache of final answers, looked up by exact normalized query or by
+    query-embedding similarity. Entries are partitioned by index version and
+    mode (RAG+LLM vs RAG-only), so requests still holding the previous index
+    during a hot swap neither see nor clear the new version's answers. Only
+    the most recently used versions are kept.
+    """
+    
+    def __init__(self, max_entries=ANSWER_CACHE_MAX_ENTRIES, ttl_seconds=ANSWER_CACHE_TTL_SECONDS, similarity_threshold=ANSWER_CACHE_SIMILARITY):
+        """
+        Args:
+            max_entries (int): Maximum number of cached answers
+            ttl_seconds (float): Lifetime of an entry (0 = no expiry)
+            similarity_threshold (float): Minimum cosine similarity for a near-duplicate hit (>= 1 disables it)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        # (index version, mode, normalized query) -> entry
+        self._entries = OrderedDict()
+        # Per-(index version, mode) (keys, matrix) of unit query embeddings, rebuilt lazily after changes
+        self._matrices = {}
+        # Index versions seen, least recently used first
+        self._versions = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def uses_similarity(self):
+        return self.similarity_threshold < 1.0
+    
+    def _touch_version(self, index_version):
+        """Marks a version as in use and drops the answers of versions no longer served."""
+        if index_version in self._versions:
+            self._versions.move_to_end(index_version)
+            return
+        self._versions[index_version] = None
+        while len(self._versions) > _KEPT_INDEX_VERSIONS:
+            retired, _ = self._versions.popitem(last=False)
+            keys = [key for key in self._entries if key[0] == retired]
+            for key in keys:
+                del self._entries[key]
+            for partition in [partition for partition in self._matrices if partition[0] == retired]:
+                del self._matrices[partition]
+            if keys:
+                logging.info(f"Index version {retired} retired; dropped {len(keys)} cached answers.")
+    
+    def _expired(self, entry, now):
+        return self.ttl_seconds and now - entry["created"] > self.ttl_seconds
+    
+    def _similar_key(self, partition, query_embedding, now):
+        """Find the most similar cached query of the same index version and mode above the threshold."""
+        if partition not in self._matrices:
+            keys = [key for key, entry in self._entries.items() if key[:2] == partition and entry["embedding"] is not None]
+            matrix = np.vstack([self._entries[key]["embedding"] for key in keys]) if keys else None
+            self._matrices[partition] = (keys, matrix)
+        
+        keys, matrix = self._matrices[partition]
+        if matrix is None:
+            return None
+        
+        scores = matrix @ query_embedding
+        for position in np.argsort(-scores):
+            if scores[position] < self.similarity_threshold:
+                return None
+            key = keys[position]
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry, now):
+                return key
+        return None
+    
+    @staticmethod
+    def _unit(embedding):
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+    
+    def _get_exact(self, query, mode, index_version, now):
+        """Returns the entry cached for the exact normalized query, or None."""
+        key = (index_version, mode, normalize_query(query))
+        with self._lock:
+            self._touch_version(index_version)
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry["answer"]
+            return None
+    
+    def _get_similar(self, query, mode, index_version, query_embedding, now):
+        """Returns the answer of a near-duplicate question, or None (counted as a miss)."""
+        with self._lock:
+            unit = self._unit(query_embedding)
+            if unit is not None:
+                similar_key = self._similar_key((index_version, mode), unit, now)
+                if similar_key is not None:
+                    self._entries.move_to_end(similar_key)
+                    self.similar_hits += 1
+                    logging.info(f"Answer cache near-duplicate hit: '{query}' ~ '{similar_key[2]}'")
+                    return self._entries[similar_key]["answer"]
+            
+            self.misses += 1
+            return None
+    
+    def get(self, query, mode, index_version, embed_query=None):
+        """
+        Looks up a cached answer, first by exact normalized query and then by
+        embedding similarity. The query is only embedded on an exact miss.
+        
+        Args:
+            query (str): The user's question
+            mode (str): Answer mode the entry must belong to
+            index_version (str): Version of the index serving the request
+            embed_query (callable): Function returning the query embedding, enables near-duplicate lookup
+        
+        Returns:
+            tuple: (cached answer or None, query embedding or None) -- pass the
+            embedding back to put() so it is not computed twice
+        """
+        now = time.time()
+        answer = self._get_exact(query, mode, index_version, now)
+        if answer is not None:
+            return answer, None
+        
+        query_embedding = None
+        if embed_query is not None and self.uses_similarity:
+            try:
+                query_embedding = embed_query(query)
+            except Exception as e:
+                logging.warning(f"Answer cache could not embed query: {e}")
+        return self._get_similar(query, mode, index_version, query_embedding, now), query_embedding
+    
+    async def aget(self, query, mode, index_version, aembed_query=None):
+        """Async variant of get(); `aembed_query` is a coroutine function returning the query embedding."""
+        now = time.time()
+        answer = self._get_exact(query, mode, index_version, now)
+        if answer is not None:
+            return answer, None
+        
+        query_embedding = None
+        if aembed_query is not None and self.uses_similarity:
+            try:
+                query_embedding = await aembed_query(query)
+            except Exception as e:
+                logging.warning(f"Answer cache could not embed query: {e}")
+        return self._get_similar(query, mode, index_version, query_embedding, now), query_embedding
+    
+    def put(self, query, mode, index_version, answer, query_embedding=None):
+        """
+        Stores an answer.
+        
+        Args:
+            query (str): The user's question
+            mode (str): Answer mode
+            index_version (str): Version of the index the answer was produced with
+            answer (str): The final answer text
+            query_embedding (list): Embedding of the query for near-duplicate lookup
+        """
+        key = (index_version, mode, normalize_query(query))
+        with self._lock:
+            self._touch_version(index_version)
+            self._entries[key] = {"answer": answer, "embedding": self._unit(query_embedding), "created": time.time()}
+            self._entries.move_to_end(key)
+            self._matrices.pop(key[:2], None)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+    
+    def _remove(self, key):
+        del self._entries[key]
+        self._matrices.pop(key[:2], None)
+    
+    def clear(self):
+        """Removes every cached answer."""
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+            self._versions.clear()
+    
+    def stats(self):
+        """
+        Returns cache statistics.
+        
+        Returns:
+            dict: entries, exact_hits, similar_hits and misses
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+            }
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+def get_answer_cache():
+    """
+    Returns the process-wide answer cache, shared by every chat session.
+    
+    Returns:
+        AnswerCache: The shared cache
+    """
+    global _answer_cache
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            _answer_cache = AnswerCache()
+        return _answer_cache
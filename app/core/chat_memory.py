@@ -0,0 +1,109 @@
+"""
+Rolling-summary chat memory for the RAG application
+"""
+
+import logging
+import threading
+from langchain_core.output_parsers import StrOutputParser
+from ..config.prompts import SUMMARY_PROMPT
+from ..utils.config import CHAT_MEMORY_WINDOW_TURNS, CHAT_MEMORY_SUMMARY_TOKENS
+from ..utils.tokens import truncate_tokens
+
+def _turns_hash(turns):
+    """Fingerprint of a run of turns, to notice when already summarized ones change."""
+    return hash(tuple(tuple(turn) for turn in turns))
+
+def format_chat_history(chat_history):
+    """Render (human, ai) tuples the same way get_buffer_string renders messages."""
+    return "\n".join(f"Human: {human_msg}\nAI: {ai_msg}" for human_msg, ai_msg in chat_history)
+
+class ChatMemory:
+    """
+    Memory of one chat session: the last `window_turns` turns verbatim plus a
+    running summary of everything older. Each turn that leaves the window is
+    folded into the summary once, with one LLM call, so the history sent with
+    every prompt stays about the same size however long the chat runs.
+    Keep one instance per chat session and pass it with every request; it
+    is safe to share between threads and coroutines.
+    """
+
+    def __init__(self, window_turns=CHAT_MEMORY_WINDOW_TURNS, summary_tokens=CHAT_MEMORY_SUMMARY_TOKENS):
+        """
+        Args:
+            window_turns (int): Most recent turns kept verbatim
+            summary_tokens (int): Maximum tokens in the summary of older turns
+        """
+        self.window_turns = window_turns
+        self.summary_tokens = summary_tokens
+        self.summary = ""
+        self.summarized_turns = 0
+        self._summarized_hash = None
+        self._lock = threading.Lock()
+
+    def _reset(self):
+        self.summary = ""
+        self.summarized_turns = 0
+        self._summarized_hash = None
+
+    def _summary_inputs(self, summary, turns):
+        return {
+            "summary": summary or "(none)",
+            "new_lines": format_chat_history(turns),
+            "max_words": max(1, self.summary_tokens * 3 // 4)
+        }
+
+    def _plan(self, chat_history):
+        """
+        Works out which turns are due to be folded into the summary.
+
+        Returns:
+            tuple: (number of turns outside the window, turns already summarized, current summary)
+        """
+        with self._lock:
+            older = max(0, len(chat_history) - self.window_turns)
+            # The history was edited (e.g. a failed turn removed): start the summary over
+            if older < self.summarized_turns or (
+                self.summarized_turns and _turns_hash(chat_history[:self.summarized_turns]) != self._summarized_hash
+            ):
+                self._reset()
+            return older, self.summarized_turns, self.summary
+
+    def _update(self, chat_history, start, older, summary):
+        """Publish a new summary unless a concurrent request already did."""
+        with self._lock:
+            if self.summarized_turns != start:
+                return
+            self.summary = truncate_tokens(summary.strip(), self.summary_tokens)
+            self.summarized_turns = older
+            self._summarized_hash = _turns_hash(chat_history[:older])
+        logging.info(f"Chat summary updated: {older} turns summarized, {self.window_turns} kept verbatim.")
+
+    def _render(self, chat_history, older):
+        recent = format_chat_history(chat_history[older:])
+        with self._lock:
+            summary = self.summary
+        if not summary:
+            return recent
+        return f"Summary of earlier conversation: {summary}\n{recent}"
+
+    async def ahistory_text(self, chat_history, llm=None):
+        """
+        Renders the chat history for a prompt, updating the summary with any
+        turns that have left the window since the last call.
+
+        Args:
+            chat_history (list): List of (human, ai) message tuples
+            llm: Model used to summarize; without one, older turns are dropped
+
+        Returns:
+            str: The summary followed by the recent turns
+        """
+        older, start, summary = self._plan(chat_history)
+        if llm is not None and older > start:
+            try:
+                chain = SUMMARY_PROMPT | llm | StrOutputParser()
+                summary = await chain.ainvoke(self._summary_inputs(summary, chat_history[start:older]))
+                self._update(chat_history, start, older, summary)
+            except Exception as e:
+                logging.error(f"Failed to update chat summary: {e}", exc_info=True)
+        return self._render(chat_history, older)
@@ -0,0 +1,254 @@
+"""
+Token-sized, structure-aware text splitting for ingestion
+"""
+
+import re
+from functools import lru_cache
+from langchain_core.documents import Document
+from ..utils.config import CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS
+from ..utils.tokens import count_tokens, get_encoding, CHARS_PER_TOKEN
+
+# Strength of the boundary in front of a piece of text; chunks end at the strongest one available
+MID_SENTENCE, SENTENCE, BLOCK, SECTION = range(4)
+
+# Longest line still treated as a heading
+_MAX_HEADING_CHARS = 100
+
+_HEADING_PATTERNS = [
+    # Markdown headings
+    re.compile(r"^\s{0,3}#{1,6}\s+\S"),
+    # "SECTION 4 - EXCLUSIONS", "Part II: Claims", "Schedule 1"
+    re.compile(r"^\s*(?:section|article|part|chapter|schedule|annexure|appendix|endorsement)\s+[\dIVXLC]+[A-Z]?\b", re.IGNORECASE),
+    # "4. GENERAL EXCLUSIONS", "2.1 DEFINITIONS"
+    re.compile(r"^\s*\d+(?:\.\d+)*\.?\s+[A-Z][A-Z0-9 ,&/()'-]*$"),
+]
+# Numbered or lettered clauses and list items: "4.2.1", "12)", "(a)", "(iv)", "Exclusion 3.1", bullets
+_CLAUSE_PATTERN = re.compile(
+    r"^\s*(?:\d+(?:\.\d+)+\.?|\d+[.)]|\(?[a-z]{1,2}\)|\(?[ivxlc]{1,5}\)|[•▪◦*-]"
+    r"|(?:clause|exclusion|condition|section|article)\s+\d+(?:\.\d+)*[.:]?)\s",
+    re.IGNORECASE
+)
+# Sentence ends; "Rs. 10,000" and "e.g. the" are not followed by a capital and stay whole
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(]?[A-Z])")
+
+# Token counts of repeated pieces (boilerplate, table rows) are looked up, not re-encoded
+_cached_count = lru_cache(maxsize=1 << 16)(count_tokens)
+
+def _is_heading(line):
+    stripped = line.strip()
+    if not stripped or len(stripped) > _MAX_HEADING_CHARS:
+        return False
+    if stripped.startswith("#"):
+        return bool(_HEADING_PATTERNS[0].match(line))
+    # A line ending like a sentence is body text, even if it starts with "Section 4"
+    if stripped.endswith((".", ",", ";")):
+        return False
+    if any(pattern.match(stripped) for pattern in _HEADING_PATTERNS[1:]):
+        return True
+    letters = [c for c in stripped if c.isalpha()]
+    return len(letters) >= 3 and stripped.upper() == stripped
+
+def _is_table_row(line):
+    return line.count("|") >= 2 or line.count("\t") >= 2
+
+def _heading_text(line):
+    return line.strip().lstrip("#").strip()
+
+def _sentences(text):
+    """Splits a block into sentences that concatenate back to it."""
+    pieces, start = [], 0
+    for match in _SENTENCE_END.finditer(text):
+        pieces.append(text[start:match.end()])
+        start = match.end()
+    pieces.append(text[start:])
+    return [piece for piece in pieces if piece]
+
+def _structure(text):
+    """
+    Breaks a text into (text, boundary) pieces: heading lines, and the
+    sentences or table rows of each paragraph and clause. Pieces concatenate
+    back to the text (minus leading blank lines), so adjacent chunks share
+    their overlap verbatim.
+    """
+    pieces = []
+    block, in_table = [], False
+    new_block = True
+
+    def end_block():
+        if not block:
+            return
+        parts = block if in_table else _sentences("".join(block))
+        pieces.append([parts[0], BLOCK])
+        pieces.extend([part, SENTENCE] for part in parts[1:])
+        block.clear()
+
+    for line in text.splitlines(keepends=True):
+        if not line.strip():
+            if block:
+                block.append(line)
+            elif pieces:
+                pieces[-1][0] += line
+            new_block = True
+            continue
+        row = _is_table_row(line)
+        if not row and _is_heading(line):
+            end_block()
+            pieces.append([line, SECTION])
+            new_block = True
+            continue
+        if block and (new_block or row != in_table or (not row and _CLAUSE_PATTERN.match(line))):
+            end_block()
+        if not block:
+            in_table = row
+        block.append(line)
+        new_block = False
+    end_block()
+    return pieces
+
+class StructuredTextSplitter:
+    """
+    Splits text into chunks of at most `chunk_tokens` tokens without cutting
+    through the document's structure. A heading always starts a new chunk,
+    and chunks preferably end where a paragraph, numbered clause or table
+    ends. Failing that they end between sentences or table rows, and only a
+    single sentence longer than a chunk is cut mid-sentence. Consecutive
+    chunks of a section overlap by up to `overlap_tokens` tokens of whole
+    sentences, and every chunk records the heading it falls under as
+    `section` metadata.
+
+    Sizes are counted with tiktoken piece by piece, so a chunk can be off
+    by a few tokens where merges span pieces. Instances hold no encoder
+    state and can be sent to worker processes.
+    """
+
+    def __init__(self, chunk_tokens=CHUNK_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS, encoding_name="cl100k_base"):
+        """
+        Args:
+            chunk_tokens (int): Maximum tokens per chunk
+            overlap_tokens (int): Maximum tokens repeated from the end of the previous chunk
+            encoding_name (str): Name of the tiktoken encoding
+        """
+        if overlap_tokens >= chunk_tokens:
+            raise ValueError(f"overlap_tokens ({overlap_tokens}) must be smaller than chunk_tokens ({chunk_tokens})")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.encoding_name = encoding_name
+
+    def _split_oversized(self, text):
+        """Cuts a single sentence longer than a chunk at token boundaries."""
+        encoding = get_encoding(self.encoding_name)
+        if encoding is None:
+            step = self.chunk_tokens * CHARS_PER_TOKEN
+            return [text[i:i + step] for i in range(0, len(text), step)]
+        tokens = encoding.encode_ordinary(text)
+        return [encoding.decode(tokens[i:i + self.chunk_tokens]) for i in range(0, len(tokens), self.chunk_tokens)]
+
+    def _measure(self, pieces, section):
+        """Adds token counts and the heading in effect: (text, tokens, boundary, section) tuples."""
+        measured = []
+        for text, boundary in pieces:
+            if boundary == SECTION:
+                section = _heading_text(text)
+            tokens = _cached_count(text, self.encoding_name)
+            if tokens <= self.chunk_tokens:
+                measured.append((text, tokens, boundary, section))
+                continue
+            for i, part in enumerate(self._split_oversized(text)):
+                measured.append((part, _cached_count(part, self.encoding_name), boundary if i == 0 else MID_SENTENCE, section))
+        return measured
+
+    def _cut(self, current, fresh, incoming):
+        """
+        Where to end the chunk in `current` when `incoming` tokens do not fit:
+        the last paragraph or clause start past half a chunk whose remainder
+        still fits with the incoming piece, otherwise right here.
+        """
+        size = sum(piece[1] for piece in current)
+        head = size
+        for i in range(len(current) - 1, fresh, -1):
+            head -= current[i][1]
+            if head < self.chunk_tokens // 2:
+                break
+            if current[i][2] >= BLOCK and size - head + incoming <= self.chunk_tokens:
+                return i
+        return len(current)
+
+    def _overlap(self, chunk, budget):
+        """Trailing whole sentences of a finished chunk to repeat at the start of the next one."""
+        budget = min(budget, self.overlap_tokens)
+        start, size = len(chunk), 0
+        while start > 1 and chunk[start - 1][2] >= SENTENCE and chunk[start - 1][2] != SECTION:
+            size += chunk[start - 1][1]
+            if size > budget:
+                break
+            start -= 1
+        return chunk[start:]
+
+    def _pack(self, pieces):
+        """Groups measured pieces into chunks (lists of pieces)."""
+        chunks = []
+        # `fresh` is the number of overlap pieces at the start of `current`
+        current, fresh, size = [], 0, 0
+        for piece in pieces:
+            tokens, boundary = piece[1], piece[2]
+            # A heading right after another one (title, then first section) stays with it
+            new_section = boundary == SECTION and any(p[2] != SECTION for p in current)
+            if len(current) > fresh and (new_section or size + tokens > self.chunk_tokens):
+                cut = len(current) if new_section else self._cut(current, fresh, tokens)
+                chunk, rest = current[:cut], current[cut:]
+                chunks.append(chunk)
+                rest_size = sum(p[1] for p in rest)
+                overlap = [] if new_section else self._overlap(chunk, self.chunk_tokens - tokens - rest_size)
+                current, fresh = overlap + rest, len(overlap)
+                size = rest_size + sum(p[1] for p in overlap)
+            current.append(piece)
+            size += tokens
+        if len(current) > fresh:
+            chunks.append(current)
+        return chunks
+
+    def split_text_with_sections(self, text, section=None):
+        """
+        Splits one text.
+
+        Args:
+            text (str): Text to split
+            section (str): Heading in effect at the start of the text (e.g. from the previous page)
+
+        Returns:
+            tuple: ([(chunk text, section)], heading in effect at the end of the text)
+        """
+        pieces = self._measure(_structure(text), section)
+        chunks = []
+        for chunk in self._pack(pieces):
+            content = "".join(piece[0] for piece in chunk).strip()
+            if content:
+                chunks.append((content, chunk[-1][3]))
+        return chunks, pieces[-1][3] if pieces else section
+
+    def split_text(self, text):
+        return [content for content, _ in self.split_text_with_sections(text)[0]]
+
+    def split_documents(self, docs):
+        """
+        Splits documents into chunks that keep each document's metadata.
+        Pages of one source are split in order, so a section heading carries
+        over to the following pages.
+
+        Args:
+            docs (list): Documents to split
+
+        Returns:
+            list: Document chunks
+        """
+        chunks = []
+        sections = {}
+        for doc in docs:
+            source = doc.metadata.get("source")
+            texts, sections[source] = self.split_text_with_sections(doc.page_content, sections.get(source))
+            for content, section in texts:
+                metadata = dict(doc.metadata)
+                if section:
+                    metadata["section"] = section
+                chunks.append(Document(page_content=content, metadata=metadata))
+        return chunks
@@ -0,0 +1,207 @@
+"""
+Token-budgeted context packing for the RAG prompts
+"""
+
+import re
+import zlib
+import logging
+import numpy as np
+from ..utils.config import CONTEXT_TOKEN_BUDGET, CONTEXT_MMR_LAMBDA
+from ..utils.tokens import count_tokens
+
+# Shortest suffix/prefix match treated as splitter overlap rather than coincidence
+_MIN_OVERLAP_CHARS = 20
+# Hashed term-frequency vectors used for MMR similarity; retrieved chunks are
+# compared locally instead of being sent back to the embeddings API
+_HASH_DIM = 1024
+# Passages trimmed below this many tokens are not worth including
+_MIN_TRIMMED_TOKENS = 40
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+class _Passage:
+    """A run of text from one source, made of one or more merged chunks."""
+
+    def __init__(self, text, source, rank):
+        self.text = text
+        self.source = source
+        self.rank = rank
+
+def _source_key(doc):
+    metadata = doc.metadata or {}
+    return (metadata.get("source"), metadata.get("page"))
+
+def _overlap(left, right, max_chars):
+    """Length of the longest suffix of `left` that is a prefix of `right`."""
+    probe = right[:_MIN_OVERLAP_CHARS]
+    if len(probe) < _MIN_OVERLAP_CHARS:
+        return 0
+    tail = left[-max_chars:] if max_chars else left
+    start = tail.find(probe)
+    while start != -1:
+        length = len(tail) - start
+        if right.startswith(tail[start:]):
+            return length
+        start = tail.find(probe, start + 1)
+    return 0
+
+def merge_overlapping(docs, max_overlap_chars=1000):
+    """
+    Collapses retrieved chunks that repeat text: exact duplicates, chunks
+    contained in another chunk of the same source, and neighbouring chunks
+    whose splitter overlap joins them into one passage.
+
+    Args:
+        docs (list): Retrieved documents, best first
+        max_overlap_chars (int): Longest overlap searched for
+
+    Returns:
+        list: _Passage objects, ordered by the best rank they contain
+    """
+    passages = []
+    for rank, doc in enumerate(docs):
+        text = doc.page_content.strip()
+        source = _source_key(doc)
+        merged = False
+        for passage in passages:
+            if passage.source != source and text != passage.text:
+                continue
+            if text in passage.text:
+                merged = True
+            elif passage.text in text:
+                passage.text = text
+                merged = True
+            else:
+                length = _overlap(passage.text, text, max_overlap_chars)
+                if length:
+                    passage.text += text[length:]
+                    merged = True
+                else:
+                    length = _overlap(text, passage.text, max_overlap_chars)
+                    if length:
+                        passage.text = text + passage.text[length:]
+                        merged = True
+            if merged:
+                break
+        if not merged:
+            passages.append(_Passage(text, source, rank))
+    return passages
+
+def _term_vectors(texts):
+    """L2-normalized hashed term-frequency vectors."""
+    vectors = np.zeros((len(texts), _HASH_DIM), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in _WORD_PATTERN.findall(text.lower()):
+            vectors[i, zlib.crc32(word.encode("utf-8")) % _HASH_DIM] += 1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-9)
+
+def mmr_order(passages, mmr_lambda=CONTEXT_MMR_LAMBDA):
+    """
+    Orders passages by maximal marginal relevance: relevance comes from the
+    retrieval rank, redundancy from lexical similarity to passages already chosen.
+
+    Args:
+        passages (list): _Passage objects
+        mmr_lambda (float): 1 ranks by relevance only, 0 by diversity only
+
+    Returns:
+        list: The passages in MMR order
+    """
+    if len(passages) < 3:
+        return list(passages)
+    n = len(passages)
+    relevance = np.array([1.0 - passage.rank / (passages[-1].rank + 1) for passage in passages])
+    similarity = _term_vectors([passage.text for passage in passages])
+    similarity = similarity @ similarity.T
+
+    selected = [int(np.argmax(relevance))]
+    max_similarity = similarity[selected[0]].copy()
+    remaining = set(range(n)) - set(selected)
+    while remaining:
+        candidates = np.array(sorted(remaining))
+        scores = mmr_lambda * relevance[candidates] - (1 - mmr_lambda) * max_similarity[candidates]
+        best = int(candidates[np.argmax(scores)])
+        selected.append(best)
+        remaining.discard(best)
+        max_similarity = np.maximum(max_similarity, similarity[best])
+    return [passages[i] for i in selected]
+
+def trim_to_budget(text, query, budget):
+    """
+    Keeps the sentences of a passage that best match the query, in their
+    original order, within a token budget.
+
+    Args:
+        text (str): The passage
+        query (str): The question being answered
+        budget (int): Maximum tokens
+
+    Returns:
+        str: The trimmed passage, empty if nothing fits
+    """
+    sentences = [s.strip() for s in _SENTENCE_PATTERN.split(text) if s.strip()]
+    query_words = set(_WORD_PATTERN.findall(query.lower()))
+    scored = sorted(
+        range(len(sentences)),
+        key=lambda i: (-len(query_words & set(_WORD_PATTERN.findall(sentences[i].lower()))), i)
+    )
+    kept, used = set(), 0
+    for i in scored:
+        tokens = count_tokens(sentences[i]) + 1
+        if used + tokens <= budget:
+            kept.add(i)
+            used += tokens
+    return " ".join(sentences[i] for i in sorted(kept))
+
+def build_context(docs, query, budget=CONTEXT_TOKEN_BUDGET, mmr_lambda=CONTEXT_MMR_LAMBDA):
+    """
+    Builds the prompt context from retrieved chunks: overlapping chunks are
+    merged, passages are diversified with MMR and packed into a token budget.
+    A passage that overflows the budget is trimmed to its most relevant
+    sentences, and packing goes on with the passages after it until too
+    little of the budget is left to be useful.
+
+    Args:
+        docs (list): Retrieved documents, best first
+        query (str): The question being answered
+        budget (int): Maximum context tokens
+        mmr_lambda (float): Relevance/diversity trade-off for MMR
+
+    Returns:
+        tuple: (context text, stats dict with tokens_before, tokens_after and tokens_saved)
+    """
+    tokens_before = count_tokens("\n\n".join(doc.page_content for doc in docs))
+    passages = mmr_order(merge_overlapping(docs), mmr_lambda=mmr_lambda)
+
+    packed, used = [], 0
+    for passage in passages:
+        remaining = budget - used
+        if remaining < _MIN_TRIMMED_TOKENS:
+            break
+        tokens = count_tokens(passage.text) + 2
+        if tokens <= remaining:
+            packed.append(passage.text)
+            used += tokens
+            continue
+        # Smaller passages further down may still fit whatever is left after trimming
+        trimmed = trim_to_budget(passage.text, query, remaining - 2)
+        if trimmed:
+            packed.append(trimmed)
+            used += count_tokens(trimmed) + 2
+
+    context = "\n\n".join(packed)
+    tokens_after = count_tokens(context)
+    stats = {
+        "chunks": len(docs),
+        "passages": len(packed),
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": tokens_before - tokens_after,
+    }
+    logging.info(
+        f"Context packed: {stats['chunks']} chunks -> {stats['passages']} passages, "
+        f"{tokens_after} tokens ({stats['tokens_saved']} saved)."
+    )
+    return context, stats
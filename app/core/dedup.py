@@ -0,0 +1,96 @@
+"""
+Near-duplicate chunk detection with SimHash for ingestion
+"""
+
+import re
+import hashlib
+import numpy as np
+from ..utils.config import CHUNK_DEDUP_MAX_DISTANCE
+
+SIGNATURE_BITS = 64
+# Word n-grams hashed into the signature; 3-word shingles are robust to small edits
+SHINGLE_WORDS = 3
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+def _shingles(text):
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+
+def simhash(text):
+    """
+    64-bit SimHash of a text's word shingles.
+    Every shingle hash votes +1/-1 on each bit; texts sharing most shingles
+    end up with signatures a few bits apart, identical texts (ignoring case,
+    whitespace and punctuation) with the same signature.
+
+    Args:
+        text (str): The chunk text
+
+    Returns:
+        int: The signature
+    """
+    shingles = _shingles(text)
+    if not shingles:
+        return 0
+    digests = b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(len(shingles), SIGNATURE_BITS)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+class ChunkDeduplicator:
+    """
+    Finds chunks whose SimHash is within `max_distance` bits of one already seen.
+    Signatures are split into max_distance + 1 bands: two signatures that
+    differ in at most max_distance bits agree exactly on at least one band, so
+    looking up the bands finds every near-duplicate without comparing against
+    the whole corpus.
+    """
+
+    def __init__(self, max_distance=CHUNK_DEDUP_MAX_DISTANCE):
+        """
+        Args:
+            max_distance (int): Largest Hamming distance treated as a duplicate, 0 for exact duplicates only
+        """
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self._band_bits = SIGNATURE_BITS // self.bands
+        self._band_mask = (1 << self._band_bits) - 1
+        # One table per band: band value -> {signature: chunk ID}
+        self._tables = [{} for _ in range(self.bands)]
+
+    @classmethod
+    def from_manifest_entries(cls, entries, **kwargs):
+        """Rebuilds the lookup from the chunk IDs and signatures recorded in manifest file entries."""
+        dedup = cls(**kwargs)
+        for entry in entries:
+            for chunk_id, signature in zip(entry["chunk_ids"], entry.get("signatures") or []):
+                dedup.add(chunk_id, int(signature, 16))
+        return dedup
+
+    def _band_values(self, signature):
+        for band in range(self.bands):
+            yield band, (signature >> (band * self._band_bits)) & self._band_mask
+
+    def find(self, signature):
+        """
+        Returns the chunk ID a signature duplicates, or None.
+
+        Args:
+            signature (int): SimHash of the new chunk
+        """
+        for band, value in self._band_values(signature):
+            for candidate, chunk_id in self._tables[band].get(value, {}).items():
+                if hamming_distance(candidate, signature) <= self.max_distance:
+                    return chunk_id
+        return None
+
+    def add(self, chunk_id, signature):
+        """Records the signature of an indexed chunk."""
+        for band, value in self._band_values(signature):
+            self._tables[band].setdefault(value, {})[signature] = chunk_id
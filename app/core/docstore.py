@@ -0,0 +1,259 @@
+"""
+SQLite-backed chunk store for the FAISS vector store
+"""
+
+import json
+import sqlite3
+import threading
+from collections.abc import Mapping
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_core.documents import Document
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_BATCH_SIZE = 500
+# Chunks read per batch when streaming the whole store
+STREAM_BATCH_SIZE = 1000
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS chunks ("
+        " id TEXT PRIMARY KEY,"
+        " page_content TEXT NOT NULL,"
+        " metadata TEXT NOT NULL"
+        ") WITHOUT ROWID"
+    )
+    # FAISS vector position -> chunk ID
+    conn.execute("CREATE TABLE IF NOT EXISTS positions (pos INTEGER PRIMARY KEY, id TEXT NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    conn.commit()
+    return conn
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """
+    Docstore keeping chunk text and metadata in a SQLite file instead of a
+    pickled dict, so loading an index reads nothing up front and a search
+    only fetches the rows of its top-k hits.
+    Adds and deletes are buffered in memory and written in one transaction by
+    `commit()`, which runs when the index is saved; until then the file keeps
+    matching the index.faiss saved alongside it. A commit only appends the
+    positions added since the last one, unless chunks were deleted (which
+    renumbers the vectors after them).
+    A snapshot store holds one read transaction open for its lifetime, so a
+    served index keeps seeing the chunks and positions it was loaded with
+    while a re-index commits to the same file (WAL mode allows both).
+    """
+
+    def __init__(self, path, snapshot=False):
+        """
+        Args:
+            path (str): Path of the SQLite file
+            snapshot (bool): Read-only view pinned to the file's current state
+        """
+        self.path = path
+        self.snapshot = snapshot
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        if snapshot:
+            self._conn.execute("BEGIN")
+            self._conn.execute("SELECT COUNT(*) FROM positions").fetchone()
+        self._added = {}
+        self._deleted = set()
+        self._reset = False
+        # Positions 0 .. _committed_positions - 1 are already in the file
+        self._committed_positions = self._conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def _fetch(self, ids):
+        """Read documents for the given IDs straight from the file."""
+        found = {}
+        with self._lock:
+            for start in range(0, len(ids), _LOOKUP_BATCH_SIZE):
+                batch = ids[start:start + _LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT id, page_content, metadata FROM chunks WHERE id IN ({placeholders})", batch
+                ).fetchall()
+                for doc_id, page_content, metadata in rows:
+                    found[doc_id] = Document(id=doc_id, page_content=page_content, metadata=json.loads(metadata))
+        return found
+
+    def search(self, search):
+        """
+        Looks up a chunk by ID.
+
+        Args:
+            search (str): Chunk ID
+
+        Returns:
+            Document or str: The chunk, or a message if it does not exist
+        """
+        if search in self._added:
+            return self._added[search]
+        if search not in self._deleted and not self._reset:
+            doc = self._fetch([search]).get(search)
+            if doc is not None:
+                return doc
+        return f"ID {search} not found."
+
+    def mget(self, ids):
+        """
+        Looks up many chunks with batched queries.
+
+        Args:
+            ids (list): Chunk IDs
+
+        Returns:
+            dict: ID -> Document for the IDs that exist
+        """
+        found = {doc_id: self._added[doc_id] for doc_id in ids if doc_id in self._added}
+        if not self._reset:
+            pending = [doc_id for doc_id in ids if doc_id not in found and doc_id not in self._deleted]
+            found.update(self._fetch(pending))
+        return found
+
+    def add(self, texts):
+        """
+        Buffers chunks to be written on the next commit.
+
+        Args:
+            texts (dict): Chunk ID -> Document
+        """
+        self._added.update(texts)
+        self._deleted.difference_update(texts)
+
+    def delete(self, ids):
+        """
+        Buffers chunk deletions for the next commit.
+
+        Args:
+            ids (list): Chunk IDs
+        """
+        for doc_id in ids:
+            self._added.pop(doc_id, None)
+            self._deleted.add(doc_id)
+
+    def reset(self):
+        """Drop every stored chunk on the next commit, used when a store is rebuilt from scratch."""
+        self._added.clear()
+        self._deleted.clear()
+        self._reset = True
+
+    def commit(self, index_to_docstore_id, meta=None):
+        """
+        Writes buffered changes and the position mapping in one transaction.
+
+        Args:
+            index_to_docstore_id (Mapping): FAISS vector position -> chunk ID
+            meta (dict): Extra key/value settings saved with the store
+        """
+        if self.snapshot:
+            raise ValueError("Cannot commit to a read-only snapshot docstore.")
+        # Deleting vectors renumbers the ones after them, so the whole mapping is rewritten
+        rewrite = self._reset or bool(self._deleted)
+        start = 0 if rewrite else self._committed_positions
+        positions = ((pos, index_to_docstore_id[pos]) for pos in range(start, len(index_to_docstore_id)))
+        with self._lock:
+            with self._conn:
+                if self._reset:
+                    self._conn.execute("DELETE FROM chunks")
+                if self._deleted:
+                    self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(doc_id,) for doc_id in self._deleted])
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chunks (id, page_content, metadata) VALUES (?, ?, ?)",
+                    [(doc_id, doc.page_content, json.dumps(doc.metadata)) for doc_id, doc in self._added.items()]
+                )
+                if rewrite:
+                    self._conn.execute("DELETE FROM positions")
+                self._conn.executemany("INSERT INTO positions (pos, id) VALUES (?, ?)", positions)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value)) for key, value in (meta or {}).items()]
+                )
+            self._added.clear()
+            self._deleted.clear()
+            self._reset = False
+            self._committed_positions = len(index_to_docstore_id)
+
+    def meta(self):
+        """
+        Returns the key/value settings saved with the store.
+
+        Returns:
+            dict: The settings
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM meta").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def iter_texts(self, batch_size=STREAM_BATCH_SIZE):
+        """
+        Streams the committed chunk texts in FAISS position order, so a pass
+        over the whole corpus only holds one batch in memory.
+
+        Args:
+            batch_size (int): Chunks per batch
+
+        Yields:
+            tuple: (chunk IDs, texts) of up to `batch_size` chunks
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT positions.id, chunks.page_content FROM positions"
+                " JOIN chunks ON chunks.id = positions.id ORDER BY positions.pos"
+            )
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield [doc_id for doc_id, _ in rows], [page_content for _, page_content in rows]
+
+    def positions(self):
+        """
+        Returns a read-only, lazily queried view of the saved position mapping.
+
+        Returns:
+            SQLitePositions: FAISS vector position -> chunk ID
+        """
+        return SQLitePositions(self)
+
+    def close(self):
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+class SQLitePositions(Mapping):
+    """
+    Read-only FAISS position -> chunk ID mapping backed by the docstore file.
+    A search resolves only its top-k positions, so a loaded store never has to
+    hold one Python string per vector.
+    """
+
+    def __init__(self, docstore):
+        self._docstore = docstore
+        with docstore._lock:
+            self._len = docstore._conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def _query(self, sql, params=()):
+        with self._docstore._lock:
+            return self._docstore._conn.execute(sql, params).fetchall()
+
+    def __getitem__(self, pos):
+        rows = self._query("SELECT id FROM positions WHERE pos = ?", (int(pos),))
+        if not rows:
+            raise KeyError(pos)
+        return rows[0][0]
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return iter(pos for pos, in self._query("SELECT pos FROM positions ORDER BY pos"))
+
+    def items(self):
+        return self._query("SELECT pos, id FROM positions ORDER BY pos")
+
+    def values(self):
+        return [doc_id for doc_id, in self._query("SELECT id FROM positions ORDER BY pos")]
@@ -3,21 +3,217 @@ Document loading and processing for the RAG application
 """
 
 import os
+import time
+import signal
 import logging
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 from langchain_community.document_loaders import (
-    DirectoryLoader,
+    CSVLoader,
     PyPDFLoader,
     TextLoader,
-    UnstructuredMarkdownLoader,
     UnstructuredFileLoader
 )
-from ..utils.config import DATA_PATH
+from ..utils.config import (
+    DATA_PATH,
+    PARSE_WORKERS,
+    PARSE_TIMEOUT_SECONDS,
+    PARSE_MEMORY_LIMIT_MB,
+    CHUNK_TOKENS,
+    CHUNK_OVERLAP_TOKENS,
+    SPLIT_WORKERS
+)
+from ..utils.metrics import span
+from .chunking import StructuredTextSplitter
+
+# Cheapest loader for each extension; anything else goes through unstructured.
+# Markdown is read as plain text so headings survive for the splitter.
+LOADER_MAPPING = {
+    ".pdf": (PyPDFLoader, {}),
+    ".txt": (TextLoader, {"encoding": "utf-8", "autodetect_encoding": True}),
+    ".md": (TextLoader, {"encoding": "utf-8", "autodetect_encoding": True}),
+    ".json": (TextLoader, {"encoding": "utf-8", "autodetect_encoding": True}),
+    ".csv": (CSVLoader, {"encoding": "utf-8", "autodetect_encoding": True}),
+}
+DEFAULT_LOADER = (UnstructuredFileLoader, {})
+
+ParseResult = namedtuple("ParseResult", ["file_path", "docs", "seconds", "error"])
+
+# Below this many characters a corpus is split inline; starting split workers costs more
+PARALLEL_SPLIT_MIN_CHARS = 2_000_000
+
+class ParseTimeout(Exception):
+    """Raised inside a parse worker when a file exceeds its time budget."""
+
+def _raise_parse_timeout(signum, frame):
+    raise ParseTimeout()
+
+def _init_parse_worker(memory_limit_mb):
+    """
+    Process pool initializer: caps the worker's address space so a single
+    pathological file fails with MemoryError instead of exhausting the host.
+    The cap is added on top of what the freshly started worker already maps.
+    """
+    if not memory_limit_mb:
+        return
+    try:
+        import resource
+        with open("/proc/self/statm") as f:
+            current_bytes = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+        _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+        limit = current_bytes + memory_limit_mb * 1024 * 1024
+        if hard_limit != resource.RLIM_INFINITY:
+            limit = min(limit, hard_limit)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard_limit))
+    except Exception as e:
+        logging.debug(f"Parse worker memory cap not applied: {e}")
+
+def _load_with_mapping(file_path):
+    """Load one file with the loader registered for its extension."""
+    extension = os.path.splitext(file_path)[1].lower()
+    loader_cls, loader_kwargs = LOADER_MAPPING.get(extension, DEFAULT_LOADER)
+    loaded_docs = loader_cls(file_path, **loader_kwargs).load()
+    return [doc for doc in loaded_docs if doc is not None and hasattr(doc, 'page_content') and doc.page_content.strip()]
+
+def _parse_file(file_path, timeout=None, splitter=None):
+    """
+    Parses one file, enforcing a wall-clock timeout with SIGALRM where available.
+    Runs inside a pool worker; errors are returned rather than raised so one bad
+    file never takes the batch down. With a `splitter`, the worker also splits
+    the documents, so chunking runs in parallel with parsing.
+    
+    Returns:
+        ParseResult: The parsed documents (or chunks), parse time and error message (if any)
+    """
+    use_alarm = bool(timeout) and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_parse_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    
+    start_time = time.perf_counter()
+    try:
+        docs, error = _load_with_mapping(file_path), None
+        if splitter is not None:
+            docs = splitter.split_documents(docs)
+    except ParseTimeout:
+        docs, error = [], f"timed out after {timeout}s"
+    except MemoryError:
+        docs, error = [], "exceeded the parse memory limit"
+    except Exception as e:
+        docs, error = [], f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+    
+    return ParseResult(file_path, docs, time.perf_counter() - start_time, error)
+
+def _parse_isolated(file_path, timeout, memory_limit_mb, splitter):
+    """Parses one file alone in a fresh worker, so a crash can only be blamed on that file."""
+    try:
+        with ProcessPoolExecutor(max_workers=1, initializer=_init_parse_worker, initargs=(memory_limit_mb,)) as executor:
+            return executor.submit(_parse_file, file_path, timeout, splitter).result()
+    except BrokenProcessPool:
+        return ParseResult(file_path, [], 0.0, "parse worker crashed")
+
+def iter_load_files(file_paths, max_workers=PARSE_WORKERS, timeout=PARSE_TIMEOUT_SECONDS, memory_limit_mb=PARSE_MEMORY_LIMIT_MB, splitter=None):
+    """
+    Parses files in a process pool, yielding results as each file finishes.
+    Parsing is CPU-bound, so separate processes side-step the GIL. Each file
+    gets its own timeout and the workers run under a memory cap, even when
+    there is only one file to parse. At most 2 * max_workers files are in
+    flight to keep memory bounded.
+    
+    Args:
+        file_paths (list): Files to parse
+        max_workers (int): Number of parse processes
+        timeout (float): Per-file timeout in seconds (0 disables it)
+        memory_limit_mb (int): Per-worker memory cap in MB (0 disables it)
+        splitter (StructuredTextSplitter): Splits each file's documents in the worker
+    
+    Yields:
+        ParseResult: One result per file, in completion order
+    """
+    file_paths = list(file_paths)
+    workers = max(1, min(max_workers, len(file_paths)))
+    # Without a timeout or memory cap to enforce, a worker process only adds start-up cost
+    if workers == 1 and not timeout and not memory_limit_mb:
+        for file_path in file_paths:
+            yield _parse_file(file_path, splitter=splitter)
+        return
+    
+    remaining = iter(file_paths)
+    while True:
+        pending = {}
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker, initargs=(memory_limit_mb,)) as executor:
+                
+                def submit_next():
+                    file_path = next(remaining, None)
+                    if file_path is None:
+                        return False
+                    pending[executor.submit(_parse_file, file_path, timeout, splitter)] = file_path
+                    return True
+                
+                while len(pending) < 2 * workers and submit_next():
+                    pass
+                
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        # Raises BrokenProcessPool if a worker died; the file stays pending until handled below
+                        result = future.result()
+                        pending.pop(future)
+                        yield result
+                        submit_next()
+            return
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory). Keep what finished, then re-parse the other
+            # in-flight files one at a time so only the file that kills its worker fails
+            suspects = []
+            for future, file_path in pending.items():
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    yield future.result()
+                else:
+                    suspects.append(file_path)
+            if len(suspects) == 1:
+                yield ParseResult(suspects[0], [], 0.0, "parse worker crashed")
+                continue
+            for file_path in suspects:
+                yield _parse_isolated(file_path, timeout, memory_limit_mb, splitter)
+
+def load_files(file_paths, **kwargs):
+    """
+    Parses a list of files in parallel and logs per-file parse times.
+    
+    Args:
+        file_paths (list): Files to parse
+        **kwargs: Options forwarded to iter_load_files
+    
+    Returns:
+        list: List of loaded documents
+    """
+    docs = []
+    timings = []
+    for result in iter_load_files(file_paths, **kwargs):
+        timings.append((result.seconds, result.file_path))
+        if result.error:
+            logging.warning(f"Failed to parse {result.file_path} after {result.seconds:.2f}s: {result.error}")
+        else:
+            logging.info(f"Parsed {result.file_path} in {result.seconds:.2f}s ({len(result.docs)} documents).")
+            docs.extend(result.docs)
+    
+    if timings:
+        slowest = ", ".join(f"{os.path.basename(path)} ({seconds:.2f}s)" for seconds, path in sorted(timings, reverse=True)[:5])
+        logging.info(f"Parsed {len(timings)} files in {sum(seconds for seconds, _ in timings):.2f}s of parse time. Slowest: {slowest}")
+    return docs
 
 def load_documents(directory_path=DATA_PATH):
     """
     Loads all documents from a directory.
     Supports various file types (PDF, TXT, MD, etc.) using different loaders.
+    Files are parsed in parallel worker processes with a per-file timeout.
     
     Args:
         directory_path (str): Path to directory containing documents
@@ -37,43 +233,99 @@ def load_documents(directory_path=DATA_PATH):
     logging.info(f"Attempting to load documents from: {directory_path}")
     
     try:
-        # Use DirectoryLoader to automatically detect and load different file types
-        loader = DirectoryLoader(
-            directory_path, 
-            glob="**/*.*", 
-            use_multithreading=True,
-            show_progress=True, 
-            silent_errors=True, 
-            recursive=True
-        )
-        
-        loaded_docs = loader.load()
+        with span("parse"):
+            loaded_docs = load_files(list_data_files(directory_path))
         
         if not loaded_docs:
              logging.warning(f"No documents successfully loaded from {directory_path}. Check files and dependencies ('unstructured', etc.).")
         else:
-            # Clean up any invalid documents
-            loaded_docs = [doc for doc in loaded_docs if doc is not None and hasattr(doc, 'page_content') and doc.page_content.strip()]
             docs.extend(loaded_docs)
             logging.info(f"Loaded {len(docs)} document objects from {directory_path}.")
     except ImportError as ie:
          logging.error(f"ImportError during loading: {ie}. Ensure 'unstructured' and parsers are installed.", exc_info=True)
     except Exception as e:
-        logging.error(f"Error using DirectoryLoader for {directory_path}: {e}", exc_info=True)
+        logging.error(f"Error loading documents from {directory_path}: {e}", exc_info=True)
         
     if not docs:
         logging.warning(f"Finished loading. Zero valid documents loaded from '{directory_path}'.")
         
     return docs
 
-def split_documents(docs, chunk_size=1000, chunk_overlap=200):
+def iter_documents(file_paths, **kwargs):
+    """
+    Lazily loads documents one file at a time.
+    Only the files currently being parsed are held in memory.
+    
+    Args:
+        file_paths (list): Files to load
+        **kwargs: Options forwarded to iter_load_files; pass `splitter` to get chunks instead of documents
+    
+    Yields:
+        tuple: (file_path, docs) for every file that parsed successfully
+    """
+    for result in iter_load_files(file_paths, **kwargs):
+        if result.error:
+            logging.warning(f"Skipping {result.file_path} after {result.seconds:.2f}s: {result.error}")
+            continue
+        logging.info(f"Parsed {result.file_path} in {result.seconds:.2f}s ({len(result.docs)} documents).")
+        yield result.file_path, result.docs
+
+def list_data_files(directory_path=DATA_PATH):
+    """
+    Lists the files under a directory that the loaders would pick up.
+    Mirrors the DirectoryLoader glob ("**/*.*", hidden files skipped).
+    
+    Args:
+        directory_path (str): Path to directory containing documents
+    
+    Returns:
+        list: Sorted list of file paths
+    """
+    files = []
+    if not os.path.isdir(directory_path):
+        return files
+    
+    for root, dirnames, filenames in os.walk(directory_path):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for filename in filenames:
+            if filename.startswith('.') or '.' not in filename:
+                continue
+            files.append(os.path.join(root, filename))
+    
+    return sorted(files)
+
+def _split_batches(docs, batches):
+    """
+    Groups documents into about `batches` lists of similar size for the split
+    workers. Pages of one source stay together and in order.
+    """
+    by_source = {}
+    for doc in docs:
+        by_source.setdefault(doc.metadata.get("source"), []).append(doc)
+    target = sum(len(doc.page_content) for doc in docs) / batches
+    grouped, current, size = [], [], 0
+    for source_docs in by_source.values():
+        current.extend(source_docs)
+        size += sum(len(doc.page_content) for doc in source_docs)
+        if size >= target:
+            grouped.append(current)
+            current, size = [], 0
+    if current:
+        grouped.append(current)
+    return grouped
+
+def split_documents(docs, chunk_tokens=CHUNK_TOKENS, chunk_overlap=CHUNK_OVERLAP_TOKENS, workers=SPLIT_WORKERS):
     """
     Split documents into smaller chunks for better retrieval.
+    Chunks are sized in tokens and follow headings, clauses and paragraphs
+    (see StructuredTextSplitter). Corpora of PARALLEL_SPLIT_MIN_CHARS or more
+    are split in a process pool.
     
     Args:
         docs (list): List of documents to split
-        chunk_size (int): Maximum size of each chunk
-        chunk_overlap (int): Overlap between chunks
+        chunk_tokens (int): Maximum tokens per chunk
+        chunk_overlap (int): Maximum tokens shared by consecutive chunks
+        workers (int): Split processes (1 splits inline)
         
     Returns:
         list: List of document chunks
@@ -83,13 +335,18 @@ def split_documents(docs, chunk_size=1000, chunk_overlap=200):
         return []
         
     try:
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size, 
-            chunk_overlap=chunk_overlap, 
-            length_function=len
-        )
+        text_splitter = StructuredTextSplitter(chunk_tokens=chunk_tokens, overlap_tokens=chunk_overlap)
+        total_chars = sum(len(doc.page_content) for doc in docs)
         
-        splits = text_splitter.split_documents(docs)
+        with span("split"):
+            if workers <= 1 or total_chars < PARALLEL_SPLIT_MIN_CHARS:
+                splits = text_splitter.split_documents(docs)
+            else:
+                splits = []
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    # map() keeps the corpus order, so chunk order does not depend on scheduling
+                    for batch_splits in executor.map(text_splitter.split_documents, _split_batches(docs, 4 * workers)):
+                        splits.extend(batch_splits)
         
         if not splits:
             logging.warning("Document splitting resulted in zero chunks.")
@@ -0,0 +1,208 @@
+"""
+Persistent embedding cache for the RAG application
+"""
+
+import os
+import copy
+import sqlite3
+import hashlib
+import logging
+import threading
+import time
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_BATCH_SIZE = 500
+
+def text_hash(text):
+    """Return the SHA-256 hex digest used as the cache key for a chunk of text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that stores vectors in a local SQLite file.
+    Vectors are keyed by (model name, sha256 of the text) and kept as raw float32
+    blobs, so rebuilding an index over a mostly unchanged corpus only calls the
+    underlying model for text it has never seen. The least recently used entries
+    are evicted once the cache grows past max_entries.
+    """
+
+    def __init__(self, underlying, model_name, cache_path, max_entries=500000):
+        """
+        Args:
+            underlying (Embeddings): The embeddings model to call on a cache miss
+            model_name (str): Name of the model, part of the cache key
+            cache_path (str): Path of the SQLite cache file
+            max_entries (int): Maximum number of cached vectors before eviction
+        """
+        self.underlying = underlying
+        self.model_name = model_name
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, text_hash)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        # Upper bound on the row count, so inserts do not scan the table to decide on eviction
+        self._entries = self._count()
+
+    def with_underlying(self, underlying):
+        """
+        Returns a view of this cache that calls another model on a miss. It
+        shares the SQLite connection and lock, so both see the same entries.
+
+        Args:
+            underlying (Embeddings): The embeddings model to call on a cache miss
+        """
+        view = copy.copy(self)
+        view.underlying = underlying
+        return view
+
+    def _count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _lookup(self, hashes):
+        """Fetch cached vectors for the given hashes and refresh their LRU timestamp."""
+        found = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(hashes), _LOOKUP_BATCH_SIZE):
+                batch = hashes[start:start + _LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.model_name, *batch]
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, self.model_name, key) for key in found]
+                )
+                self._conn.commit()
+        return found
+
+    def _store(self, vectors_by_hash):
+        """Insert new vectors and evict the least recently used ones if over the cap."""
+        now = time.time()
+        rows = [
+            (self.model_name, key, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in vectors_by_hash.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            # Replaced rows and other processes sharing the file make this an estimate; _evict() recounts
+            self._entries += len(rows)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Trim the cache to 90% of max_entries so eviction does not run on every insert."""
+        if not self.max_entries or self._entries <= self.max_entries:
+            return
+        count = self._entries = self._count()
+        if count <= self.max_entries:
+            return
+        excess = count - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE (model, text_hash) IN ("
+            " SELECT model, text_hash FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,)
+        )
+        self._entries = count - excess
+        logging.info(f"Embedding cache evicted {excess} least recently used entries.")
+
+    def embed_documents(self, texts):
+        """
+        Embeds a list of texts, calling the underlying model only for cache misses.
+
+        Args:
+            texts (list): Texts to embed
+
+        Returns:
+            list: One vector per input text
+        """
+        hashes = [text_hash(text) for text in texts]
+        cached = self._lookup(list(set(hashes)))
+
+        # Duplicate texts within one call are embedded once
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            new_vectors = self.underlying.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), new_vectors))
+            self._store(fresh)
+            cached.update(fresh)
+
+        if len(texts) > 1:
+            logging.info(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses for {len(texts)} texts.")
+        return [cached[key] for key in hashes]
+
+    def embed_query(self, text):
+        """
+        Embeds a single query, using the cache for repeated questions.
+
+        Args:
+            text (str): Query text
+
+        Returns:
+            list: The query vector
+        """
+        key = text_hash(text)
+        cached = self._lookup([key])
+        if key in cached:
+            with self._lock:
+                self.hits += 1
+            return cached[key]
+
+        with self._lock:
+            self.misses += 1
+        vector = self.underlying.embed_query(text)
+        self._store({key: vector})
+        return vector
+
+    def stats(self):
+        """
+        Returns cache statistics.
+
+        Returns:
+            dict: hits, misses, hit_rate and number of stored entries
+        """
+        with self._lock:
+            entries = self._entries = self._count()
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": entries,
+            }
@@ -0,0 +1,208 @@
+"""
+Concurrent, rate-limited embedding of document chunks during ingestion
+"""
+
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from ..utils.config import (
+    EMBEDDING_WORKERS,
+    EMBEDDING_BATCH_TOKENS,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_REQUESTS_PER_MINUTE,
+    EMBEDDING_TOKENS_PER_MINUTE,
+    EMBEDDING_MAX_RETRIES
+)
+from ..utils.tokens import count_tokens
+
+class TokenBucket:
+    """
+    Thread-safe token bucket used to stay under a per-minute quota.
+    The bucket holds at most one minute's worth of capacity and refills continuously.
+    """
+
+    def __init__(self, per_minute):
+        """
+        Args:
+            per_minute (int): Allowed amount per minute; 0 or None disables limiting
+        """
+        self.capacity = float(per_minute or 0)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """
+        Blocks until `amount` units are available, then consumes them.
+
+        Args:
+            amount (float): Units to consume (clamped to the bucket capacity)
+        """
+        if not self.capacity:
+            return
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                wait_seconds = (amount - self.available) / self.rate
+            time.sleep(wait_seconds)
+
+def pack_batches(texts, max_batch_tokens=EMBEDDING_BATCH_TOKENS, max_batch_size=EMBEDDING_BATCH_SIZE):
+    """
+    Packs texts into consecutive batches bounded by token count and number of inputs.
+
+    Args:
+        texts (list): Texts to embed
+        max_batch_tokens (int): Maximum total tokens per batch
+        max_batch_size (int): Maximum number of texts per batch
+
+    Returns:
+        list: List of (indices, token_count) tuples, one per batch
+    """
+    batches = []
+    indices, batch_tokens = [], 0
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if indices and (batch_tokens + tokens > max_batch_tokens or len(indices) >= max_batch_size):
+            batches.append((indices, batch_tokens))
+            indices, batch_tokens = [], 0
+        indices.append(i)
+        batch_tokens += tokens
+    if indices:
+        batches.append((indices, batch_tokens))
+    return batches
+
+def is_rate_limit_error(error):
+    """Return True if an exception is an HTTP 429 from the embeddings API."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+def _retry_after_seconds(error):
+    """Read the Retry-After header of a 429 response, if the server sent one."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class EmbeddingScheduler:
+    """
+    Embeds chunks in token-bounded batches on a pool of worker threads.
+    Requests and tokens per minute are throttled with token buckets, 429 responses
+    are retried with exponential backoff, and finished batches are yielded as soon
+    as they complete so callers can add them to the index while others are in flight.
+    """
+
+    def __init__(
+        self,
+        embeddings_model,
+        max_workers=EMBEDDING_WORKERS,
+        max_batch_tokens=EMBEDDING_BATCH_TOKENS,
+        max_batch_size=EMBEDDING_BATCH_SIZE,
+        requests_per_minute=EMBEDDING_REQUESTS_PER_MINUTE,
+        tokens_per_minute=EMBEDDING_TOKENS_PER_MINUTE,
+        max_retries=EMBEDDING_MAX_RETRIES,
+        base_delay=1.0,
+        max_delay=60.0
+    ):
+        """
+        Args:
+            embeddings_model: The embeddings model to call
+            max_workers (int): Number of concurrent embedding requests
+            max_batch_tokens (int): Maximum tokens per request
+            max_batch_size (int): Maximum texts per request
+            requests_per_minute (int): Request quota (0 disables the limit)
+            tokens_per_minute (int): Token quota (0 disables the limit)
+            max_retries (int): Retries for a batch that keeps hitting 429
+            base_delay (float): First backoff delay in seconds
+            max_delay (float): Upper bound on a single backoff delay
+        """
+        self.embeddings_model = embeddings_model
+        self.max_workers = max(1, max_workers)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+
+    def _embed_batch(self, texts, token_count):
+        """Embed one batch, respecting the rate limits and retrying on 429."""
+        attempt = 0
+        while True:
+            self.request_bucket.acquire(1)
+            self.token_bucket.acquire(token_count)
+            try:
+                return self.embeddings_model.embed_documents(texts)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                delay = _retry_after_seconds(e)
+                if delay is None:
+                    delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+                    delay *= random.uniform(0.5, 1.0)
+                attempt += 1
+                self.retries += 1
+                logging.warning(f"Embedding request rate limited; retry {attempt}/{self.max_retries} in {delay:.2f}s.")
+                time.sleep(delay)
+
+    def iter_embeddings(self, texts):
+        """
+        Embeds texts concurrently, yielding batches in completion order.
+        At most 2 * max_workers batches are in flight, so memory stays bounded
+        even for very large inputs.
+
+        Args:
+            texts (list): Texts to embed
+
+        Yields:
+            tuple: (indices, vectors) where indices refer to positions in `texts`
+        """
+        batches = iter(pack_batches(texts, self.max_batch_tokens, self.max_batch_size))
+        start_time = time.time()
+        embedded = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="embed") as executor:
+            pending = {}
+
+            def submit_next():
+                batch = next(batches, None)
+                if batch is None:
+                    return False
+                indices, token_count = batch
+                future = executor.submit(self._embed_batch, [texts[i] for i in indices], token_count)
+                pending[future] = indices
+                return True
+
+            while len(pending) < 2 * self.max_workers and submit_next():
+                pass
+
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        indices = pending.pop(future)
+                        vectors = future.result()
+                        embedded += len(indices)
+                        yield indices, vectors
+                        submit_next()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        elapsed = time.time() - start_time
+        if embedded:
+            logging.info(f"Embedded {embedded} chunks in {elapsed:.2f}s ({embedded / max(elapsed, 1e-9):.1f} chunks/s, {self.retries} rate-limit retries).")
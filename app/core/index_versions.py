@@ -0,0 +1,210 @@
+"""
+Versioned index directories published by an atomic pointer swap
+"""
+
+import os
+import time
+import uuid
+import shutil
+import sqlite3
+import logging
+from contextlib import closing
+from langchain_core.documents import Document
+from ..utils.config import INDEX_KEEP_VERSIONS
+
+# Every build is written to <vectorstore_path>/versions/<version>/; the CURRENT
+# file names the version being served. A directory without CURRENT holds a
+# single unversioned store (the layout before versioning), served as it is.
+VERSIONS_DIRNAME = "versions"
+CURRENT_FILENAME = "CURRENT"
+# Suffix of a version still being built; it is renamed once the build finishes
+STAGING_SUFFIX = ".staging"
+
+def _versions_dir(vectorstore_path):
+    return os.path.join(vectorstore_path, VERSIONS_DIRNAME)
+
+def current_version(vectorstore_path):
+    """
+    Returns the name of the published version, or None.
+
+    Args:
+        vectorstore_path (str): Root directory of the vector store
+    """
+    try:
+        with open(os.path.join(vectorstore_path, CURRENT_FILENAME), "r", encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    if not name or not os.path.isdir(os.path.join(_versions_dir(vectorstore_path), name)):
+        logging.error(f"{CURRENT_FILENAME} in {vectorstore_path} names a missing index version '{name}'.")
+        return None
+    return name
+
+def resolve_index_path(vectorstore_path):
+    """
+    Returns the directory of the index to serve: the published version, or the
+    root itself for an unversioned store.
+
+    Args:
+        vectorstore_path (str): Root directory of the vector store
+    """
+    name = current_version(vectorstore_path)
+    return os.path.join(_versions_dir(vectorstore_path), name) if name else vectorstore_path
+
+def _copy_file(src, dst):
+    """
+    Seeds a file of the next version. SQLite files are changed in place and
+    keep committed pages in their WAL, so they are copied through the backup
+    API; every other index file is only ever replaced by a rename, so a hard
+    link is enough and costs no space.
+    """
+    if src.endswith(".sqlite"):
+        with closing(sqlite3.connect(src)) as source, closing(sqlite3.connect(dst)) as target:
+            source.backup(target)
+        return dst
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+def stage_version(vectorstore_path):
+    """
+    Creates the directory of the next index version, seeded with the files of
+    the one being served so an incremental build only processes what changed.
+    A build interrupted after the version being served was published is
+    resumed from its last checkpoint instead. Serving is unaffected until the
+    version is published.
+
+    Args:
+        vectorstore_path (str): Root directory of the vector store
+
+    Returns:
+        str: The staging directory to build into
+    """
+    current = current_version(vectorstore_path)
+    if os.path.isdir(_versions_dir(vectorstore_path)):
+        interrupted = sorted(
+            name for name in os.listdir(_versions_dir(vectorstore_path))
+            if name.endswith(STAGING_SUFFIX) and (current is None or name > current)
+        )
+        if interrupted:
+            logging.info(f"Resuming interrupted index version {interrupted[-1][:-len(STAGING_SUFFIX)]}.")
+            return os.path.join(_versions_dir(vectorstore_path), interrupted[-1])
+
+    # Names sort in creation order, which is how pruning tells older versions from newer ones
+    now = time.time()
+    name = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))}.{int(now % 1 * 1e6):06d}-{uuid.uuid4().hex[:6]}"
+    staging_path = os.path.join(_versions_dir(vectorstore_path), name + STAGING_SUFFIX)
+    source = resolve_index_path(vectorstore_path)
+
+    def ignore(directory, names):
+        skipped = [n for n in names if n.endswith((".tmp", "-wal", "-shm"))]
+        if os.path.samefile(directory, vectorstore_path):
+            skipped += [n for n in names if n in (VERSIONS_DIRNAME, CURRENT_FILENAME)]
+        return skipped
+
+    os.makedirs(_versions_dir(vectorstore_path), exist_ok=True)
+    if os.path.isdir(source) and set(os.listdir(source)) - {VERSIONS_DIRNAME, CURRENT_FILENAME}:
+        shutil.copytree(source, staging_path, ignore=ignore, copy_function=_copy_file)
+        logging.info(f"Staged index version {name} from {source}.")
+    else:
+        os.makedirs(staging_path)
+        logging.info(f"Staged index version {name}.")
+    return staging_path
+
+def finish_version(staging_path):
+    """
+    Marks a staged build as complete; it is still not served until published.
+
+    Args:
+        staging_path (str): Directory returned by stage_version
+
+    Returns:
+        str: The directory of the finished version
+    """
+    version_path = staging_path[:-len(STAGING_SUFFIX)]
+    os.replace(staging_path, version_path)
+    return version_path
+
+def verify_vector_store(vectorstore):
+    """
+    Checks a freshly loaded index before it is published: every shard has
+    vectors, as many vectors as chunk positions, and the first and last
+    positions resolve to stored chunks.
+
+    Args:
+        vectorstore: A FAISS or sharded vector store
+
+    Returns:
+        bool: True if the index is safe to serve
+    """
+    if vectorstore is None:
+        return False
+    stores = getattr(vectorstore, "shards", None) or {"index": vectorstore}
+    for name, store in stores.items():
+        ntotal = store.index.ntotal
+        positions = store.index_to_docstore_id
+        if ntotal == 0 or ntotal != len(positions):
+            logging.error(f"Index {name} has {ntotal} vectors for {len(positions)} chunk positions.")
+            return False
+        for pos in (0, ntotal - 1):
+            if not isinstance(store.docstore.search(positions[pos]), Document):
+                logging.error(f"Index {name}: chunk {positions[pos]} at position {pos} is missing from the docstore.")
+                return False
+    return True
+
+def publish_version(vectorstore_path, version_path):
+    """
+    Makes a finished version the one served: CURRENT is rewritten under a
+    temporary name and renamed over the old pointer, so readers see either
+    the previous version or the new one, never a mix.
+
+    Args:
+        vectorstore_path (str): Root directory of the vector store
+        version_path (str): Directory returned by finish_version
+    """
+    pointer = os.path.join(vectorstore_path, CURRENT_FILENAME)
+    with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+        f.write(os.path.basename(version_path) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer + ".tmp", pointer)
+    # Persist the rename itself; not every platform can open a directory
+    try:
+        fd = os.open(vectorstore_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+    logging.info(f"Published index version {os.path.basename(version_path)}.")
+
+def discard_version(path):
+    """Deletes a staged or finished version that failed to build or verify."""
+    shutil.rmtree(path, ignore_errors=True)
+    logging.info(f"Discarded index version {os.path.basename(path)}.")
+
+def prune_versions(vectorstore_path, keep=INDEX_KEEP_VERSIONS):
+    """
+    Deletes versions older than the published one, keeping `keep - 1` of them
+    for rollback, and staging directories left by crashed builds. Newer
+    directories may belong to a build in progress, or one to resume, and are
+    left alone. On
+    POSIX, files still open or memory-mapped by a retiring index stay
+    readable until it is closed.
+
+    Args:
+        vectorstore_path (str): Root directory of the vector store
+        keep (int): Published versions to keep, including the current one
+    """
+    current = current_version(vectorstore_path)
+    if current is None:
+        return
+    older = sorted(name for name in os.listdir(_versions_dir(vectorstore_path)) if name < current)
+    staged = [name for name in older if name.endswith(STAGING_SUFFIX)]
+    finished = [name for name in older if not name.endswith(STAGING_SUFFIX)]
+    for name in staged + finished[:max(0, len(finished) - (keep - 1))]:
+        shutil.rmtree(os.path.join(_versions_dir(vectorstore_path), name), ignore_errors=True)
+        logging.info(f"Removed old index version {name}.")
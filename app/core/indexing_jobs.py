@@ -0,0 +1,202 @@
+"""
+Background indexing jobs with progress reporting
+"""
+
+import time
+import uuid
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from ..utils.config import DATA_PATH, INDEX_JOB_HISTORY
+from .resources import get_shared_resources
+from .sharding import update_configured_vector_store
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+class IndexJob:
+    """One indexing run: its state, and how far it has got while running."""
+
+    def __init__(self, directory_path):
+        self.id = uuid.uuid4().hex[:12]
+        self.directory_path = directory_path
+        self.state = QUEUED
+        self.stage = None
+        self.done = 0
+        self.total = 0
+        self.error = None
+        self.generation = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._finished = threading.Event()
+
+    def report(self, stage, done, total):
+        """Progress callback handed to the indexing functions."""
+        self.stage, self.done, self.total = stage, done, total
+
+    @property
+    def finished(self):
+        return self._finished.is_set()
+
+    @property
+    def fraction(self):
+        """Share of files indexed so far, between 0 and 1."""
+        if self.state == SUCCEEDED:
+            return 1.0
+        return self.done / self.total if self.total else 0.0
+
+    def describe(self):
+        """One-line status for the UI, e.g. "Indexing: 3/10 files"."""
+        if self.state == QUEUED:
+            return "Waiting for the indexer..."
+        if self.state == RUNNING:
+            if self.stage is None:
+                return "Preparing a new index version..."
+            if self.stage.startswith("save"):
+                return "Saving and verifying the new index..."
+            return f"Indexing ({self.stage}): {self.done}/{self.total} files"
+        return "Indexing complete." if self.state == SUCCEEDED else f"Indexing failed: {self.error}"
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the job has finished.
+
+        Returns:
+            bool: True if it finished within the timeout
+        """
+        return self._finished.wait(timeout)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "state": self.state,
+            "stage": self.stage,
+            "done": self.done,
+            "total": self.total,
+            "error": self.error,
+            "generation": self.generation,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+class IndexingWorker:
+    """
+    Runs indexing jobs one at a time on a background thread, so the request
+    or Streamlit session that asked for a re-index returns at once and polls
+    the job for progress. Each job incrementally indexes its directory into
+    a new index version (see SharedResources.reindex), which every session
+    starts using once it is published.
+    """
+
+    def __init__(self, resources, history=INDEX_JOB_HISTORY):
+        """
+        Args:
+            resources (SharedResources): Models and index the jobs rebuild
+            history (int): Finished jobs kept for status queries
+        """
+        self.resources = resources
+        self.history = history
+        self._jobs = OrderedDict()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, directory_path=DATA_PATH):
+        """
+        Queues an incremental re-index of a directory. A job for the same
+        directory that has not started yet already covers every change made
+        until it runs, so it is returned instead of queueing another.
+
+        Args:
+            directory_path (str): Directory to index
+
+        Returns:
+            IndexJob: The queued job
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.state == QUEUED and job.directory_path == directory_path:
+                    return job
+            job = IndexJob(directory_path)
+            self._jobs[job.id] = job
+            self._trim()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="indexer", daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+        logging.info(f"Queued indexing job {job.id} for {directory_path}.")
+        return job
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond the history size; the lock must be held."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Returns a job by ID, or None if unknown or forgotten."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        """Returns the known jobs, oldest first."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self._execute(job)
+
+    def _execute(self, job):
+        # Under the lock, so submit() never hands out a job that has already started reading the directory
+        with self._lock:
+            job.state = RUNNING
+            job.started_at = time.time()
+        logging.info(f"Indexing job {job.id} started.")
+        try:
+            indexed = self.resources.reindex(
+                lambda embeddings_model, vectorstore_path: update_configured_vector_store(
+                    embeddings_model, job.directory_path, vectorstore_path, progress=job.report
+                )
+            )
+            job.state = SUCCEEDED if indexed else FAILED
+            if not indexed:
+                job.error = "the new index could not be built or verified. Check logs."
+        except Exception as e:
+            logging.error(f"Indexing job {job.id} failed: {e}", exc_info=True)
+            job.state, job.error = FAILED, str(e)
+        finally:
+            job.finished_at = time.time()
+            job.generation = self.resources.stats()["generation"]
+            logging.info(f"Indexing job {job.id} {job.state} in {job.finished_at - job.started_at:.1f}s.")
+            job._finished.set()
+            with self._lock:
+                self._trim()
+
+    def shutdown(self):
+        """Stops the worker thread after the jobs already queued."""
+        self._queue.put(None)
+
+_indexing_worker = None
+_indexing_worker_lock = threading.Lock()
+
+def get_indexing_worker():
+    """
+    Returns the process-wide indexing worker, shared by every chat session.
+
+    Returns:
+        IndexingWorker: The worker
+    """
+    global _indexing_worker
+    with _indexing_worker_lock:
+        if _indexing_worker is None:
+            _indexing_worker = IndexingWorker(get_shared_resources())
+        return _indexing_worker
@@ -5,23 +5,94 @@ Language model and embeddings handling for the RAG application
 import os
 import logging
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from ..utils.config import LLM_MODEL, EMBEDDING_MODEL
+from ..utils.config import (
+    LLM_MODEL,
+    EMBEDDING_MODEL,
+    LOCAL_EMBEDDING_DIM,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MAX_ENTRIES
+)
+from .embedding_cache import CachedEmbeddings
+from .local_embeddings import HashingEmbeddings
 
-def get_embeddings_model():
+# EMBEDDING_MODEL value that selects the local hashed n-gram embeddings
+LOCAL_EMBEDDING_MODEL = "local-hash"
+
+def get_embeddings_model(model=EMBEDDING_MODEL):
     """
-    Creates an OpenAI embeddings model.
+    Creates the embeddings model selected by EMBEDDING_MODEL.
     This is used to convert text into vectors.
+    "local-hash" embeds in-process and needs no API key or network; any other
+    value is an OpenAI embeddings model, whose vectors are cached on disk so
+    unchanged chunks are never embedded twice.
+
+    Args:
+        model (str): "local-hash" or an OpenAI embeddings model name
     """
     try:
+        if model == LOCAL_EMBEDDING_MODEL:
+            embeddings = HashingEmbeddings(dim=LOCAL_EMBEDDING_DIM)
+            logging.info(f"Initialized local embeddings: {embeddings.backend}")
+            # Computing a local vector is cheaper than looking it up in the cache
+            return embeddings
+
         if not os.getenv("OPENAI_API_KEY"):
             raise ValueError("Missing OpenAI API Key")
-        embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL)
-        logging.info(f"Initialized OpenAI embeddings: {EMBEDDING_MODEL}")
+        embeddings = OpenAIEmbeddings(model=model)
+        logging.info(f"Initialized OpenAI embeddings: {model}")
+        if EMBEDDING_CACHE_ENABLED:
+            embeddings = CachedEmbeddings(
+                embeddings,
+                model_name=model,
+                cache_path=EMBEDDING_CACHE_PATH,
+                max_entries=EMBEDDING_CACHE_MAX_ENTRIES
+            )
+            logging.info(f"Embedding cache enabled at {EMBEDDING_CACHE_PATH}")
         return embeddings
     except Exception as e:
         logging.error(f"Failed to initialize embeddings model: {e}")
         raise
 
+def embedding_backend(embeddings_model):
+    """
+    Identifies the vector space an embeddings model produces. It is recorded in
+    the index manifest, and an index is only loaded with a matching model.
+
+    Args:
+        embeddings_model: The embeddings model
+
+    Returns:
+        str: e.g. "openai:text-embedding-3-small", or None for unknown models
+    """
+    if isinstance(embeddings_model, CachedEmbeddings):
+        return embedding_backend(embeddings_model.underlying)
+    if isinstance(embeddings_model, OpenAIEmbeddings):
+        dimensions = f":dim={embeddings_model.dimensions}" if embeddings_model.dimensions else ""
+        return f"openai:{embeddings_model.model}{dimensions}"
+    return getattr(embeddings_model, "backend", None)
+
+def without_client_retries(embeddings_model):
+    """
+    Returns the embeddings model with the OpenAI client's own retries turned
+    off, for EmbeddingScheduler, which retries rate-limited batches itself
+    (honouring Retry-After) and would otherwise have the SDK's backoff stacked
+    underneath. Queries keep using the original model and its retries.
+
+    Args:
+        embeddings_model: The embeddings model
+
+    Returns:
+        A copy of the model that does not retry, or the model itself if it has no client retries
+    """
+    if isinstance(embeddings_model, CachedEmbeddings):
+        underlying = without_client_retries(embeddings_model.underlying)
+        return embeddings_model if underlying is embeddings_model.underlying else embeddings_model.with_underlying(underlying)
+    if isinstance(embeddings_model, OpenAIEmbeddings) and embeddings_model.max_retries:
+        # Rebuilt rather than copied: the client is created with its retry count at construction
+        return OpenAIEmbeddings(**{**embeddings_model.model_dump(), "max_retries": 0})
+    return embeddings_model
+
 def get_llm(streaming=False, temperature=0.7):
     """
     Creates an OpenAI language model.
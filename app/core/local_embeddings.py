@@ -0,0 +1,96 @@
+"""
+Local embeddings backend: feature-hashed word and character n-grams
+"""
+
+import re
+import math
+import zlib
+from functools import lru_cache
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Bumped whenever the features or hashing change, so indexes built by an older
+# scheme are detected as incompatible at load time
+HASHING_SCHEME_VERSION = 1
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+@lru_cache(maxsize=1 << 18)
+def _bucket(feature, dim, seed):
+    """Bucket and sign of one feature; a stable CRC keeps vectors identical across processes."""
+    h = zlib.crc32(feature.encode("utf-8"), seed)
+    return h % dim, 1.0 if h & 0x80000000 else -1.0
+
+def _features(text, char_ngrams):
+    """
+    Weighted features of a text: words, word bigrams and the character
+    n-grams of each word, which keep misspellings and inflections close.
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    counts = {}
+    for word in words:
+        counts[word] = counts.get(word, 0) + 1.0
+    for left, right in zip(words, words[1:]):
+        bigram = f"{left} {right}"
+        counts[bigram] = counts.get(bigram, 0) + 1.0
+    if char_ngrams:
+        for word in words:
+            padded = f"<{word}>"
+            # A word's n-grams together weigh as much as the word itself
+            grams = [padded[i:i + char_ngrams] for i in range(max(len(padded) - char_ngrams + 1, 1))]
+            weight = 1.0 / len(grams)
+            for gram in grams:
+                key = "#" + gram
+                counts[key] = counts.get(key, 0) + weight
+    return counts
+
+class HashingEmbeddings(Embeddings):
+    """
+    Embeds text without a model or network: n-gram features are hashed with a
+    random sign into `dim` buckets, which is a sparse random projection of the
+    (unbounded) n-gram count vector. Term counts are damped with 1 + log(tf)
+    and vectors are L2-normalized, so inner product and L2 distance rank like
+    cosine similarity.
+
+    Output is deterministic for a given (dim, char_ngrams, seed), which is
+    recorded as `backend` in the index manifest.
+    """
+
+    def __init__(self, dim=512, char_ngrams=3, seed=0, batch_size=256):
+        """
+        Args:
+            dim (int): Vector dimension
+            char_ngrams (int): Length of the character n-grams, 0 for words only
+            seed (int): Hash seed; a different seed gives an incompatible space
+            batch_size (int): Texts encoded per NumPy batch
+        """
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+        self.seed = seed
+        self.batch_size = batch_size
+        self.backend = f"local-hash:v{HASHING_SCHEME_VERSION}:dim={dim}:char={char_ngrams}:seed={seed}"
+
+    def _encode(self, texts):
+        """Encodes a batch into an (n, dim) float32 matrix with one scatter-add."""
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            for feature, count in _features(text, self.char_ngrams).items():
+                bucket, sign = _bucket(feature, self.dim, self.seed)
+                rows.append(row)
+                cols.append(bucket)
+                # Sublinear term frequency; fractional n-gram weights are used as they are
+                values.append(sign * (1.0 + math.log(count)) if count >= 1 else sign * count)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), np.asarray(values, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def embed_documents(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._encode(texts[start:start + self.batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text):
+        return self._encode([text])[0].tolist()
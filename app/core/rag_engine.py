@@ -2,17 +2,372 @@
 Core RAG (Retrieval Augmented Generation) implementation
 """
 
+import re
+import time
+import asyncio
 import logging
-from langchain.memory import ConversationBufferMemory
-from langchain.chains import ConversationalRetrievalChain
-from langchain_core.runnables import RunnablePassthrough
+import threading
+from collections import OrderedDict
+from contextlib import aclosing
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.messages import get_buffer_string
 from ..config.prompts import (
     CONDENSE_QUESTION_PROMPT,
     ANSWER_PROMPT,
     RAG_ONLY_ANSWER_PROMPT
 )
+from ..utils.config import (
+    ANSWER_CACHE_ENABLED,
+    LOW_LATENCY_MODE,
+    SPECULATIVE_REUSE_THRESHOLD,
+    CONTEXT_PACKING,
+    CHAT_MEMORY_WINDOW_TURNS
+)
+from ..utils.metrics import REQUESTS, ANSWER_CACHE_LOOKUPS, TIME_TO_FIRST_TOKEN_SECONDS, annotate, current_trace, end_trace, span, start_trace
+from ..utils.tokens import count_tokens
+from .answer_cache import get_answer_cache
+from .chat_memory import format_chat_history
+from .context_builder import build_context
+from .vector_store import get_index_version, get_retriever
+
+def format_docs(docs):
+    """Join retrieved chunks into the prompt context."""
+    return "\n\n".join(doc.page_content for doc in docs)
+
+def build_prompt_context(docs, question, packing=CONTEXT_PACKING):
+    """Pack retrieved chunks into the token budget, or join them verbatim when packing is off."""
+    with span("context"):
+        if not packing:
+            context = format_docs(docs)
+            if current_trace() is not None:
+                annotate(context_tokens=count_tokens(context))
+            return context
+        context, stats = build_context(docs, question)
+    annotate(context_tokens=stats["tokens_after"], context_tokens_saved=stats["tokens_saved"])
+    return context
+
+# Words that make a follow-up depend on earlier turns ("what about it?", "and the other one?")
+_CONTEXT_DEPENDENT_WORDS = {
+    "it", "its", "it's", "this", "that", "these", "those", "they", "them", "their",
+    "he", "she", "him", "her", "his", "hers", "one", "ones", "same", "above", "previous",
+    "former", "latter", "else", "also", "too", "more", "other", "another", "again", "there"
+}
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "do", "does", "did", "of", "to", "in",
+    "on", "for", "and", "or", "what", "how", "which", "who", "when", "where", "why", "can", "i",
+    "my", "me", "you", "your", "we", "our", "with", "about", "please", "tell", "explain"
+}
+_MIN_SELF_CONTAINED_WORDS = 5
+
+# Event loop running the async pipeline on behalf of synchronous callers
+_sync_loop = None
+_sync_loop_lock = threading.Lock()
+
+def _background_loop():
+    """Returns the shared event loop thread, starting it on first use."""
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="rag-event-loop", daemon=True).start()
+        return _sync_loop
+
+def _run_sync(coroutine):
+    """Runs a coroutine on the shared event loop and waits for its result."""
+    return asyncio.run_coroutine_threadsafe(coroutine, _background_loop()).result()
+
+def _iterate_sync(async_generator):
+    """
+    Iterates an async generator from synchronous code. Closing the returned
+    generator early closes the async one, which cancels the generation.
+    """
+    loop = _background_loop()
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(async_generator.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        asyncio.run_coroutine_threadsafe(async_generator.aclose(), loop).result()
+
+def _words(text):
+    return re.findall(r"[a-z0-9][a-z0-9'\-]*", text.lower())
+
+def _content_words(text):
+    return {word for word in _words(text) if word not in _STOPWORDS}
+
+def is_self_contained(query):
+    """
+    Heuristically decides whether a follow-up can be answered without condensing it.
+    Questions long enough to carry their own subject and free of pronouns or
+    back-references are treated as standalone.
+    """
+    words = _words(query)
+    return len(words) >= _MIN_SELF_CONTAINED_WORDS and not any(word in _CONTEXT_DEPENDENT_WORDS for word in words)
+
+def heuristic_rewrite(query, chat_history):
+    """Cheap stand-in for condensation: append the previous question's content words to the follow-up."""
+    if not chat_history:
+        return query
+    query_words = _content_words(query)
+    previous_words = [word for word in _words(chat_history[-1][0]) if word not in _STOPWORDS and word not in query_words]
+    if not previous_words:
+        return query
+    return f"{query} {' '.join(dict.fromkeys(previous_words))}"
+
+def question_similarity(a, b):
+    """Jaccard overlap of the content words of two questions."""
+    words_a, words_b = _content_words(a), _content_words(b)
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+async def _alookup_cached_answer(query, chat_history, vectorstore, chatgpt_enabled):
+    """
+    Checks the answer cache before running retrieval and generation.
+    RAG+LLM answers depend on the conversation, so they are only cached for
+    the first question of a chat; RAG-only answers ignore history and are
+    always cacheable.
+    
+    Returns:
+        tuple: (cached answer or None, cache entry to fill via _store_answer or None)
+    """
+    if not ANSWER_CACHE_ENABLED or (chatgpt_enabled and chat_history):
+        return None, None
+    
+    cache = get_answer_cache()
+    mode = "rag_llm" if chatgpt_enabled else "rag_only"
+    index_version = get_index_version(vectorstore)
+    aembed_query = getattr(getattr(vectorstore, "embeddings", None), "aembed_query", None)
+    
+    with span("cache_lookup"):
+        answer, query_embedding = await cache.aget(query, mode, index_version, aembed_query=aembed_query)
+    result = "miss" if answer is None else "exact" if query_embedding is None else "similar"
+    ANSWER_CACHE_LOOKUPS.inc(result=result)
+    annotate(cache=result)
+    if answer is not None:
+        logging.info("Answer served from cache.")
+    return answer, (cache, query, mode, index_version, query_embedding)
+
+def _store_answer(cache_entry, answer):
+    """Stores a successfully generated answer in the cache."""
+    if cache_entry is None or not answer:
+        return
+    cache, query, mode, index_version, query_embedding = cache_entry
+    cache.put(query, mode, index_version, answer, query_embedding=query_embedding)
+
+def _replay_answer(answer):
+    """Yields a cached answer word by word so the streaming UI path is unchanged."""
+    for piece in re.findall(r"\S+\s*|\s+", answer):
+        yield piece
+
+class RagEngine:
+    """
+    Retrieval and generation pipelines compiled once for a given
+    (vector store version, LLM, mode). The retriever, prompts and LCEL chains
+    are built in the constructor; per-request methods only bind the query and
+    the chat history.
+    """
+    
+    def __init__(self, vectorstore, llm, chatgpt_enabled=True, k=5, low_latency=LOW_LATENCY_MODE, packing=CONTEXT_PACKING):
+        """
+        Args:
+            vectorstore: The vector store for document retrieval
+            llm: The language model to use
+            chatgpt_enabled (bool): Whether to use ChatGPT knowledge
+            k (int): Number of chunks to retrieve
+            low_latency (bool): Retrieve speculatively while condensing follow-up questions
+            packing (bool): De-duplicate, diversify and token-budget the retrieved context
+        """
+        self.llm = llm
+        self.chatgpt_enabled = chatgpt_enabled
+        self.low_latency = low_latency
+        self.packing = packing
+        self.retriever = get_retriever(vectorstore, k=k)
+        
+        if chatgpt_enabled:
+            self.condense_chain = CONDENSE_QUESTION_PROMPT | llm | StrOutputParser()
+            self.answer_chain = ANSWER_PROMPT | llm | StrOutputParser()
+        else:
+            self.answer_chain = (
+                {"context": RunnableLambda(self.aretrieve_context), "question": RunnablePassthrough()}
+                | RAG_ONLY_ANSWER_PROMPT
+                | llm
+                | StrOutputParser()
+            )
+    
+    async def aretrieve(self, question, stage="retrieve"):
+        """Retrieve chunks for a question, timed as a trace stage."""
+        with span(stage):
+            return await self.retriever.ainvoke(question)
+    
+    async def aretrieve_context(self, question):
+        """Retrieve chunks for a question and build the prompt context from them."""
+        return build_prompt_context(await self.aretrieve(question), question, packing=self.packing)
+    
+    async def astandalone_question(self, query, history_text):
+        """Rephrase a follow-up question into a standalone one (first questions pass through)."""
+        if not history_text:
+            return query
+        with span("condense"):
+            standalone_question = await self.condense_chain.ainvoke({"question": query, "chat_history": history_text})
+        logging.info(f"Standalone question: {standalone_question}")
+        return standalone_question
+    
+    async def ahistory_text(self, chat_history, memory=None):
+        """
+        Renders the chat history for the prompts: the session's rolling summary
+        plus its recent turns, or only the last CHAT_MEMORY_WINDOW_TURNS turns
+        when the caller keeps no memory.
+        """
+        if memory is None:
+            return format_chat_history(chat_history[-CHAT_MEMORY_WINDOW_TURNS:])
+        with span("history"):
+            return await memory.ahistory_text(chat_history, self.llm)
+    
+    async def acondense_and_retrieve(self, query, chat_history, history_text):
+        """
+        Resolves the question to answer and retrieves its documents.
+        In low-latency mode, self-contained follow-ups skip condensation, and
+        for the rest retrieval on the raw query (and a cheap heuristic rewrite)
+        runs as tasks alongside the condense call. Those results are reused
+        when the condensed question is close enough to what was searched.
+        
+        Returns:
+            tuple: (question, docs)
+        """
+        if not history_text or not self.low_latency:
+            question = await self.astandalone_question(query, history_text)
+            return question, await self.aretrieve(question)
+        
+        if is_self_contained(query):
+            logging.info("Follow-up looks self-contained; skipping condensation.")
+            return query, await self.aretrieve(query)
+        
+        speculative = {query: asyncio.ensure_future(self.aretrieve(query, stage="speculative_retrieve"))}
+        rewrite = heuristic_rewrite(query, chat_history)
+        if rewrite != query:
+            speculative[rewrite] = asyncio.ensure_future(self.aretrieve(rewrite, stage="speculative_retrieve"))
+        
+        try:
+            question = await self.astandalone_question(query, history_text)
+            
+            best_query = max(speculative, key=lambda candidate: question_similarity(question, candidate))
+            score = question_similarity(question, best_query)
+            if score >= SPECULATIVE_REUSE_THRESHOLD:
+                logging.info(f"Reusing speculative retrieval for '{best_query}' (similarity {score:.2f}).")
+                return question, await speculative[best_query]
+            
+            logging.info(f"Speculative retrieval discarded (best similarity {score:.2f}); retrieving for condensed question.")
+            return question, await self.aretrieve(question)
+        finally:
+            # Also stops the speculative searches if the request is cancelled
+            for task in speculative.values():
+                task.cancel()
+    
+    async def aanswer(self, query, chat_history, memory=None):
+        """
+        Generates a complete answer.
+        
+        Args:
+            query (str): The user's question
+            chat_history (list): List of (human, ai) message tuples
+            memory (ChatMemory): The session's rolling-summary memory
+        
+        Returns:
+            str: The answer
+        """
+        if not self.chatgpt_enabled:
+            # Retrieval and context building inside the chain record their own stages
+            return await self.answer_chain.ainvoke(query)
+        
+        history_text = await self.ahistory_text(chat_history, memory)
+        question, docs = await self.acondense_and_retrieve(query, chat_history, history_text)
+        context = build_prompt_context(docs, question, packing=self.packing)
+        with span("generate"):
+            return await self.answer_chain.ainvoke({
+                "context": context,
+                "chat_history": history_text,
+                "question": question
+            })
+    
+    async def astream(self, query, chat_history, memory=None):
+        """
+        Streams an answer token by token.
+        
+        Args:
+            query (str): The user's question
+            chat_history (list): List of (human, ai) message tuples
+            memory (ChatMemory): The session's rolling-summary memory
+        
+        Yields:
+            str: Chunks of the response
+        """
+        if self.chatgpt_enabled:
+            history_text = await self.ahistory_text(chat_history, memory)
+            question, docs = await self.acondense_and_retrieve(query, chat_history, history_text)
+            formatted_prompt = ANSWER_PROMPT.format(
+                context=build_prompt_context(docs, question, packing=self.packing),
+                chat_history=history_text,
+                question=question
+            )
+        else:
+            docs = await self.aretrieve(query)
+            if not docs:
+                yield "No relevant documents found for your query. Try rephrasing or enabling ChatGPT Knowledge mode."
+                return
+            formatted_prompt = RAG_ONLY_ANSWER_PROMPT.format(
+                context=build_prompt_context(docs, query, packing=self.packing),
+                question=query
+            )
+        
+        trace = current_trace()
+        start = time.perf_counter()
+        first_token_at = None
+        async with aclosing(self.llm.astream(formatted_prompt)) as chunks:
+            async for chunk in chunks:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    if trace is not None:
+                        trace.record("llm_first_token", first_token_at - start)
+                yield chunk.content if hasattr(chunk, 'content') else str(chunk)
+        if trace is not None and first_token_at is not None:
+            trace.record("llm_generate", time.perf_counter() - first_token_at)
+
+# Engines compiled for recently used (vector store, version, LLM, mode) combinations
+_ENGINE_CACHE_SIZE = 8
+_engines = OrderedDict()
+_engines_lock = threading.Lock()
+
+def get_rag_engine(vectorstore, llm, chatgpt_enabled=True):
+    """
+    Returns the compiled RagEngine for a vector store version, LLM and mode,
+    building it only the first time the combination is seen.
+    
+    Args:
+        vectorstore: The vector store for document retrieval
+        llm: The language model to use
+        chatgpt_enabled (bool): Whether to use ChatGPT knowledge
+    
+    Returns:
+        RagEngine: The compiled engine
+    """
+    # The engine holds references to the vector store and LLM, so their ids stay unique while cached
+    key = (id(vectorstore), get_index_version(vectorstore), id(llm), chatgpt_enabled)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is not None:
+            _engines.move_to_end(key)
+            return engine
+    
+    engine = RagEngine(vectorstore, llm, chatgpt_enabled=chatgpt_enabled)
+    logging.info(f"Compiled RAG engine ({'RAG+LLM' if chatgpt_enabled else 'RAG-only'}).")
+    with _engines_lock:
+        _engines[key] = engine
+        while len(_engines) > _ENGINE_CACHE_SIZE:
+            _engines.popitem(last=False)
+    return engine
 
 def create_rag_only_chain(vectorstore, llm):
     """
@@ -24,33 +379,25 @@ def create_rag_only_chain(vectorstore, llm):
         llm: The language model to use
         
     Returns:
-        chain: The RAG-only chain
+        chain: The RAG-only chain, run with ainvoke() / astream()
     """
     if vectorstore is None:
         logging.error("Vector store is None for RAG-only chain.")
         return None
         
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 5})
-    
-    def format_docs(docs): 
-        return "\n\n".join(doc.page_content for doc in docs)
-        
-    rag_chain = (
-        {"context": retriever | format_docs, "question": RunnablePassthrough()}
-        | RAG_ONLY_ANSWER_PROMPT
-        | llm
-        | StrOutputParser()
-    )
+    rag_chain = get_rag_engine(vectorstore, llm, chatgpt_enabled=False).answer_chain
     
     logging.info("Created RAG-only LCEL chain with RAG-only prompt.")
     return rag_chain
 
-def get_answer(query, chat_history, vectorstore, llm, chatgpt_enabled=True):
+async def aget_answer(query, chat_history, vectorstore, llm, chatgpt_enabled=True, memory=None):
     """
     Main function to get answers from our RAG system.
     Can operate in two modes:
     1. RAG + LLM: Uses both document knowledge and ChatGPT
     2. RAG Only: Uses only document knowledge
+    Retrieval and generation use the async retriever and LLM interfaces, so
+    one event loop can serve many requests while they wait on the network.
     
     Args:
         query (str): The user's question
@@ -58,78 +405,52 @@ def get_answer(query, chat_history, vectorstore, llm, chatgpt_enabled=True):
         vectorstore: The vector store for document retrieval
         llm: The language model to use
         chatgpt_enabled (bool): Whether to use ChatGPT knowledge
+        memory (ChatMemory): The session's rolling-summary memory
         
     Returns:
         tuple: (answer, updated_history)
     """
     if vectorstore is None:
-        logging.error("get_answer called with no vectorstore.")
+        logging.error("aget_answer called with no vectorstore.")
         return "Error: Vector store not loaded. Please index documents first.", chat_history
 
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 5})
-
-    if chatgpt_enabled:
-        # --- RAG + LLM Mode (Conversational) ---
-        logging.info("Processing query in RAG+LLM mode.")
-        
-        # Set up conversation memory
-        memory = ConversationBufferMemory(
-            memory_key='chat_history', 
-            input_key='question',
-            output_key='answer', 
-            return_messages=True
-        )
-        
-        # Add previous messages to memory
-        for human_msg, ai_msg in chat_history:
-            memory.chat_memory.add_user_message(human_msg)
-            memory.chat_memory.add_ai_message(ai_msg)
-
-        # Create the conversation chain
-        conv_chain = ConversationalRetrievalChain.from_llm(
-            llm=llm, 
-            retriever=retriever, 
-            memory=memory,
-            return_source_documents=False,
-            condense_question_prompt=CONDENSE_QUESTION_PROMPT,
-            combine_docs_chain_kwargs={"prompt": ANSWER_PROMPT},
-            verbose=False
-        )
-        
-        try:
-            # Get the answer
-            result = conv_chain.invoke({"question": query})
-            answer = result.get('answer', "Sorry, I encountered an issue processing the answer.")
-            updated_history = chat_history + [(query, answer)]
-            logging.info("RAG+LLM query processed successfully.")
-            return answer, updated_history
-        except Exception as e:
-            logging.error(f"Error in conversational chain: {e}", exc_info=True)
-            return f"Error in RAG+LLM mode: {e}", chat_history
-
-    else:
-        # --- RAG Only Mode (Strict) ---
-        logging.info("Processing query in RAG-only mode.")
+    mode_name = "RAG+LLM" if chatgpt_enabled else "RAG-only"
+    REQUESTS.inc(operation="answer", mode=mode_name)
+    trace = start_trace("answer", mode=mode_name, chat_turns=len(chat_history))
+    status = "error"
+    try:
+        cached_answer, cache_entry = await _alookup_cached_answer(query, chat_history, vectorstore, chatgpt_enabled)
+        if cached_answer is not None:
+            status = "cached"
+            return cached_answer, chat_history + [(query, cached_answer)]
         
-        try:
-            # Create and run the RAG-only chain
-            rag_chain = create_rag_only_chain(vectorstore, llm)
-            
-            if rag_chain is None:
-                return "Error: Failed to create RAG-only chain.", chat_history
-            
-            answer = rag_chain.invoke(query)
-            updated_history = chat_history + [(query, answer)]
-            logging.info("RAG-only query processed successfully.")
-            return answer, updated_history
-        except Exception as e:
-            logging.error(f"Error in RAG-only chain: {e}", exc_info=True)
-            return f"Error in RAG-only mode: {e}", chat_history
+        logging.info(f"Processing query in {mode_name} mode.")
+        answer = await get_rag_engine(vectorstore, llm, chatgpt_enabled).aanswer(query, chat_history, memory)
+        if answer:
+            _store_answer(cache_entry, answer)
+            status = "ok"
+        else:
+            answer = "Sorry, I encountered an issue processing the answer."
+        if trace is not None:
+            trace.annotate(completion_tokens=count_tokens(answer))
+        updated_history = chat_history + [(query, answer)]
+        logging.info(f"{mode_name} query processed successfully.")
+        return answer, updated_history
+    except asyncio.CancelledError:
+        status = "cancelled"
+        logging.info(f"{mode_name} query cancelled.")
+        raise
+    except Exception as e:
+        logging.error(f"Error in {mode_name} chain: {e}", exc_info=True)
+        return f"Error in {mode_name} mode: {e}", chat_history
+    finally:
+        end_trace(trace, status)
 
-def get_streaming_answer(query, chat_history, vectorstore, llm, chatgpt_enabled=True):
+async def astream_answer(query, chat_history, vectorstore, llm, chatgpt_enabled=True, memory=None):
     """
-    Streaming version of get_answer function that yields chunks of the response as they're generated.
-    This allows for a more interactive chat experience.
+    Streaming version of aget_answer that yields chunks of the response as they're generated.
+    Cancelling the consuming task or closing the generator (e.g. when the
+    client disconnects) stops retrieval and the LLM stream.
     
     Args:
         query (str): The user's question
@@ -137,6 +458,7 @@ def get_streaming_answer(query, chat_history, vectorstore, llm, chatgpt_enabled=
         vectorstore: The vector store for document retrieval
         llm: The language model to use
         chatgpt_enabled (bool): Whether to use ChatGPT knowledge
+        memory (ChatMemory): The session's rolling-summary memory
         
     Yields:
         str: Chunks of the response
@@ -144,94 +466,67 @@ def get_streaming_answer(query, chat_history, vectorstore, llm, chatgpt_enabled=
     if vectorstore is None:
         yield "Error: Vector store not loaded. Please index documents first."
         return
-
-    # Create streaming-enabled LLM
-    streaming_llm = llm
     
-    if not streaming_llm.streaming:
-        logging.warning("get_streaming_answer was called with a non-streaming LLM. Response will not stream properly.")
+    mode_name = "RAG+LLM" if chatgpt_enabled else "RAG-only"
+    REQUESTS.inc(operation="stream", mode=mode_name)
+    trace = start_trace("stream", mode=mode_name, chat_turns=len(chat_history))
+    status = "error"
+    answer_chunks = []
+    start_time = time.perf_counter()
+    try:
+        # Cached answers are replayed through the same generator interface
+        cached_answer, cache_entry = await _alookup_cached_answer(query, chat_history, vectorstore, chatgpt_enabled)
+        if cached_answer is not None:
+            status = "cached"
+            for piece in _replay_answer(cached_answer):
+                yield piece
+            return
+
+        if not getattr(llm, "streaming", False):
+            logging.warning("astream_answer was called with a non-streaming LLM. Response will not stream properly.")
+        logging.info(f"Processing streaming query in {mode_name} mode.")
+
+        async with aclosing(get_rag_engine(vectorstore, llm, chatgpt_enabled).astream(query, chat_history, memory)) as chunks:
+            async for chunk in chunks:
+                if not answer_chunks:
+                    ttft = time.perf_counter() - start_time
+                    logging.info(f"Time to first token: {ttft:.3f}s")
+                    TIME_TO_FIRST_TOKEN_SECONDS.observe(ttft)
+                    if trace is not None:
+                        trace.annotate(ttft_ms=round(ttft * 1000, 3))
+                answer_chunks.append(chunk)
+                yield chunk
+        _store_answer(cache_entry, "".join(answer_chunks))
+        status = "ok"
+    except (asyncio.CancelledError, GeneratorExit):
+        status = "cancelled"
+        logging.info(f"Streaming {mode_name} answer stopped by the client after {len(answer_chunks)} chunks.")
+        raise
+    except Exception as e:
+        logging.error(f"Error in streaming {mode_name} mode: {e}", exc_info=True)
+        yield f"Error in streaming {mode_name} mode: {e}"
+    finally:
+        # The sync wrapper resumes each step in a fresh context, so use the trace object directly
+        if trace is not None:
+            trace.annotate(completion_chunks=len(answer_chunks), completion_tokens=count_tokens("".join(answer_chunks)))
+        end_trace(trace, status)
+
+def get_answer(query, chat_history, vectorstore, llm, chatgpt_enabled=True, memory=None):
+    """
+    Synchronous wrapper over aget_answer for callers without an event loop
+    (e.g. the Streamlit UI).
     
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 5})
+    Returns:
+        tuple: (answer, updated_history)
+    """
+    return _run_sync(aget_answer(query, chat_history, vectorstore, llm, chatgpt_enabled, memory))
 
-    if chatgpt_enabled:
-        # --- RAG + LLM Mode (Conversational) with streaming ---
-        logging.info("Processing streaming query in RAG+LLM mode.")
-        
-        # Set up conversation memory
-        memory = ConversationBufferMemory(
-            memory_key='chat_history', 
-            input_key='question',
-            output_key='answer', 
-            return_messages=True
-        )
-        
-        # Add previous messages to memory
-        for human_msg, ai_msg in chat_history:
-            memory.chat_memory.add_user_message(human_msg)
-            memory.chat_memory.add_ai_message(ai_msg)
-        
-        try:
-            # First, get the standalone question
-            if chat_history:
-                standalone_chain = (
-                    {"question": RunnablePassthrough(), "chat_history": lambda _: get_buffer_string(memory.chat_memory.messages)}
-                    | CONDENSE_QUESTION_PROMPT
-                    | llm
-                    | StrOutputParser()
-                )
-                standalone_question = standalone_chain.invoke(query)
-                logging.info(f"Standalone question: {standalone_question}")
-            else:
-                standalone_question = query
-            
-            # Retrieve relevant documents
-            docs = retriever.get_relevant_documents(standalone_question)
-            context = "\n\n".join(doc.page_content for doc in docs)
-            
-            # Format the prompt with context and chat history
-            formatted_prompt = ANSWER_PROMPT.format(
-                context=context,
-                chat_history=get_buffer_string(memory.chat_memory.messages),
-                question=standalone_question
-            )
-            
-            # Stream tokens using the stream method
-            for chunk in streaming_llm.stream(formatted_prompt):
-                if hasattr(chunk, 'content'):
-                    yield chunk.content
-                else:
-                    yield str(chunk)
-                
-        except Exception as e:
-            logging.error(f"Error in streaming RAG+LLM: {e}", exc_info=True)
-            yield f"Error in streaming RAG+LLM mode: {e}"
-    
-    else:
-        # --- RAG Only Mode (Strict) with streaming ---
-        logging.info("Processing streaming query in RAG-only mode.")
-        
-        try:
-            # Retrieve relevant documents
-            docs = retriever.get_relevant_documents(query)
-            if not docs:
-                yield "No relevant documents found for your query. Try rephrasing or enabling ChatGPT Knowledge mode."
-                return
-                
-            context = "\n\n".join(doc.page_content for doc in docs)
-            
-            # Format the prompt with context
-            formatted_prompt = RAG_ONLY_ANSWER_PROMPT.format(
-                context=context,
-                question=query
-            )
-            
-            # Stream tokens
-            for chunk in streaming_llm.stream(formatted_prompt):
-                if hasattr(chunk, 'content'):
-                    yield chunk.content
-                else:
-                    yield str(chunk)
-                
-        except Exception as e:
-            logging.error(f"Error in streaming RAG-only mode: {e}", exc_info=True)
-            yield f"Error in streaming RAG-only mode: {e}" 
\ No newline at end of file
+def get_streaming_answer(query, chat_history, vectorstore, llm, chatgpt_enabled=True, memory=None):
+    """
+    Synchronous wrapper over astream_answer for callers without an event loop
+    (e.g. the Streamlit UI). Closing the generator early stops generation.
+    
+    Yields:
+        str: Chunks of the response
+    """
+    yield from _iterate_sync(astream_answer(query, chat_history, vectorstore, llm, chatgpt_enabled, memory))
@@ -0,0 +1,241 @@
+"""
+Process-wide models and vector store shared by every chat session
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from ..utils.config import VECTORSTORE_PATH
+from .llm import get_embeddings_model, get_llm
+from .sharding import load_configured_vector_store
+from .index_versions import (
+    discard_version,
+    finish_version,
+    prune_versions,
+    publish_version,
+    resolve_index_path,
+    stage_version,
+    verify_vector_store
+)
+
+class _IndexGeneration:
+    """One loaded version of the index and the number of requests currently using it."""
+
+    def __init__(self, vectorstore, number):
+        self.vectorstore = vectorstore
+        self.number = number
+        self.refs = 0
+        self.retired = False
+
+def _close_vectorstore(vectorstore):
+    """Release the file handles of a retired vector store."""
+    close = getattr(getattr(vectorstore, "docstore", None), "close", None)
+    if close:
+        close()
+
+class SharedResources:
+    """
+    Holds one embeddings model, one LLM and one read-only (memory-mapped)
+    vector store for the whole process, so memory stays flat however many
+    Streamlit sessions are open.
+    Requests lease the current index for their duration. A reload loads the
+    new index without blocking readers, swaps it in under a short lock, and
+    closes the previous one once its last lease is returned. Reloads and
+    re-indexing are serialized by a separate writer lock.
+    On disk, re-indexing never touches the version being served: it builds a
+    new version directory and publishes it only once it loads and verifies.
+    """
+
+    def __init__(self, vectorstore_path=VECTORSTORE_PATH, embeddings_factory=get_embeddings_model, llm_factory=None):
+        """
+        Args:
+            vectorstore_path (str): Directory of the vector store
+            embeddings_factory (callable): Creates the embeddings model
+            llm_factory (callable): Creates the streaming LLM
+        """
+        self.vectorstore_path = vectorstore_path
+        self._embeddings_factory = embeddings_factory
+        self._llm_factory = llm_factory or (lambda: get_llm(streaming=True))
+        self._embeddings_model = None
+        self._llm = None
+        self._current = None
+        self._generations = 0
+        self._load_attempted = False
+        self._lock = threading.Lock()
+        self._writer_lock = threading.Lock()
+
+    def models(self):
+        """
+        Returns the shared models, creating them on first use.
+
+        Returns:
+            tuple: (embeddings model, LLM)
+        """
+        with self._lock:
+            if self._embeddings_model is None:
+                self._embeddings_model = self._embeddings_factory()
+            if self._llm is None:
+                self._llm = self._llm_factory()
+            return self._embeddings_model, self._llm
+
+    @property
+    def embeddings_model(self):
+        return self.models()[0]
+
+    @property
+    def llm(self):
+        return self.models()[1]
+
+    @property
+    def vector_store(self):
+        """The current vector store, or None. Use lease() while serving a request."""
+        with self._lock:
+            return self._current.vectorstore if self._current else None
+
+    @contextmanager
+    def lease(self):
+        """
+        Pins the current index for the duration of a request, so a concurrent
+        reload cannot close it mid-search.
+
+        Yields:
+            FAISS: The vector store, or None if no index is loaded
+        """
+        with self._lock:
+            generation = self._current
+            if generation:
+                generation.refs += 1
+        try:
+            yield generation.vectorstore if generation else None
+        finally:
+            if generation:
+                self._release(generation)
+
+    def _release(self, generation):
+        with self._lock:
+            generation.refs -= 1
+            close = generation.retired and generation.refs == 0
+        if close:
+            _close_vectorstore(generation.vectorstore)
+            logging.info(f"Closed index generation {generation.number}.")
+
+    def _swap(self, vectorstore):
+        """Publish a new index and retire the previous one."""
+        with self._lock:
+            self._generations += 1
+            previous, self._current = self._current, _IndexGeneration(vectorstore, self._generations)
+            if previous:
+                previous.retired = True
+                # Balanced by the refs -= 1 in _release, which closes it once unused
+                previous.refs += 1
+        logging.info(f"Serving index generation {self._generations}.")
+        if previous:
+            self._release(previous)
+
+    def _load(self, embeddings_model):
+        """Load the published index and swap it in; the writer lock must be held."""
+        try:
+            vectorstore = load_configured_vector_store(embeddings_model, resolve_index_path(self.vectorstore_path))
+        finally:
+            # Only once the load is over, so sessions arriving meanwhile wait for it on the writer lock
+            self._load_attempted = True
+        if vectorstore is None:
+            return False
+        self._swap(vectorstore)
+        return True
+
+    def ensure_index_loaded(self):
+        """Loads the index from disk the first time any session asks for it."""
+        with self._lock:
+            if self._current is not None or self._load_attempted:
+                return
+        embeddings_model = self.embeddings_model
+        with self._writer_lock:
+            if self._current is None and not self._load_attempted:
+                self._load(embeddings_model)
+
+    def reload(self):
+        """
+        Loads the saved index from disk and hot-swaps it in.
+
+        Returns:
+            bool: True if an index was loaded
+        """
+        embeddings_model = self.embeddings_model
+        with self._writer_lock:
+            return self._load(embeddings_model)
+
+    def reindex(self, build):
+        """
+        Builds a new index version and hot-swaps it in. Only one session
+        re-indexes at a time. The build writes into a staging copy of the
+        served version; the result is loaded and verified, then published by
+        an atomic pointer swap. Until then, and for good if the build fails or
+        crashes, this and every other process keep serving the previous version.
+        A build that raises leaves its staging copy behind for the next
+        re-index to resume from its last checkpoint.
+
+        Args:
+            build (callable): Called with the embeddings model and the directory
+                to write the index to; returns the store or None on failure
+
+        Returns:
+            bool: True if a new index is being served
+        """
+        embeddings_model = self.embeddings_model
+        with self._writer_lock:
+            staging_path = stage_version(self.vectorstore_path)
+            built = build(embeddings_model, staging_path)
+            if built is None:
+                discard_version(staging_path)
+                return False
+            version_path = staging_path
+            try:
+                # Serve the saved, memory-mapped copy rather than the writable one the build returned
+                _close_vectorstore(built)
+                version_path = finish_version(staging_path)
+                vectorstore = load_configured_vector_store(embeddings_model, version_path)
+                if not verify_vector_store(vectorstore):
+                    logging.error(f"Index version {version_path} failed verification; still serving the previous version.")
+                    if vectorstore is not None:
+                        _close_vectorstore(vectorstore)
+                    discard_version(version_path)
+                    return False
+                publish_version(self.vectorstore_path, version_path)
+            except Exception:
+                discard_version(version_path)
+                raise
+            self._load_attempted = True
+            self._swap(vectorstore)
+            prune_versions(self.vectorstore_path)
+            return True
+
+    def stats(self):
+        """
+        Returns registry statistics.
+
+        Returns:
+            dict: generation, active_leases and whether an index is loaded
+        """
+        with self._lock:
+            return {
+                "generation": self._current.number if self._current else 0,
+                "active_leases": self._current.refs if self._current else 0,
+                "index_loaded": self._current is not None,
+            }
+
+_shared_resources = None
+_shared_resources_lock = threading.Lock()
+
+def get_shared_resources():
+    """
+    Returns the process-wide resources, shared by every chat session.
+
+    Returns:
+        SharedResources: The shared resources
+    """
+    global _shared_resources
+    with _shared_resources_lock:
+        if _shared_resources is None:
+            _shared_resources = SharedResources()
+        return _shared_resources
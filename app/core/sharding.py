@@ -0,0 +1,385 @@
+"""
+Sharded vector store: one FAISS shard per collection or hash bucket
+"""
+
+import os
+import uuid
+import heapq
+import asyncio
+import shutil
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from ..utils.config import (
+    DATA_PATH, VECTORSTORE_PATH, VECTORSTORE_MMAP,
+    VECTORSTORE_SHARDING, VECTORSTORE_HASH_SHARDS, SHARD_SEARCH_WORKERS
+)
+from .document_store import list_data_files
+from .vector_store import INDEX_FILENAME, load_vector_store, update_vector_store
+from .docstore import SQLiteDocstore
+from .ann_index import FLAT_FACTORY
+
+# Shards live in <vectorstore_path>/shards/<name>/, each a complete vector store
+SHARDS_DIRNAME = "shards"
+# Collection of files placed directly in the data directory
+DEFAULT_COLLECTION = "default"
+
+# FAISS releases the GIL during search, so shards are searched in parallel threads
+_shard_executor = ThreadPoolExecutor(max_workers=SHARD_SEARCH_WORKERS, thread_name_prefix="shard-search")
+
+def shard_for_file(file_path, directory_path=DATA_PATH, mode=VECTORSTORE_SHARDING, hash_shards=VECTORSTORE_HASH_SHARDS):
+    """
+    Returns the shard a source file belongs to.
+    In "collection" mode it is the file's top-level folder under the data
+    directory (data/health/policy.pdf -> "health"); in "hash" mode a stable
+    bucket of its relative path.
+
+    Args:
+        file_path (str): Path of the source file
+        directory_path (str): Data directory the file was found in
+        mode (str): "collection" or "hash"
+        hash_shards (int): Number of buckets in hash mode
+
+    Returns:
+        str: The shard name
+    """
+    relative = os.path.relpath(file_path, directory_path)
+    if mode == "hash":
+        digest = hashlib.sha1(relative.replace(os.sep, "/").encode("utf-8")).digest()
+        return f"bucket-{int.from_bytes(digest[:8], 'big') % hash_shards:02d}"
+    parts = relative.split(os.sep)
+    return parts[0] if len(parts) > 1 else DEFAULT_COLLECTION
+
+def _group_by_shard(texts, metadatas, ids, directory_path, mode):
+    """
+    Routes chunks to the shard of their `source` file, as indexing would;
+    chunks without a source under the data directory go to the default collection.
+
+    Returns:
+        dict: Shard name -> (texts, metadatas, ids)
+    """
+    groups = {}
+    for text, metadata, chunk_id in zip(texts, metadatas, ids):
+        source = metadata.get("source")
+        inside = source and not os.path.relpath(source, directory_path).startswith(os.pardir)
+        shard = shard_for_file(source, directory_path, mode=mode) if inside else DEFAULT_COLLECTION
+        group = groups.setdefault(shard, ([], [], []))
+        group[0].append(text)
+        group[1].append(metadata)
+        group[2].append(chunk_id)
+    return groups
+
+def shard_path(vectorstore_path, shard):
+    """Return the directory of one shard."""
+    return os.path.join(vectorstore_path, SHARDS_DIRNAME, shard)
+
+def list_shards(vectorstore_path=VECTORSTORE_PATH):
+    """
+    Lists the shards saved under a vector store directory.
+
+    Returns:
+        list: Sorted shard names
+    """
+    shards_dir = os.path.join(vectorstore_path, SHARDS_DIRNAME)
+    if not os.path.isdir(shards_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(shards_dir)
+        if os.path.isfile(os.path.join(shards_dir, name, INDEX_FILENAME))
+    )
+
+def update_sharded_vector_store(
+    embeddings_model,
+    directory_path=DATA_PATH,
+    vectorstore_path=VECTORSTORE_PATH,
+    shards=None,
+    rebuild=False,
+    mode=VECTORSTORE_SHARDING,
+    **kwargs
+):
+    """
+    Incrementally (re-)indexes a directory into one vector store per shard.
+    Each shard has its own manifest, so it can be updated or rebuilt without
+    touching the others. Shards whose files have all been removed are deleted.
+
+    Args:
+        embeddings_model: The embeddings model to use
+        directory_path (str): Path to directory containing documents
+        vectorstore_path (str): Directory of the sharded vector store
+        shards (list): Only update these shards, all if None
+        rebuild (bool): Drop the selected shards and index them from scratch
+        mode (str): "collection" or "hash" shard assignment
+        **kwargs: Passed to update_vector_store for every shard
+
+    Returns:
+        ShardedVectorStore: The updated store, or None if nothing is indexed
+    """
+    files_by_shard = {}
+    for file_path in list_data_files(directory_path):
+        files_by_shard.setdefault(shard_for_file(file_path, directory_path, mode=mode), []).append(file_path)
+
+    for shard in sorted(set(files_by_shard) | set(list_shards(vectorstore_path))):
+        if shards is not None and shard not in shards:
+            continue
+        path = shard_path(vectorstore_path, shard)
+        if rebuild or shard not in files_by_shard:
+            shutil.rmtree(path, ignore_errors=True)
+        if shard not in files_by_shard:
+            logging.info(f"Removed empty shard {shard}.")
+            continue
+        logging.info(f"Indexing shard {shard}: {len(files_by_shard[shard])} files.")
+        shard_kwargs = dict(kwargs)
+        if kwargs.get("progress"):
+            # Progress is reported per shard: "index health", "save health", ...
+            shard_kwargs["progress"] = lambda stage, done, total, shard=shard: kwargs["progress"](f"{stage} {shard}", done, total)
+        if update_vector_store(embeddings_model, directory_path, path, file_paths=files_by_shard[shard], **shard_kwargs) is None:
+            logging.error(f"Failed to index shard {shard}.")
+            return None
+
+    return load_sharded_vector_store(embeddings_model, vectorstore_path, mmap=False, directory_path=directory_path, mode=mode)
+
+def load_sharded_vector_store(
+    embeddings_model,
+    vectorstore_path=VECTORSTORE_PATH,
+    shards=None,
+    mmap=VECTORSTORE_MMAP,
+    directory_path=DATA_PATH,
+    mode=VECTORSTORE_SHARDING
+):
+    """
+    Loads every saved shard (or the selected ones).
+
+    Args:
+        embeddings_model: The embeddings model to use
+        vectorstore_path (str): Directory of the sharded vector store
+        shards (list): Only load these shards, all if None
+        mmap (bool): Memory-map the shard indexes
+        directory_path (str): Data directory, used to route added texts to shards
+        mode (str): "collection" or "hash" shard assignment of added texts
+
+    Returns:
+        ShardedVectorStore: The store, or None if no shard could be loaded
+    """
+    loaded = {}
+    for shard in list_shards(vectorstore_path):
+        if shards is not None and shard not in shards:
+            continue
+        vectorstore = load_vector_store(embeddings_model, shard_path(vectorstore_path, shard), mmap=mmap)
+        if vectorstore is not None:
+            loaded[shard] = vectorstore
+    if not loaded:
+        logging.warning(f"No shards found in {vectorstore_path}.")
+        return None
+    logging.info(f"Loaded {len(loaded)} shards: {', '.join(loaded)}")
+    return ShardedVectorStore(loaded, directory_path=directory_path, mode=mode)
+
+def load_configured_vector_store(embeddings_model, vectorstore_path=VECTORSTORE_PATH, mmap=VECTORSTORE_MMAP):
+    """Loads the monolithic or sharded vector store, depending on VECTORSTORE_SHARDING."""
+    if VECTORSTORE_SHARDING == "none":
+        return load_vector_store(embeddings_model, vectorstore_path, mmap=mmap)
+    return load_sharded_vector_store(embeddings_model, vectorstore_path, mmap=mmap)
+
+def update_configured_vector_store(embeddings_model, directory_path=DATA_PATH, vectorstore_path=VECTORSTORE_PATH, progress=None):
+    """Incrementally indexes a directory into the monolithic or sharded vector store, depending on VECTORSTORE_SHARDING."""
+    if VECTORSTORE_SHARDING == "none":
+        return update_vector_store(embeddings_model, directory_path, vectorstore_path, progress=progress)
+    return update_sharded_vector_store(embeddings_model, directory_path, vectorstore_path, progress=progress)
+
+class _ShardedDocstore:
+    """Resolves chunk IDs across the docstores of all shards."""
+
+    def __init__(self, shards):
+        self._shards = shards
+
+    def search(self, search):
+        for vectorstore in self._shards.values():
+            doc = vectorstore.docstore.search(search)
+            if isinstance(doc, Document):
+                return doc
+        return f"ID {search} not found."
+
+    def close(self):
+        for vectorstore in self._shards.values():
+            close = getattr(vectorstore.docstore, "close", None)
+            if close:
+                close()
+
+class _ShardedSparseIndex:
+    """Fans a BM25 query out to every shard's sparse index and keeps the best k hits."""
+
+    def __init__(self, sparse_indexes):
+        self._sparse_indexes = sparse_indexes
+
+    def search(self, query, k):
+        futures = [_shard_executor.submit(index.search, query, k) for index in self._sparse_indexes]
+        hits = [hit for future in futures for hit in future.result()]
+        return heapq.nlargest(k, hits, key=lambda hit: hit[1])
+
+class ShardedVectorStore(VectorStore):
+    """
+    Read-side view over several FAISS shards.
+    A query is embedded once, searched on every shard in parallel, and the
+    per-shard top-k lists are merged with a heap. `select()` restricts search
+    to a subset of shards. Added texts are routed to the shard of their source
+    file and, like FAISS.add_texts(), kept in memory until the next re-index.
+    """
+
+    def __init__(self, shards, directory_path=DATA_PATH, mode=VECTORSTORE_SHARDING):
+        """
+        Args:
+            shards (dict): Shard name -> FAISS vector store
+            directory_path (str): Data directory, used to route added texts to shards
+            mode (str): "collection" or "hash" shard assignment of added texts
+        """
+        self.shards = dict(shards)
+        self.directory_path = directory_path
+        self.mode = mode
+        self.docstore = _ShardedDocstore(self.shards)
+        first = next(iter(self.shards.values()))
+        self._embeddings = first.embeddings
+        # Lower distances are better unless the shards rank by inner product
+        self._higher_is_better = first.distance_strategy == DistanceStrategy.MAX_INNER_PRODUCT
+        self._update_version()
+
+        sparse_indexes = [getattr(store, "sparse_index", None) for store in self.shards.values()]
+        if all(index is not None for index in sparse_indexes):
+            self.sparse_index = _ShardedSparseIndex(sparse_indexes)
+
+    @property
+    def embeddings(self):
+        return self._embeddings
+
+    def _update_version(self):
+        # Any shard changing changes the combined version, so answer and engine caches roll over
+        versions = "|".join(f"{name}:{getattr(store, 'index_version', None)}" for name, store in sorted(self.shards.items()))
+        self.index_version = hashlib.sha1(versions.encode("utf-8")).hexdigest()
+
+    def select(self, shards):
+        """
+        Returns a view searching only the given shards.
+
+        Args:
+            shards (list): Shard names
+
+        Returns:
+            ShardedVectorStore: The restricted view
+        """
+        missing = set(shards) - set(self.shards)
+        if missing:
+            raise ValueError(f"Unknown shards: {', '.join(sorted(missing))}")
+        return ShardedVectorStore({name: self.shards[name] for name in shards}, directory_path=self.directory_path, mode=self.mode)
+
+    def similarity_search_with_score(self, query, k=4, shards=None, **kwargs):
+        """
+        Searches the shards in parallel and merges their top-k lists.
+
+        Args:
+            query (str): The query text
+            k (int): Number of results
+            shards (list): Only search these shards, all if None
+
+        Returns:
+            list: (Document, score) tuples, best first
+        """
+        targets = self.shards if shards is None else {name: self.shards[name] for name in shards}
+        embedding = self._embeddings.embed_query(query)
+        futures = [
+            _shard_executor.submit(store.similarity_search_with_score_by_vector, embedding, k, **kwargs)
+            for store in targets.values()
+        ]
+        results = [hit for future in futures for hit in future.result()]
+        select = heapq.nlargest if self._higher_is_better else heapq.nsmallest
+        return select(k, results, key=lambda hit: hit[1])
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    async def asimilarity_search_with_score(self, query, k=4, shards=None, **kwargs):
+        """Async variant of similarity_search_with_score(); the query is embedded without blocking the event loop."""
+        targets = self.shards if shards is None else {name: self.shards[name] for name in shards}
+        embedding = await self._embeddings.aembed_query(query)
+        loop = asyncio.get_running_loop()
+        per_shard = await asyncio.gather(*(
+            loop.run_in_executor(_shard_executor, lambda store=store: store.similarity_search_with_score_by_vector(embedding, k, **kwargs))
+            for store in targets.values()
+        ))
+        results = [hit for hits in per_shard for hit in hits]
+        select = heapq.nlargest if self._higher_is_better else heapq.nsmallest
+        return select(k, results, key=lambda hit: hit[1])
+
+    async def asimilarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in await self.asimilarity_search_with_score(query, k=k, **kwargs)]
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs):
+        """
+        Embeds texts into the shards of their source files, creating shards
+        that do not exist yet. Added chunks are found by vector search; the
+        shards' BM25 indexes only cover them after the next re-index.
+
+        Args:
+            texts (list): Chunk texts
+            metadatas (list): Metadata of each chunk
+            ids (list): Chunk IDs, generated if None
+            **kwargs: Passed to FAISS.add_texts()
+
+        Returns:
+            list: The chunk IDs, in input order
+        """
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        groups = _group_by_shard(texts, metadatas, ids, self.directory_path, self.mode)
+        # A memory-mapped FAISS index aborts the process when vectors are added to it
+        read_only = [
+            name for name in groups
+            if name in self.shards and isinstance(self.shards[name].docstore, SQLiteDocstore) and self.shards[name].docstore.snapshot
+        ]
+        if read_only:
+            raise ValueError(f"Shards {', '.join(sorted(read_only))} are memory-mapped and read-only; load them with mmap=False to add texts.")
+
+        first = next(iter(self.shards.values()))
+        for name, (group_texts, group_metadatas, group_ids) in groups.items():
+            if name in self.shards:
+                self.shards[name].add_texts(group_texts, metadatas=group_metadatas, ids=group_ids, **kwargs)
+            else:
+                self.shards[name] = FAISS.from_texts(
+                    group_texts, self._embeddings, metadatas=group_metadatas, ids=group_ids,
+                    distance_strategy=first.distance_strategy, normalize_L2=first._normalize_L2, **kwargs
+                )
+                self.shards[name].index_factory = FLAT_FACTORY
+            self.shards[name].index_version = uuid.uuid4().hex
+        self._update_version()
+        return ids
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, directory_path=DATA_PATH, mode=VECTORSTORE_SHARDING, **kwargs):
+        """
+        Builds an in-memory sharded store, one FAISS shard per source shard.
+        Saved, incrementally updated shards are built with update_sharded_vector_store().
+
+        Args:
+            texts (list): Chunk texts
+            embedding: The embeddings model to use
+            metadatas (list): Metadata of each chunk
+            ids (list): Chunk IDs, generated if None
+            directory_path (str): Data directory the chunks' sources are under
+            mode (str): "collection" or "hash" shard assignment
+            **kwargs: Passed to FAISS.from_texts()
+
+        Returns:
+            ShardedVectorStore: The store
+        """
+        texts = list(texts)
+        if not texts:
+            raise ValueError("No texts to build a sharded store from.")
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        shards = {}
+        for name, (group_texts, group_metadatas, group_ids) in _group_by_shard(texts, metadatas, ids, directory_path, mode).items():
+            shards[name] = FAISS.from_texts(group_texts, embedding, metadatas=group_metadatas, ids=group_ids, **kwargs)
+            shards[name].index_factory = FLAT_FACTORY
+        return cls(shards, directory_path=directory_path, mode=mode)
@@ -0,0 +1,371 @@
+"""
+Sparse BM25 index and hybrid (BM25 + FAISS) retrieval for the RAG application
+"""
+
+import os
+import re
+import asyncio
+import json
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from ..utils.config import BM25_K1, BM25_B, RRF_K, HYBRID_FETCH_K
+
+# Keeps identifiers such as "POL-2023-0042", "4.2.1" or "rider_b" as single terms
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-./_][a-z0-9]+)*")
+
+# Query terms present in more than this fraction of chunks carry almost no
+# BM25 weight but have the longest posting lists, so they are skipped
+_MAX_QUERY_TERM_DF = 0.5
+
+# Arrays of a saved index, memory-mapped on load
+_ARRAY_NAMES = ("offsets", "doc_idx", "tf", "doc_norm", "idf", "term_ids",
+                "term_bytes", "term_offsets", "doc_id_bytes", "doc_id_offsets")
+
+def tokenize(text):
+    """Lower-case a text and split it into BM25 terms."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+def _concat(parts, dtype):
+    """Concatenate per-batch arrays, allowing no batches at all."""
+    return np.concatenate([np.zeros(0, dtype=dtype)] + parts)
+
+class _PackedStrings:
+    """
+    A list of strings kept as one UTF-8 byte array plus offsets, so a saved
+    list is memory-mapped rather than parsed on load. Strings are decoded
+    only when accessed.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def pack(cls, strings):
+        encoded = [string.encode("utf-8") for string in strings]
+        return cls.from_bytes(b"".join(encoded), [len(item) for item in encoded])
+
+    @classmethod
+    def from_bytes(cls, data, lengths):
+        """Wraps concatenated UTF-8 strings, given the byte length of each."""
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(np.frombuffer(data, dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _bytes(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+    def __getitem__(self, i):
+        return self._bytes(i).decode("utf-8")
+
+    def find(self, string):
+        """Position of a string in a list packed in sorted order, or -1."""
+        key = string.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self) and self._bytes(lo) == key else -1
+
+class BM25Index:
+    """
+    Inverted index with BM25 scoring.
+    Postings are stored in CSR form: for term t, documents
+    `doc_idx[offsets[t]:offsets[t + 1]]` with term frequencies `tf[...]`.
+    Scoring a query is a handful of vectorized NumPy operations over the
+    posting lists of its terms. The vocabulary is kept sorted, and a query
+    term is found by binary search; `term_ids` maps its position to t.
+    """
+
+    def __init__(self, doc_ids, terms, term_ids, offsets, doc_idx, tf, doc_norm, idf, k1=BM25_K1, index_version=None):
+        self.doc_ids = doc_ids
+        self.terms = terms
+        self.term_ids = term_ids
+        self.offsets = offsets
+        self.doc_idx = doc_idx
+        self.tf = tf
+        self.doc_norm = doc_norm
+        self.idf = idf
+        self.k1 = k1
+        self.index_version = index_version
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    @classmethod
+    def build(cls, texts, doc_ids, **kwargs):
+        """
+        Builds the index from chunk texts.
+
+        Args:
+            texts (list): Chunk texts
+            doc_ids (list): Docstore ID of each chunk
+            **kwargs: Passed to build_batches()
+
+        Returns:
+            BM25Index: The built index
+        """
+        return cls.build_batches([(doc_ids, texts)], **kwargs)
+
+    @classmethod
+    def build_batches(cls, batches, k1=BM25_K1, b=BM25_B, index_version=None):
+        """
+        Builds the index from batches of chunks, keeping only one batch of
+        text in memory; postings are accumulated as NumPy arrays.
+
+        Args:
+            batches (iterable): (doc_ids, texts) tuples
+            k1 (float): BM25 term-frequency saturation
+            b (float): BM25 length normalization
+            index_version (str): Version of the dense index these chunks belong to
+
+        Returns:
+            BM25Index: The built index
+        """
+        vocab = {}
+        term_parts, doc_parts, tf_parts, len_parts, id_length_parts = [], [], [], [], []
+        id_data = bytearray()
+        n_docs = 0
+
+        for batch_ids, batch_texts in batches:
+            term_ids, doc_idx, tfs = [], [], []
+            doc_len = np.zeros(len(batch_texts), dtype=np.float32)
+            for i, text in enumerate(batch_texts):
+                counts = Counter(tokenize(text))
+                doc_len[i] = sum(counts.values())
+                for term, count in counts.items():
+                    term_ids.append(vocab.setdefault(term, len(vocab)))
+                    doc_idx.append(n_docs + i)
+                    tfs.append(count)
+            term_parts.append(np.asarray(term_ids, dtype=np.int64))
+            doc_parts.append(np.asarray(doc_idx, dtype=np.int32))
+            tf_parts.append(np.asarray(tfs, dtype=np.float32))
+            len_parts.append(doc_len)
+            encoded = [doc_id.encode("utf-8") for doc_id in batch_ids]
+            id_data += b"".join(encoded)
+            id_length_parts.append(np.asarray([len(item) for item in encoded], dtype=np.int64))
+            n_docs += len(batch_texts)
+
+        term_ids = _concat(term_parts, np.int64)
+        doc_len = _concat(len_parts, np.float32)
+        order = np.argsort(term_ids, kind="stable")
+        df = np.bincount(term_ids, minlength=len(vocab))
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=offsets[1:])
+
+        avgdl = float(doc_len.mean()) if n_docs else 1.0
+        n_docs = max(n_docs, 1)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        # Per-document part of the BM25 denominator, precomputed once
+        doc_norm = (k1 * (1 - b + b * doc_len / max(avgdl, 1e-9))).astype(np.float32)
+
+        # Python orders strings by code point, which is also their UTF-8 byte order
+        sorted_terms = sorted(vocab)
+        return cls(
+            doc_ids=_PackedStrings.from_bytes(bytes(id_data), _concat(id_length_parts, np.int64)),
+            terms=_PackedStrings.pack(sorted_terms),
+            term_ids=np.fromiter((vocab[term] for term in sorted_terms), dtype=np.int64, count=len(sorted_terms)),
+            offsets=offsets,
+            doc_idx=_concat(doc_parts, np.int32)[order],
+            tf=_concat(tf_parts, np.float32)[order],
+            doc_norm=doc_norm,
+            idf=idf,
+            k1=k1,
+            index_version=index_version
+        )
+
+    def search(self, query, k=HYBRID_FETCH_K):
+        """
+        Scores every chunk containing a query term and returns the best k.
+
+        Args:
+            query (str): The query text
+            k (int): Number of results
+
+        Returns:
+            list: (doc_id, score) tuples, best first
+        """
+        n_docs = len(self.doc_ids)
+        positions = [self.terms.find(term) for term in set(tokenize(query))]
+        term_ids = [int(self.term_ids[position]) for position in positions if position >= 0]
+        if not term_ids or not n_docs:
+            return []
+
+        max_df = _MAX_QUERY_TERM_DF * n_docs
+        selective = [t for t in term_ids if self.offsets[t + 1] - self.offsets[t] <= max_df]
+        term_ids = selective or term_ids
+
+        k1 = self.k1
+        docs_parts, score_parts = [], []
+        for t in term_ids:
+            start, end = self.offsets[t], self.offsets[t + 1]
+            docs = self.doc_idx[start:end]
+            tf = self.tf[start:end]
+            docs_parts.append(docs)
+            score_parts.append(self.idf[t] * tf * (k1 + 1) / (tf + self.doc_norm[docs]))
+
+        docs = np.concatenate(docs_parts)
+        contributions = np.concatenate(score_parts)
+        if len(docs) < n_docs // 4:
+            candidates, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=contributions)
+        else:
+            candidates = np.arange(n_docs)
+            scores = np.bincount(docs, weights=contributions, minlength=n_docs)
+
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.doc_ids[candidates[i]], float(scores[i])) for i in top if scores[i] > 0]
+
+    def save(self, path):
+        """
+        Saves the index as raw .npy arrays (memory-mappable), vocabulary and
+        chunk IDs included, plus JSON metadata. Files are written under
+        temporary names and renamed, so a process that has the previous index
+        memory-mapped keeps reading intact files.
+
+        Args:
+            path (str): Directory to write to
+        """
+        os.makedirs(path, exist_ok=True)
+        arrays = {
+            "offsets": self.offsets, "doc_idx": self.doc_idx, "tf": self.tf,
+            "doc_norm": self.doc_norm, "idf": self.idf, "term_ids": self.term_ids,
+            "term_bytes": self.terms.data, "term_offsets": self.terms.offsets,
+            "doc_id_bytes": self.doc_ids.data, "doc_id_offsets": self.doc_ids.offsets,
+        }
+        for name in _ARRAY_NAMES:
+            file_path = os.path.join(path, f"{name}.npy")
+            with open(file_path + ".tmp", "wb") as f:
+                np.save(f, arrays[name])
+            os.replace(file_path + ".tmp", file_path)
+        file_path = os.path.join(path, "meta.json")
+        with open(file_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"index_version": self.index_version, "k1": self.k1}, f)
+        os.replace(file_path + ".tmp", file_path)
+        # Vocabulary of the JSON layout, superseded by the arrays above
+        if os.path.exists(os.path.join(path, "terms.json")):
+            os.remove(os.path.join(path, "terms.json"))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a saved index; every array, vocabulary included, is memory-mapped
+        rather than read. Indexes saved with a JSON vocabulary still load, at
+        the old cost, until they are next rebuilt.
+
+        Args:
+            path (str): Directory the index was saved to
+
+        Returns:
+            BM25Index: The index, or None if missing or unreadable
+        """
+        if not os.path.isfile(os.path.join(path, "meta.json")):
+            return None
+        try:
+            with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if os.path.isfile(os.path.join(path, "terms.json")):
+                arrays = cls._load_json_terms(path)
+            else:
+                arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in _ARRAY_NAMES}
+            return cls(
+                doc_ids=_PackedStrings(arrays.pop("doc_id_bytes"), arrays.pop("doc_id_offsets")),
+                terms=_PackedStrings(arrays.pop("term_bytes"), arrays.pop("term_offsets")),
+                k1=meta.get("k1", BM25_K1),
+                index_version=meta.get("index_version"),
+                **arrays
+            )
+        except Exception as e:
+            logging.error(f"Failed to load BM25 index from {path}: {e}", exc_info=True)
+            return None
+
+    @staticmethod
+    def _load_json_terms(path):
+        """Reads the posting arrays of an index saved with its vocabulary and chunk IDs in terms.json."""
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in ("offsets", "doc_idx", "tf", "doc_norm", "idf")
+        }
+        with open(os.path.join(path, "terms.json"), "r", encoding="utf-8") as f:
+            terms = json.load(f)
+        sorted_terms = sorted(terms["vocab"])
+        packed_terms = _PackedStrings.pack(sorted_terms)
+        packed_doc_ids = _PackedStrings.pack(terms["doc_ids"])
+        arrays.update(
+            term_ids=np.fromiter((terms["vocab"][term] for term in sorted_terms), dtype=np.int64, count=len(sorted_terms)),
+            term_bytes=packed_terms.data, term_offsets=packed_terms.offsets,
+            doc_id_bytes=packed_doc_ids.data, doc_id_offsets=packed_doc_ids.offsets,
+        )
+        return arrays
+
+def reciprocal_rank_fusion(rankings, rrf_k=RRF_K):
+    """
+    Fuses several ranked ID lists: each ID scores sum(1 / (rrf_k + rank)).
+
+    Args:
+        rankings (list): Lists of IDs, best first
+        rrf_k (int): Rank damping constant
+
+    Returns:
+        list: IDs ordered by fused score
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+# Sparse search runs here while the dense path waits on the query embedding
+_sparse_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bm25")
+
+class HybridRetriever(BaseRetriever):
+    """Retriever fusing FAISS similarity search and BM25 with reciprocal rank fusion."""
+
+    vectorstore: Any
+    sparse_index: Any
+    k: int = 5
+    fetch_k: int = HYBRID_FETCH_K
+    rrf_k: int = RRF_K
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        sparse_future = _sparse_executor.submit(self.sparse_index.search, query, self.fetch_k)
+        dense_docs = self.vectorstore.similarity_search(query, k=self.fetch_k)
+        return self._fuse(dense_docs, sparse_future.result())
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        sparse_future = asyncio.get_running_loop().run_in_executor(
+            _sparse_executor, self.sparse_index.search, query, self.fetch_k
+        )
+        dense_docs = await self.vectorstore.asimilarity_search(query, k=self.fetch_k)
+        return self._fuse(dense_docs, await sparse_future)
+
+    def _fuse(self, dense_docs, sparse_hits):
+        """Fuse dense results and sparse hits and resolve the top k to documents."""
+        docs_by_id = {doc.id: doc for doc in dense_docs if doc.id}
+        fused_ids = reciprocal_rank_fusion(
+            [[doc.id for doc in dense_docs if doc.id], [doc_id for doc_id, _ in sparse_hits]],
+            rrf_k=self.rrf_k
+        )[:self.k]
+
+        results = []
+        for doc_id in fused_ids:
+            doc = docs_by_id.get(doc_id) or self.vectorstore.docstore.search(doc_id)
+            if isinstance(doc, Document):
+                results.append(doc)
+        return results
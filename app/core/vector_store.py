@@ -3,12 +3,418 @@ Vector store handling for the RAG application
 """
 
 import os
+import json
+import uuid
+import hashlib
 import logging
+import faiss
+import numpy as np
 from langchain_community.vectorstores import FAISS
-from ..utils.config import VECTORSTORE_PATH
-from .document_store import split_documents
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+from ..utils.config import (
+    VECTORSTORE_PATH, DATA_PATH, INDEX_BATCH_SIZE, INDEX_CHECKPOINT_CHUNKS, INDEX_CHECKPOINT_GROWTH,
+    HYBRID_RETRIEVAL, HYBRID_FETCH_K, FAISS_INDEX_FACTORY, FAISS_RERANK_FACTOR, VECTORSTORE_MMAP,
+    CHUNK_DEDUP
+)
+from ..utils.metrics import INDEX_VECTORS, annotate, end_trace, span, start_trace
+from .document_store import split_documents, list_data_files, iter_documents
+from .chunking import StructuredTextSplitter
+from .embedding_pipeline import EmbeddingScheduler
+from .llm import embedding_backend, without_client_retries
+from .dedup import ChunkDeduplicator, simhash
+from .sparse_index import BM25Index, HybridRetriever
+from .docstore import STREAM_BATCH_SIZE, SQLiteDocstore
+from .ann_index import FLAT_FACTORY, RerankIndex, base_index, convert_index, effective_factory, set_search_params, to_flat
 
-def create_vector_store(docs, embeddings_model):
+# The manifest lives next to index.faiss / docstore.sqlite and records, for every
+# indexed source file, enough to decide whether it needs re-indexing and which
+# chunk IDs to drop from the index when it changes or disappears.
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# BM25 inverted index, rebuilt from the docstore whenever the index is saved
+SPARSE_INDEX_DIRNAME = "bm25"
+
+# Storage format: vectors in index.faiss (memory-mapped on load), chunk text,
+# metadata and the position -> chunk ID mapping in a SQLite file. Stores saved
+# by FAISS.save_local (index.pkl) are still loaded and converted on the next re-index.
+INDEX_FILENAME = "index.faiss"
+DOCSTORE_FILENAME = "docstore.sqlite"
+LEGACY_DOCSTORE_FILENAME = "index.pkl"
+# Full-precision vectors of a quantized index, memory-mapped to rerank its search results
+FULL_VECTORS_FILENAME = "vectors.npy"
+
+def _file_sha256(file_path, block_size=1 << 20):
+    """Compute the SHA-256 of a file's content without reading it all into memory."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _manifest_key(file_path):
+    """Normalize a source path so loader metadata and directory listings agree."""
+    return os.path.normpath(file_path)
+
+def _file_entry(file_path, chunk_ids, sha256=None, signatures=None):
+    """
+    Build a manifest entry for a file on disk.
+    Chunk IDs may be shared with other files when their chunks were
+    deduplicated; `signatures` are the SimHashes of the file's chunks.
+    """
+    stat = os.stat(file_path)
+    entry = {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "sha256": sha256 or _file_sha256(file_path),
+        "chunk_ids": list(chunk_ids),
+    }
+    if signatures:
+        entry["signatures"] = list(signatures)
+    return entry
+
+def load_manifest(vectorstore_path=VECTORSTORE_PATH):
+    """
+    Loads the indexing manifest stored alongside the FAISS index.
+    
+    Args:
+        vectorstore_path (str): Directory of the vector store
+    
+    Returns:
+        dict: The manifest, or None if missing or unreadable
+    """
+    manifest_file = os.path.join(vectorstore_path, MANIFEST_FILENAME)
+    if not os.path.isfile(manifest_file):
+        return None
+    
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION or "files" not in manifest:
+            logging.warning(f"Ignoring manifest with unsupported format in {vectorstore_path}.")
+            return None
+        return manifest
+    except Exception as e:
+        logging.error(f"Failed to read manifest {manifest_file}: {e}", exc_info=True)
+        return None
+
+def save_manifest(manifest, vectorstore_path=VECTORSTORE_PATH):
+    """
+    Writes the indexing manifest next to the FAISS index.
+    The file is written to a temporary name first so a crash never leaves a truncated manifest.
+    
+    Args:
+        manifest (dict): The manifest to save
+        vectorstore_path (str): Directory of the vector store
+    """
+    os.makedirs(vectorstore_path, exist_ok=True)
+    manifest_file = os.path.join(vectorstore_path, MANIFEST_FILENAME)
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+def get_index_version(vectorstore):
+    """
+    Returns the version of a loaded index.
+    The version changes every time the index is saved, so caches keyed on it
+    are invalidated by a re-index.
+    
+    Args:
+        vectorstore: The vector store
+    
+    Returns:
+        str: The index version, or None if there is no vector store
+    """
+    if vectorstore is None:
+        return None
+    if not getattr(vectorstore, "index_version", None):
+        vectorstore.index_version = uuid.uuid4().hex
+    return vectorstore.index_version
+
+def build_sparse_index(vectorstore, vectorstore_path=VECTORSTORE_PATH, batch_size=STREAM_BATCH_SIZE):
+    """
+    Builds the BM25 inverted index over every chunk in the vector store and
+    saves it next to the FAISS index, tagged with the current index version.
+    Chunks of a SQLite docstore are streamed from the saved file in batches,
+    so the corpus text is never all in memory; build after saving the store.
+    
+    Args:
+        vectorstore (FAISS): The vector store
+        vectorstore_path (str): Directory of the vector store
+        batch_size (int): Chunks read per batch from a SQLite docstore
+    
+    Returns:
+        BM25Index: The sparse index
+    """
+    if isinstance(vectorstore.docstore, SQLiteDocstore):
+        batches = vectorstore.docstore.iter_texts(batch_size)
+    else:
+        doc_ids = list(vectorstore.index_to_docstore_id.values())
+        batches = [(doc_ids, [vectorstore.docstore.search(doc_id).page_content for doc_id in doc_ids])]
+    sparse_index = BM25Index.build_batches(batches, index_version=get_index_version(vectorstore))
+    sparse_index.save(os.path.join(vectorstore_path, SPARSE_INDEX_DIRNAME))
+    vectorstore.sparse_index = sparse_index
+    logging.info(f"BM25 index built: {len(sparse_index.doc_ids)} chunks, {len(sparse_index.terms)} terms.")
+    return sparse_index
+
+def _load_sparse_index(vectorstore, vectorstore_path):
+    """Attach the saved BM25 index if it was built for this exact index version."""
+    sparse_index = BM25Index.load(os.path.join(vectorstore_path, SPARSE_INDEX_DIRNAME))
+    if sparse_index is None:
+        return None
+    if sparse_index.index_version != vectorstore.index_version:
+        logging.warning("BM25 index is out of date with the FAISS index; using vector search only until the next re-index.")
+        return None
+    vectorstore.sparse_index = sparse_index
+    return sparse_index
+
+def get_retriever(vectorstore, k=5):
+    """
+    Returns the retriever for a vector store: hybrid BM25 + FAISS when a
+    matching sparse index is attached and hybrid retrieval is enabled,
+    plain similarity search otherwise.
+    
+    Args:
+        vectorstore: The vector store
+        k (int): Number of chunks to retrieve
+    
+    Returns:
+        BaseRetriever: The retriever
+    """
+    sparse_index = getattr(vectorstore, "sparse_index", None)
+    if HYBRID_RETRIEVAL and sparse_index is not None:
+        return HybridRetriever(vectorstore=vectorstore, sparse_index=sparse_index, k=k, fetch_k=max(k, HYBRID_FETCH_K))
+    return vectorstore.as_retriever(search_kwargs={"k": k})
+
+def _write_store(vectorstore, vectorstore_path):
+    """
+    Writes the index and its docstore. A store still holding its chunks in
+    memory moves them into a fresh SQLite file and switches to it, so later
+    saves only write what changed.
+    """
+    os.makedirs(vectorstore_path, exist_ok=True)
+    docstore_file = os.path.join(vectorstore_path, DOCSTORE_FILENAME)
+    index_file = os.path.join(vectorstore_path, INDEX_FILENAME)
+    
+    if not (isinstance(vectorstore.docstore, SQLiteDocstore) and vectorstore.docstore.path == docstore_file):
+        docstore = SQLiteDocstore(docstore_file)
+        docstore.reset()
+        docstore.add({doc_id: vectorstore.docstore.search(doc_id) for doc_id in vectorstore.index_to_docstore_id.values()})
+        vectorstore.docstore = docstore
+    
+    vectors_file = os.path.join(vectorstore_path, FULL_VECTORS_FILENAME)
+    if isinstance(vectorstore.index, RerankIndex):
+        with open(vectors_file + ".tmp", "wb") as f:
+            np.save(f, np.asarray(vectorstore.index.full, dtype=np.float32))
+        os.replace(vectors_file + ".tmp", vectors_file)
+        # Serve the rerank vectors from the page cache instead of keeping a copy in memory
+        vectorstore.index.full = np.load(vectors_file, mmap_mode="r")
+    elif os.path.isfile(vectors_file):
+        os.remove(vectors_file)
+    
+    faiss.write_index(base_index(vectorstore.index), index_file + ".tmp")
+    vectorstore.docstore.commit(vectorstore.index_to_docstore_id, meta={
+        "distance_strategy": vectorstore.distance_strategy.value,
+        "normalize_L2": vectorstore._normalize_L2
+    })
+    os.replace(index_file + ".tmp", index_file)
+    
+    legacy_file = os.path.join(vectorstore_path, LEGACY_DOCSTORE_FILENAME)
+    if os.path.isfile(legacy_file):
+        os.remove(legacy_file)
+
+def _read_index(index_file, mmap):
+    """Read a FAISS index, memory-mapping it when requested and supported by the index type."""
+    if mmap:
+        flags = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
+        try:
+            return faiss.read_index(index_file, flags)
+        except RuntimeError as e:
+            logging.warning(f"Could not memory-map {index_file} ({e}); reading it into memory.")
+    return faiss.read_index(index_file)
+
+def _attach_full_vectors(index, vectors_file, rerank_factor=FAISS_RERANK_FACTOR):
+    """Wraps a quantized index in a RerankIndex over its memory-mapped full-precision vectors."""
+    if not rerank_factor or not os.path.isfile(vectors_file):
+        return index
+    full = np.load(vectors_file, mmap_mode="r")
+    if full.shape != (index.ntotal, index.d):
+        logging.warning(f"{vectors_file} does not match the index ({full.shape} vs {index.ntotal}x{index.d}); searching without rerank.")
+        return index
+    return RerankIndex(index, full, rerank_factor)
+
+def _save_vector_store(vectorstore, files, vectorstore_path, final=True, index_factory=FAISS_INDEX_FACTORY):
+    """
+    Save the index and its manifest under a new index version.
+    Ingestion adds to a flat index; only the final save converts it to the
+    configured index type and rebuilds BM25. Intermediate checkpoints skip both,
+    and a loaded index whose sparse index has an older version simply falls
+    back to vector search.
+    """
+    if final:
+        with span("convert"):
+            convert_index(vectorstore, index_factory)
+    vectorstore.index_version = uuid.uuid4().hex
+    with span("save"):
+        _write_store(vectorstore, vectorstore_path)
+    if final and HYBRID_RETRIEVAL:
+        with span("sparse_index"):
+            build_sparse_index(vectorstore, vectorstore_path)
+    save_manifest({
+        "version": MANIFEST_VERSION,
+        "index_version": vectorstore.index_version,
+        "index_factory": getattr(vectorstore, "index_factory", FLAT_FACTORY),
+        "embedding_backend": embedding_backend(vectorstore.embeddings),
+        "files": files
+    }, vectorstore_path)
+    INDEX_VECTORS.set(vectorstore.index.ntotal)
+
+def _delete_chunks(vectorstore, chunk_ids):
+    """Remove chunks from the index, falling back to a flat copy for index types that cannot remove vectors."""
+    try:
+        vectorstore.delete(chunk_ids)
+    except RuntimeError:
+        logging.info(f"{vectorstore.index_factory} index cannot remove vectors; deleting from a flat copy.")
+        to_flat(vectorstore)
+        vectorstore.delete(chunk_ids)
+
+def _source_ref(metadata):
+    """The source file (and page) of a chunk, as kept in its `sources` list."""
+    return {key: metadata[key] for key in ("source", "page") if key in metadata}
+
+def _add_source(doc, split):
+    """Record that a deduplicated chunk also appears in another file."""
+    ref = _source_ref(split.metadata)
+    sources = doc.metadata.setdefault("sources", [_source_ref(doc.metadata)])
+    if ref not in sources:
+        sources.append(ref)
+
+def _update_indexed_doc(vectorstore, chunk_id, update):
+    """Apply `update(doc)` to the metadata of a chunk already in the store."""
+    doc = vectorstore.docstore.search(chunk_id)
+    if not isinstance(doc, Document):
+        return
+    update(doc)
+    # The in-memory docstore returns the stored object itself; SQLite needs the row rewritten
+    if isinstance(vectorstore.docstore, SQLiteDocstore):
+        vectorstore.docstore.add({chunk_id: doc})
+
+def _assign_chunk_id(split, dedup, pending, vectorstore=None):
+    """
+    Gives a split a new chunk ID, or the ID of the chunk it duplicates.
+    A duplicate is not embedded again: its source is appended to the
+    `sources` of the pending or indexed chunk it repeats.
+
+    Args:
+        split (Document): The chunk
+        dedup (ChunkDeduplicator): Signatures seen so far, None to disable deduplication
+        pending (dict): Chunk ID -> split of new chunks not yet in the store
+        vectorstore (FAISS): The store holding earlier chunks, if any
+
+    Returns:
+        tuple: (chunk ID, SimHash as hex or None, whether the chunk is new)
+    """
+    if dedup is None:
+        chunk_id = str(uuid.uuid4())
+        pending[chunk_id] = split
+        return chunk_id, None, True
+    
+    signature = simhash(split.page_content)
+    duplicate_of = dedup.find(signature)
+    if duplicate_of is None:
+        chunk_id = str(uuid.uuid4())
+        split.metadata["sources"] = [_source_ref(split.metadata)]
+        dedup.add(chunk_id, signature)
+        pending[chunk_id] = split
+        return chunk_id, f"{signature:016x}", True
+    
+    if duplicate_of in pending:
+        _add_source(pending[duplicate_of], split)
+    elif vectorstore is not None:
+        _update_indexed_doc(vectorstore, duplicate_of, lambda doc: _add_source(doc, split))
+    return duplicate_of, f"{signature:016x}", False
+
+def _drop_sources(vectorstore, chunk_ids, stale_keys):
+    """Remove re-indexed or deleted files from the `sources` of chunks other files still share."""
+    def update(doc):
+        sources = [ref for ref in doc.metadata.get("sources", []) if _manifest_key(ref.get("source", "")) not in stale_keys]
+        if sources:
+            # The chunk is now attributed to the first file still containing it
+            doc.metadata.pop("page", None)
+            doc.metadata.update(sources=sources, **sources[0])
+    for chunk_id in chunk_ids:
+        _update_indexed_doc(vectorstore, chunk_id, update)
+
+def _log_dedup(total, new):
+    """Report how many chunks of an indexing run were duplicates."""
+    if total:
+        logging.info(f"Deduplication: {total - new} of {total} chunks were duplicates ({(total - new) / total:.1%}); {new} embedded.")
+        annotate(chunks=total, duplicate_chunks=total - new)
+
+def _split_with_ids(docs, dedup=None):
+    """
+    Split documents and give every chunk an ID.
+    With `dedup`, near-duplicate chunks share the ID of the first one.
+    
+    Returns:
+        tuple: (all splits, their IDs, their signatures, pending ID -> split of the unique chunks)
+    """
+    splits = split_documents(docs)
+    pending, ids, signatures = {}, [], []
+    for split in splits:
+        chunk_id, signature, _ = _assign_chunk_id(split, dedup, pending)
+        ids.append(chunk_id)
+        signatures.append(signature)
+    return splits, ids, signatures, pending
+
+def _embed_into_store(vectorstore, splits, ids, embeddings_model):
+    """
+    Embeds chunks with the concurrent scheduler and adds each batch to the
+    index as soon as it is ready. Creates the FAISS store from the first
+    finished batch when `vectorstore` is None.
+    
+    Returns:
+        FAISS: The vector store holding the new chunks
+    """
+    texts = [split.page_content for split in splits]
+    # The scheduler owns rate-limit retries; the model stored with the index keeps the client's for queries
+    scheduler = EmbeddingScheduler(without_client_retries(embeddings_model))
+    # A quantized index grows as an exact flat copy and is re-quantized on the final save
+    if vectorstore is not None and isinstance(vectorstore.index, RerankIndex):
+        to_flat(vectorstore)
+    
+    with span("embed"):
+        for indices, vectors in scheduler.iter_embeddings(texts):
+            text_embeddings = [(texts[i], vector) for i, vector in zip(indices, vectors)]
+            metadatas = [splits[i].metadata for i in indices]
+            batch_ids = [ids[i] for i in indices]
+            if vectorstore is None:
+                vectorstore = FAISS.from_embeddings(text_embeddings, embeddings_model, metadatas=metadatas, ids=batch_ids)
+                vectorstore.index_factory = FLAT_FACTORY
+            else:
+                vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=batch_ids)
+    
+    return vectorstore
+
+def _manifest_files(splits, ids, signatures):
+    """Group chunk IDs by their source file and fingerprint each file into manifest entries."""
+    chunks_by_source = {}
+    for split, chunk_id, signature in zip(splits, ids, signatures):
+        source = split.metadata.get("source")
+        if source:
+            # Chunk ID -> signature; a file repeating a chunk lists it once
+            chunks_by_source.setdefault(_manifest_key(source), {}).setdefault(chunk_id, signature)
+    
+    files = {}
+    for source, chunks in chunks_by_source.items():
+        if os.path.isfile(source):
+            files[source] = _file_entry(source, list(chunks), signatures=[sig for sig in chunks.values() if sig])
+    
+    return files
+
+def create_vector_store(docs, embeddings_model, vectorstore_path=VECTORSTORE_PATH, index_factory=FAISS_INDEX_FACTORY, dedup=CHUNK_DEDUP):
     """
     Creates a FAISS vector store from documents.
     This is where we convert text into searchable vectors.
@@ -16,6 +422,9 @@ def create_vector_store(docs, embeddings_model):
     Args:
         docs (list): List of documents to index
         embeddings_model: The embeddings model to use
+        vectorstore_path (str): Directory to save the vector store to
+        index_factory (str): FAISS index factory string (Flat, HNSW32, IVF1024,Flat, IVF1024,PQ16, ...)
+        dedup (bool): Index near-duplicate chunks once, listing all their sources
         
     Returns:
         FAISS: The vector store or None if fails
@@ -23,60 +432,290 @@ def create_vector_store(docs, embeddings_model):
     if not docs:
         logging.warning("No documents provided for vector store creation.")
         return None
-        
+    
+    # Indexing runs are rare and slow, so they are always traced
+    trace = start_trace("index", sample_rate=1, documents=len(docs))
+    status = "error"
     try:
-        # Split documents into smaller chunks for better retrieval
-        splits = split_documents(docs)
+        # Split documents into smaller chunks for better retrieval; near-duplicates are indexed once
+        splits, ids, signatures, unique = _split_with_ids(docs, ChunkDeduplicator() if dedup else None)
         
         if not splits:
             logging.warning("Document splitting resulted in zero chunks.")
             return None
+        if dedup:
+            _log_dedup(len(splits), len(unique))
         
         # Create and save the vector store
-        vs_dir = os.path.dirname(VECTORSTORE_PATH)
-        os.makedirs(vs_dir, exist_ok=True)
+        vs_dir = os.path.dirname(vectorstore_path)
+        if vs_dir:
+            os.makedirs(vs_dir, exist_ok=True)
         
-        vectorstore = FAISS.from_documents(documents=splits, embedding=embeddings_model)
-        vectorstore.save_local(VECTORSTORE_PATH)
+        vectorstore = _embed_into_store(None, list(unique.values()), list(unique), embeddings_model)
+        _save_vector_store(vectorstore, _manifest_files(splits, ids, signatures), vectorstore_path, index_factory=index_factory)
         
-        logging.info(f"FAISS index created with {len(splits)} chunks, saved to {VECTORSTORE_PATH}")
+        logging.info(f"FAISS {vectorstore.index_factory} index created with {len(unique)} chunks, saved to {vectorstore_path}")
+        status = "ok"
         return vectorstore
         
     except Exception as e:
         logging.error(f"Failed to create vector store: {e}", exc_info=True)
         return None
+    finally:
+        end_trace(trace, status)
 
-def load_vector_store(embeddings_model):
+def _diff_against_manifest(manifest, file_paths):
+    """
+    Compare the files on disk with the manifest.
+    Size and mtime are checked first; the content hash is only computed when they differ,
+    so a touched-but-identical file is not re-embedded.
+    
+    Returns:
+        tuple: (changed, removed, unchanged) where changed maps path -> sha256 and
+        unchanged maps path -> refreshed manifest entry
+    """
+    indexed = manifest["files"]
+    changed, unchanged = {}, {}
+    
+    for file_path in file_paths:
+        key = _manifest_key(file_path)
+        entry = indexed.get(key)
+        stat = os.stat(file_path)
+        
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            unchanged[key] = entry
+            continue
+        
+        sha256 = _file_sha256(file_path)
+        if entry and entry["sha256"] == sha256:
+            unchanged[key] = _file_entry(file_path, entry["chunk_ids"], sha256=sha256, signatures=entry.get("signatures"))
+        else:
+            changed[key] = sha256
+    
+    removed = [key for key in indexed if key not in unchanged and key not in changed]
+    return changed, removed, unchanged
+
+def update_vector_store(
+    embeddings_model,
+    directory_path=DATA_PATH,
+    vectorstore_path=VECTORSTORE_PATH,
+    batch_size=INDEX_BATCH_SIZE,
+    checkpoint_every=INDEX_CHECKPOINT_CHUNKS,
+    checkpoint_growth=INDEX_CHECKPOINT_GROWTH,
+    index_factory=FAISS_INDEX_FACTORY,
+    file_paths=None,
+    dedup=CHUNK_DEDUP,
+    progress=None
+):
+    """
+    Incrementally (re-)indexes a directory with bounded memory.
+    Files are parsed and split in the parse workers and their chunks are embedded and
+    added in fixed-size batches, so only a batch of chunks is ever held in
+    memory. Only new or changed files are processed; vectors of changed or
+    removed files are dropped. The index and manifest are checkpointed every
+    `checkpoint_every` chunks, so an interrupted run resumes where it stopped;
+    as the index grows, checkpoints are spaced by `checkpoint_growth` times its
+    size, since each one rewrites the whole vector file.
+    The index is converted to `index_factory` when the run completes.
+    
+    Args:
+        embeddings_model: The embeddings model to use
+        directory_path (str): Path to directory containing documents
+        vectorstore_path (str): Directory of the vector store
+        batch_size (int): Chunks embedded and added per batch
+        checkpoint_every (int): Chunks added between checkpoints
+        checkpoint_growth (float): Minimum chunks added between checkpoints, as a fraction of the index size
+        index_factory (str): FAISS index factory string
+        file_paths (list): Files to index instead of everything under `directory_path`
+        dedup (bool): Index near-duplicate chunks once, listing all their sources
+        progress (callable): Called as progress(stage, done, total) as files are
+            indexed ("index") and before the final save ("save")
+    
+    Returns:
+        FAISS: The updated vector store or None if fails
+    """
+    trace = start_trace("index", sample_rate=1, path=vectorstore_path)
+    status = "error"
+    manifest = load_manifest(vectorstore_path)
+    vectorstore = load_vector_store(embeddings_model, vectorstore_path, mmap=False) if manifest else None
+    
+    if vectorstore is None:
+        logging.info("No existing index with a manifest found; building the vector store from scratch.")
+        manifest = {"version": MANIFEST_VERSION, "files": {}}
+    
+    try:
+        if file_paths is None:
+            file_paths = list_data_files(directory_path)
+        changed, removed, unchanged = _diff_against_manifest(manifest, file_paths)
+        if trace is not None:
+            trace.annotate(changed_files=len(changed), removed_files=len(removed))
+        logging.info(f"Incremental index: {len(changed)} new/changed, {len(removed)} removed, {len(unchanged)} unchanged files.")
+        
+        stale_keys = set(removed) | {key for key in changed if key in manifest["files"]}
+        # Deduplicated chunks can belong to several files; only drop those no unchanged file still uses
+        kept_ids = {chunk_id for entry in unchanged.values() for chunk_id in entry["chunk_ids"]}
+        stale_ids = list(dict.fromkeys(
+            chunk_id for key in stale_keys for chunk_id in manifest["files"][key]["chunk_ids"]
+        ))
+        shared_ids = [chunk_id for chunk_id in stale_ids if chunk_id in kept_ids]
+        stale_ids = [chunk_id for chunk_id in stale_ids if chunk_id not in kept_ids]
+        if stale_ids:
+            _delete_chunks(vectorstore, stale_ids)
+        if shared_ids:
+            _drop_sources(vectorstore, shared_ids, stale_keys)
+        
+        deduplicator = ChunkDeduplicator.from_manifest_entries(unchanged.values()) if dedup else None
+        files = dict(unchanged)
+        # New chunks waiting to be embedded, in order
+        pending = {}
+        # Entries of files whose chunks are queued but not yet in the index
+        queued_entries = {}
+        added_chunks = 0
+        total_chunks = 0
+        since_checkpoint = 0
+        
+        def flush():
+            nonlocal vectorstore, added_chunks, since_checkpoint
+            if pending:
+                vectorstore = _embed_into_store(vectorstore, list(pending.values()), list(pending), embeddings_model)
+                added_chunks += len(pending)
+                since_checkpoint += len(pending)
+                pending.clear()
+            files.update(queued_entries)
+            queued_entries.clear()
+        
+        def checkpoint(final=False):
+            # Called between files: flushing first guarantees every chunk in the
+            # saved index belongs to a file recorded in the saved manifest
+            nonlocal since_checkpoint
+            flush()
+            if vectorstore is not None:
+                _save_vector_store(vectorstore, files, vectorstore_path, final=final, index_factory=index_factory)
+                logging.info(f"Checkpoint saved: {len(files)} files, {vectorstore.index.ntotal} chunks indexed.")
+            since_checkpoint = 0
+        
+        if progress:
+            progress("index", 0, len(changed))
+        for files_done, (key, splits) in enumerate(iter_documents(list(changed), splitter=StructuredTextSplitter()), 1):
+            # Chunk ID -> signature; a file repeating a chunk lists it once
+            chunks = {}
+            for split in splits:
+                chunk_id, signature, _ = _assign_chunk_id(split, deduplicator, pending, vectorstore)
+                chunks.setdefault(chunk_id, signature)
+                total_chunks += 1
+                if len(pending) >= batch_size:
+                    flush()
+            # Files that yield no text are still recorded so they are not re-parsed on every run
+            queued_entries[key] = _file_entry(key, list(chunks), sha256=changed[key], signatures=[sig for sig in chunks.values() if sig])
+            if len(pending) >= batch_size:
+                flush()
+            if since_checkpoint and since_checkpoint >= max(checkpoint_every, checkpoint_growth * vectorstore.index.ntotal):
+                checkpoint()
+            if progress:
+                progress("index", files_done, len(changed))
+        flush()
+        if dedup:
+            _log_dedup(total_chunks, added_chunks)
+        
+        if vectorstore is None:
+            logging.warning(f"No documents found or loaded for indexing in {directory_path}.")
+            return None
+        
+        target_factory = effective_factory(index_factory, vectorstore.index.ntotal)
+        up_to_date = (
+            not changed and not removed and files == manifest["files"]
+            and vectorstore.index_factory == target_factory
+            and isinstance(vectorstore.docstore, SQLiteDocstore)
+        )
+        if up_to_date:
+            if HYBRID_RETRIEVAL and getattr(vectorstore, "sparse_index", None) is None:
+                build_sparse_index(vectorstore, vectorstore_path)
+            logging.info("Index is up to date; nothing to re-index.")
+            status = "ok"
+            return vectorstore
+        
+        if progress:
+            progress("save", len(changed), len(changed))
+        checkpoint(final=True)
+        logging.info(f"Index saved: +{added_chunks} chunks, -{len(stale_ids)} chunks, {vectorstore.index.ntotal} total.")
+        status = "ok"
+        return vectorstore
+    
+    except Exception as e:
+        logging.error(f"Failed to update vector store: {e}", exc_info=True)
+        return None
+    finally:
+        end_trace(trace, status)
+
+def load_vector_store(embeddings_model, vectorstore_path=VECTORSTORE_PATH, mmap=VECTORSTORE_MMAP):
     """
     Loads an existing FAISS vector store from disk.
-    This is faster than recreating it from documents.
+    This is faster than recreating it from documents: with `mmap` the vectors
+    are memory-mapped and chunk text stays in SQLite until a search needs it,
+    so startup time does not grow with the corpus and processes share the
+    page cache. Memory-mapped stores are read-only; indexing loads with
+    `mmap=False`.
     
     Args:
         embeddings_model: The embeddings model to use
+        vectorstore_path (str): Directory of the vector store
+        mmap (bool): Memory-map the index and read the position mapping lazily
         
     Returns:
         FAISS: The vector store or None if fails
     """
-    if os.path.exists(VECTORSTORE_PATH) and os.path.isdir(VECTORSTORE_PATH):
-        faiss_file = os.path.join(VECTORSTORE_PATH, "index.faiss")
-        pkl_file = os.path.join(VECTORSTORE_PATH, "index.pkl")
+    if os.path.exists(vectorstore_path) and os.path.isdir(vectorstore_path):
+        faiss_file = os.path.join(vectorstore_path, INDEX_FILENAME)
+        docstore_file = os.path.join(vectorstore_path, DOCSTORE_FILENAME)
+        pkl_file = os.path.join(vectorstore_path, LEGACY_DOCSTORE_FILENAME)
         
-        if os.path.isfile(faiss_file) and os.path.isfile(pkl_file):
-            try:
-                vectorstore = FAISS.load_local(
-                    VECTORSTORE_PATH, 
-                    embeddings_model, 
-                    allow_dangerous_deserialization=True
+        if os.path.isfile(faiss_file) and (os.path.isfile(docstore_file) or os.path.isfile(pkl_file)):
+            manifest = load_manifest(vectorstore_path) or {}
+            built_with = manifest.get("embedding_backend")
+            configured = embedding_backend(embeddings_model)
+            # Vectors from another model live in a different space: searching them returns noise
+            if built_with and configured and built_with != configured:
+                logging.error(
+                    f"Index at {vectorstore_path} was built with embeddings {built_with}, "
+                    f"but {configured} is configured. Re-index the documents to use it."
                 )
-                logging.info(f"Loaded FAISS index from {VECTORSTORE_PATH}")
+                return None
+            try:
+                if os.path.isfile(docstore_file):
+                    docstore = SQLiteDocstore(docstore_file, snapshot=mmap)
+                    meta = docstore.meta()
+                    positions = docstore.positions()
+                    vectorstore = FAISS(
+                        embedding_function=embeddings_model,
+                        index=_read_index(faiss_file, mmap),
+                        docstore=docstore,
+                        index_to_docstore_id=positions if mmap else dict(positions.items()),
+                        normalize_L2=meta.get("normalize_L2", False),
+                        distance_strategy=DistanceStrategy(meta.get("distance_strategy", DistanceStrategy.EUCLIDEAN_DISTANCE.value))
+                    )
+                else:
+                    vectorstore = FAISS.load_local(
+                        vectorstore_path,
+                        embeddings_model, 
+                        allow_dangerous_deserialization=True
+                    )
+                vectorstore.index_version = manifest.get("index_version")
+                # The index type is stored in index.faiss itself; search parameters come from config
+                vectorstore.index_factory = manifest.get("index_factory", FLAT_FACTORY)
+                set_search_params(vectorstore.index)
+                vectorstore.index = _attach_full_vectors(vectorstore.index, os.path.join(vectorstore_path, FULL_VECTORS_FILENAME))
+                if HYBRID_RETRIEVAL:
+                    _load_sparse_index(vectorstore, vectorstore_path)
+                INDEX_VECTORS.set(vectorstore.index.ntotal)
+                logging.info(f"Loaded FAISS {vectorstore.index_factory} index from {vectorstore_path}")
                 return vectorstore
                 
             except Exception as e:
                 logging.error(f"Failed to load FAISS index: {e}", exc_info=True)
                 return None
         else:
-            logging.warning(f"FAISS index files not found in {VECTORSTORE_PATH}.")
+            logging.warning(f"FAISS index files not found in {vectorstore_path}.")
             return None
     else:
-        logging.warning(f"FAISS index directory not found at {VECTORSTORE_PATH}.")
-        return None 
\ No newline at end of file
+        logging.warning(f"FAISS index directory not found at {vectorstore_path}.")
+        return None 
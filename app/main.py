@@ -11,11 +11,11 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Import our application components
-from app.utils.config import ensure_directories
+from app.utils.config import METRICS_PORT, ensure_directories
+from app.utils.metrics import start_metrics_server
 from app.utils.logging_utils import setup_logging
 from app.utils.session import initialize_session_state
-from app.core.llm import get_embeddings_model, get_llm
-from app.core.vector_store import load_vector_store
+from app.core.resources import get_shared_resources
 from app.ui.sidebar import render_sidebar
 from app.ui.chat import render_chat_ui
 
@@ -28,7 +28,10 @@ def initialize_app():
     1. Set up logging
     2. Ensure necessary directories exist
     3. Initialize session state
-    4. Load models and vector store if API key is provided
+    4. Load the process-wide models and vector store if API key is provided
+    
+    Models and the index are shared by every browser session; the session
+    only records whether they are available.
     """
     # Set up logging
     setup_logging()
@@ -39,30 +42,22 @@ def initialize_app():
     # Initialize session state
     initialize_session_state()
     
+    # Expose query latency metrics to Prometheus (once per process)
+    if METRICS_PORT > 0:
+        start_metrics_server(METRICS_PORT)
+    
     # If we have an API key, load models and vector store
     if st.session_state.openai_api_key_provided:
         try:
-            # Load embeddings model if not already loaded
-            if st.session_state.embeddings_model is None:
-                st.session_state.embeddings_model = get_embeddings_model()
-                
-            # Load LLM if not already loaded
-            if st.session_state.llm is None:
-                # Load a streaming LLM for the chat interface
-                st.session_state.llm = get_llm(streaming=True)
-                
-            # Mark models as loaded
+            resources = get_shared_resources()
+            
+            # Create the shared embeddings model and streaming LLM on first use
+            resources.models()
             st.session_state.models_loaded = True
             
-            # Try to load vector store if models are loaded
-            if st.session_state.models_loaded and st.session_state.vector_store is None:
-                st.session_state.vector_store = load_vector_store(st.session_state.embeddings_model)
-                if st.session_state.vector_store:
-                    st.session_state.vector_store_loaded = True
-                    logging.info("Vector store loaded successfully.")
-                else:
-                    st.session_state.vector_store_loaded = False
-                    logging.warning("Vector store not found or failed to load.")
+            # Load the shared vector store the first time any session needs it
+            resources.ensure_index_loaded()
+            st.session_state.vector_store_loaded = resources.vector_store is not None
                     
         except Exception as e:
             st.sidebar.error(f"Failed to initialize OpenAI models: {e}")
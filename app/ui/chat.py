@@ -6,6 +6,8 @@ import streamlit as st
 import time
 import logging
 from ..core.rag_engine import get_streaming_answer
+from ..core.resources import get_shared_resources
+from .streaming import StreamRenderer
 
 def render_chat_header(session_name, mode_text):
     """Render the chat header with session name and mode"""
@@ -62,29 +64,33 @@ def handle_user_input(user_query, current_sid):
             # Time the response for monitoring
             start_time = time.time()
             
-            # Use streaming answer
-            answer_text = ""
+            # Use streaming answer, re-rendered at a capped frame rate rather than per token
+            renderer = StreamRenderer(message_placeholder.markdown)
+            resources = get_shared_resources()
             
-            # Stream the response
-            for chunk in get_streaming_answer(
-                query=user_query,
-                chat_history=raw_history_tuples,
-                vectorstore=st.session_state.vector_store,
-                llm=st.session_state.llm,
-                chatgpt_enabled=st.session_state.chatgpt_enabled
-            ):
-                answer_text += chunk
-                message_placeholder.markdown(answer_text + "▌")
-                time.sleep(0.01)  # Small delay for smoother streaming
+            # Stream the response; the lease keeps the index open if a re-index swaps it meanwhile
+            with resources.lease() as vectorstore:
+                for chunk in get_streaming_answer(
+                    query=user_query,
+                    chat_history=raw_history_tuples,
+                    vectorstore=vectorstore,
+                    llm=resources.llm,
+                    chatgpt_enabled=st.session_state.chatgpt_enabled,
+                    memory=current_session.get("memory")
+                ):
+                    renderer.write(chunk)
             
             # Update with final text (remove the cursor)
-            message_placeholder.markdown(answer_text)
+            answer_text = renderer.close()
             
             # Update history with the AI's response
             st.session_state.chat_sessions[current_sid]["history"][-1] = (user_query, answer_text)
             
             end_time = time.time()
-            logging.info(f"Query processed in {end_time - start_time:.2f} seconds.")
+            logging.info(
+                f"Query processed in {end_time - start_time:.2f} seconds "
+                f"({renderer.chunks} chunks, {renderer.tokens_per_second():.1f} tokens/s, {renderer.frames} renders)."
+            )
             
         except Exception as e:
             st.error(f"An error occurred: {e}")
@@ -6,8 +6,10 @@ import os
 import streamlit as st
 import logging
 from ..utils.config import DATA_PATH
-from ..core.document_store import load_documents
-from ..core.vector_store import create_vector_store
+from ..core.indexing_jobs import SUCCEEDED, get_indexing_worker
+
+# Seconds between refreshes of the indexing progress while a job runs
+INDEX_STATUS_REFRESH_SECONDS = 1
 
 def get_file_icon(filename):
     """
@@ -94,27 +96,41 @@ def render_document_upload():
             
             st.sidebar.success(f"Saved: {uploaded_file.name}")
         
-        # Index after upload
+        # Index after upload, in the background; the session keeps serving the current index meanwhile
         if st.sidebar.button("Index Uploaded Documents", key="index_uploaded"):
-            with st.spinner("Indexing uploaded documents..."):
-                try:
-                    # Load and process documents
-                    docs = load_documents(DATA_PATH)
-                    if docs:
-                        # Create the vector store
-                        vs = create_vector_store(docs, st.session_state.embeddings_model)
-                        if vs:
-                            st.session_state.vector_store = vs
-                            st.session_state.vector_store_loaded = True
-                            st.sidebar.success("Indexing complete!")
-                            st.rerun()
-                        else:
-                            st.sidebar.error("Indexing failed. Check logs.")
-                    else:
-                        st.sidebar.warning("No documents found or loaded for indexing.")
-                except Exception as e:
-                    st.sidebar.error(f"Indexing error: {e}")
-                    logging.error(f"Indexing error: {e}", exc_info=True)
+            try:
+                job = get_indexing_worker().submit(DATA_PATH)
+                st.session_state.index_job_id = job.id
+            except Exception as e:
+                st.sidebar.error(f"Indexing error: {e}")
+                logging.error(f"Indexing error: {e}", exc_info=True)
+
+def _refreshing(render):
+    """Re-runs `render` on its own every INDEX_STATUS_REFRESH_SECONDS where Streamlit supports fragments, otherwise on the next interaction."""
+    fragment = getattr(st, "fragment", None)
+    return fragment(run_every=INDEX_STATUS_REFRESH_SECONDS)(render) if fragment else render
+
+@_refreshing
+def render_indexing_status():
+    """
+    Render the progress of this session's indexing job
+    """
+    job_id = st.session_state.get("index_job_id")
+    job = get_indexing_worker().get(job_id) if job_id else None
+    if job is None:
+        return
+    
+    if not job.finished:
+        st.progress(job.fraction, text=job.describe())
+        return
+    
+    del st.session_state["index_job_id"]
+    if job.state == SUCCEEDED:
+        st.session_state.vector_store_loaded = True
+        st.success("Indexing complete!")
+        st.rerun()
+    else:
+        st.error(job.describe())
 
 def render_document_management():
     """
@@ -124,4 +140,7 @@ def render_document_management():
     st.sidebar.subheader("Document Management")
     
     render_document_list()
-    render_document_upload() 
\ No newline at end of file
+    render_document_upload()
+    # Fragments cannot write to the sidebar from inside, so the status is placed in it from here
+    with st.sidebar:
+        render_indexing_status() 
\ No newline at end of file
@@ -6,6 +6,7 @@ import os
 import streamlit as st
 import logging
 import uuid
+from ..core.chat_memory import ChatMemory
 from .document_management import render_document_management
 
 def render_api_key_input():
@@ -51,7 +52,7 @@ def render_chat_session_management():
     if st.sidebar.button("➕ New Chat", key="new_chat_button"):
         new_session_id = str(uuid.uuid4())
         session_count = len(st.session_state.chat_sessions) + 1
-        st.session_state.chat_sessions[new_session_id] = {"name": f"Chat {session_count}", "history": []}
+        st.session_state.chat_sessions[new_session_id] = {"name": f"Chat {session_count}", "history": [], "memory": ChatMemory()}
         st.session_state.current_session_id = new_session_id
         st.rerun()  # Refresh to show new chat
     
@@ -117,7 +118,7 @@ def delete_session(session_id):
         else:
             # Create a new chat if no others exist
             new_session_id = str(uuid.uuid4())
-            st.session_state.chat_sessions[new_session_id] = {"name": "Chat 1", "history": []}
+            st.session_state.chat_sessions[new_session_id] = {"name": "Chat 1", "history": [], "memory": ChatMemory()}
             st.session_state.current_session_id = new_session_id
 
 def render_sidebar():
@@ -0,0 +1,86 @@
+"""
+Coalescing renderer for streamed answers
+"""
+
+import time
+from ..utils.config import STREAM_MAX_FPS
+
+# A chunk ending in one of these closes a sentence or line, a natural point to show progress
+SENTENCE_ENDS = (".", "!", "?", ":", "\n")
+
+class StreamRenderer:
+    """
+    Buffers streamed chunks and re-renders the answer at a capped frame rate.
+    Re-rendering the whole growing markdown for every token costs O(n²) work
+    for an n-token answer; capping the frame rate bounds it by the answer's
+    duration instead. A chunk that ends a sentence is shown after half a
+    frame, so text appears in readable pieces.
+
+        renderer = StreamRenderer(lambda text: placeholder.markdown(text))
+        for chunk in chunks:
+            renderer.write(chunk)
+        answer = renderer.close()
+    """
+
+    def __init__(self, render, max_fps=STREAM_MAX_FPS, cursor="▌", clock=time.perf_counter):
+        """
+        Args:
+            render (callable): Called with the text to display
+            max_fps (float): Maximum renders per second, 0 renders every chunk
+            cursor (str): Appended to the text while the answer is streaming
+            clock (callable): Monotonic time source in seconds
+        """
+        self.render = render
+        self.frame_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.cursor = cursor
+        self.clock = clock
+        self.text = ""
+        self._pending = []
+        self._last_render = None
+        self.chunks = 0
+        self.frames = 0
+        self.first_chunk_at = None
+        self.last_chunk_at = None
+
+    def write(self, chunk):
+        """Adds a chunk and renders if a frame is due."""
+        if not chunk:
+            return
+        now = self.clock()
+        if self.first_chunk_at is None:
+            self.first_chunk_at = now
+        self.last_chunk_at = now
+        self.chunks += 1
+        self._pending.append(chunk)
+
+        # The first chunk is shown at once so time-to-first-token is not delayed
+        if self._last_render is None:
+            self._flush(now)
+            return
+        elapsed = now - self._last_render
+        if elapsed >= self.frame_interval or (elapsed >= self.frame_interval / 2 and chunk.rstrip(" ").endswith(SENTENCE_ENDS)):
+            self._flush(now)
+
+    def _flush(self, now, final=False):
+        if self._pending:
+            self.text += "".join(self._pending)
+            self._pending.clear()
+        self.render(self.text if final else self.text + self.cursor)
+        self._last_render = now
+        self.frames += 1
+
+    def close(self):
+        """
+        Renders the complete answer without the cursor.
+
+        Returns:
+            str: The full answer text
+        """
+        self._flush(self.clock(), final=True)
+        return self.text
+
+    def tokens_per_second(self):
+        """Chunks received per second between the first and the last chunk (LLM chunks are roughly tokens)."""
+        if self.first_chunk_at is None or self.last_chunk_at <= self.first_chunk_at:
+            return 0.0
+        return (self.chunks - 1) / (self.last_chunk_at - self.first_chunk_at)
@@ -17,6 +17,111 @@ LOGS_PATH = os.getenv("LOGS_PATH", "logs/")
 # Models
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+# EMBEDDING_MODEL=local-hash embeds offline with hashed n-grams instead of the OpenAI API
+LOCAL_EMBEDDING_DIM = int(os.getenv("LOCAL_EMBEDDING_DIM", "512"))
+
+# Embedding cache (set EMBEDDING_CACHE_MAX_ENTRIES=0 to disable the size cap)
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "vectorstore/embedding_cache.sqlite")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "500000"))
+
+# Document parsing (worker processes, per-file timeout and per-worker memory cap; 0 disables a limit)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(8, os.cpu_count() or 1))))
+PARSE_TIMEOUT_SECONDS = float(os.getenv("PARSE_TIMEOUT_SECONDS", "120"))
+PARSE_MEMORY_LIMIT_MB = int(os.getenv("PARSE_MEMORY_LIMIT_MB", "2048"))
+
+# Chunking: chunks of at most CHUNK_TOKENS tokens that end at headings, clauses and paragraphs,
+# overlapping by up to CHUNK_OVERLAP_TOKENS; large corpora are split in SPLIT_WORKERS processes
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "250"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+SPLIT_WORKERS = int(os.getenv("SPLIT_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+# Streaming ingestion (chunks embedded per batch and added between checkpoints); a checkpoint
+# rewrites index.faiss, so checkpoints are spaced by at least INDEX_CHECKPOINT_GROWTH x the index size
+INDEX_BATCH_SIZE = int(os.getenv("INDEX_BATCH_SIZE", "512"))
+INDEX_CHECKPOINT_CHUNKS = int(os.getenv("INDEX_CHECKPOINT_CHUNKS", "5000"))
+INDEX_CHECKPOINT_GROWTH = float(os.getenv("INDEX_CHECKPOINT_GROWTH", "0.25"))
+
+# Near-duplicate chunks (SimHash within CHUNK_DEDUP_MAX_DISTANCE of 64 bits) are indexed
+# once; the chunk lists every source it appears in
+CHUNK_DEDUP = os.getenv("CHUNK_DEDUP", "true").lower() == "true"
+CHUNK_DEDUP_MAX_DISTANCE = int(os.getenv("CHUNK_DEDUP_MAX_DISTANCE", "3"))
+
+# Index versions: every re-index is built in a new directory under VECTORSTORE_PATH/versions/ and
+# served only once verified; INDEX_KEEP_VERSIONS published versions are kept (the older for rollback)
+INDEX_KEEP_VERSIONS = int(os.getenv("INDEX_KEEP_VERSIONS", "2"))
+# Background indexing: finished jobs whose status and progress can still be queried
+INDEX_JOB_HISTORY = int(os.getenv("INDEX_JOB_HISTORY", "20"))
+
+# Embedding scheduler used during indexing (set a per-minute limit to 0 to disable it)
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "4"))
+EMBEDDING_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", "8000"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_REQUESTS_PER_MINUTE = int(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "3000"))
+EMBEDDING_TOKENS_PER_MINUTE = int(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "1000000"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "6"))
+
+# Answer cache (exact + near-duplicate question lookup, shared by all sessions)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400"))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+
+# Low-latency mode: retrieve speculatively while condensing follow-up questions
+LOW_LATENCY_MODE = os.getenv("LOW_LATENCY_MODE", "true").lower() == "true"
+SPECULATIVE_REUSE_THRESHOLD = float(os.getenv("SPECULATIVE_REUSE_THRESHOLD", "0.6"))
+
+# Context packing: merge overlapping chunks, diversify with MMR and fit a token budget
+CONTEXT_PACKING = os.getenv("CONTEXT_PACKING", "true").lower() == "true"
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+CONTEXT_MMR_LAMBDA = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+
+# Chat memory: the last CHAT_MEMORY_WINDOW_TURNS turns go into prompts verbatim, older
+# turns are folded into a running summary of at most CHAT_MEMORY_SUMMARY_TOKENS tokens
+CHAT_MEMORY_WINDOW_TURNS = int(os.getenv("CHAT_MEMORY_WINDOW_TURNS", "4"))
+CHAT_MEMORY_SUMMARY_TOKENS = int(os.getenv("CHAT_MEMORY_SUMMARY_TOKENS", "300"))
+
+# Hybrid retrieval: BM25 inverted index fused with FAISS by reciprocal rank fusion
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "true").lower() == "true"
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "20"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+BM25_K1 = float(os.getenv("BM25_K1", "1.5"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+# Memory-map the saved index when serving (indexing always loads it writable)
+VECTORSTORE_MMAP = os.getenv("VECTORSTORE_MMAP", "true").lower() == "true"
+
+# Sharded layout: "none" (one index), "collection" (one shard per top-level folder of
+# DATA_PATH) or "hash" (VECTORSTORE_HASH_SHARDS buckets); shards are searched in parallel
+VECTORSTORE_SHARDING = os.getenv("VECTORSTORE_SHARDING", "none").lower()
+VECTORSTORE_HASH_SHARDS = int(os.getenv("VECTORSTORE_HASH_SHARDS", "4"))
+SHARD_SEARCH_WORKERS = int(os.getenv("SHARD_SEARCH_WORKERS", "8"))
+
+# FAISS index type as a factory string (Flat, HNSW32, IVF1024,Flat, IVF1024,PQ16) and
+# its search-time parameters; IVF/PQ indexes are trained on up to FAISS_TRAIN_SAMPLE vectors
+FAISS_INDEX_FACTORY = os.getenv("FAISS_INDEX_FACTORY", "Flat")
+FAISS_TRAIN_SAMPLE = int(os.getenv("FAISS_TRAIN_SAMPLE", "100000"))
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "16"))
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))
+# Scalar-quantized (SQfp16, SQ8) and PQ indexes keep full-precision vectors on disk; the
+# best k * FAISS_RERANK_FACTOR candidates of a search are rescored with them (0 = no rerank)
+FAISS_RERANK_FACTOR = int(os.getenv("FAISS_RERANK_FACTOR", "4"))
+
+# HTTP API (python -m app.api.server): bind address, threads for blocking work (index
+# loading, local searches), and chat sessions whose rolling-summary memory is kept
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_WORKERS = int(os.getenv("API_WORKERS", "32"))
+API_MAX_SESSIONS = int(os.getenv("API_MAX_SESSIONS", "10000"))
+
+# Tracing: fraction of requests whose per-stage latencies are recorded in the metrics and
+# logged as JSON (0 disables it); METRICS_PORT serves /metrics from the Streamlit app (0 = off)
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Chat UI: streamed answers are re-rendered at most this many times per second
+# (and at sentence ends), instead of once per token
+STREAM_MAX_FPS = float(os.getenv("STREAM_MAX_FPS", "15"))
 
 # Create necessary directories if they don't exist
 def ensure_directories():
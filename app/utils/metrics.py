@@ -0,0 +1,270 @@
+"""
+Lightweight latency tracing and Prometheus metrics for the query and indexing paths
+"""
+
+import json
+import time
+import random
+import logging
+import threading
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .config import TRACE_SAMPLE_RATE
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds: from sub-millisecond local work up to slow LLM generations
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+_trace_logger = logging.getLogger("rag.trace")
+
+def _label_text(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+class _Metric:
+    """A named metric with one series per combination of label values."""
+
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._series.items()):
+                lines.extend(self._render_series(key, value))
+        return lines
+
+    def _render_series(self, key, value):
+        return [f"{self.name}{_label_text(self.labelnames, key)} {value}"]
+
+    def snapshot(self):
+        """Returns {label values: value} for tests and JSON dumps."""
+        with self._lock:
+            return dict(self._series)
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram, rendered the way Prometheus expects."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def _render_series(self, key, series):
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets, series["counts"]):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, ('le', repr(float(bound))))} {cumulative}")
+        lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, ('le', '+Inf'))} {series['count']}")
+        lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {series['sum']}")
+        lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {series['count']}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            return {key: {"count": series["count"], "sum": series["sum"]} for key, series in self._series.items()}
+
+STAGE_SECONDS = Histogram("rag_stage_seconds", "Duration of one stage of a traced request.", ["operation", "stage"])
+REQUEST_SECONDS = Histogram("rag_request_seconds", "Total duration of a traced request.", ["operation"])
+TIME_TO_FIRST_TOKEN_SECONDS = Histogram("rag_time_to_first_token_seconds", "Time from request start to the first streamed token.")
+TOKENS = Histogram("rag_tokens", "Tokens per traced request.", ["kind"], buckets=TOKEN_BUCKETS)
+REQUESTS = Counter("rag_requests_total", "Requests served.", ["operation", "mode"])
+ANSWER_CACHE_LOOKUPS = Counter("rag_answer_cache_lookups_total", "Answer cache lookups by result.", ["result"])
+INDEX_VECTORS = Gauge("rag_index_vectors", "Vectors in the most recently loaded or saved index.")
+
+REGISTRY = [STAGE_SECONDS, REQUEST_SECONDS, TIME_TO_FIRST_TOKEN_SECONDS, TOKENS, REQUESTS, ANSWER_CACHE_LOOKUPS, INDEX_VECTORS]
+
+def render_prometheus():
+    """Renders every metric in the Prometheus text exposition format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+class Trace:
+    """Stage timings and attributes of one sampled request."""
+
+    def __init__(self, operation, **attributes):
+        self.operation = operation
+        self.attributes = attributes
+        self.stages = {}
+        self.start = time.perf_counter()
+        # Restores the enclosing trace when this one ends
+        self.token = None
+
+    def record(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, operation=self.operation, stage=stage)
+
+    def annotate(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self, status="ok"):
+        """Observe the total duration and emit the trace as one JSON log line."""
+        total = time.perf_counter() - self.start
+        REQUEST_SECONDS.observe(total, operation=self.operation)
+        for kind in ("context", "completion"):
+            tokens = self.attributes.get(f"{kind}_tokens")
+            if tokens is not None:
+                TOKENS.observe(tokens, kind=kind)
+        _trace_logger.info(json.dumps({
+            "event": "trace",
+            "operation": self.operation,
+            "status": status,
+            "total_ms": round(total * 1000, 3),
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()},
+            **self.attributes,
+        }, default=str))
+
+_current_trace = ContextVar("rag_trace", default=None)
+
+def start_trace(operation, sample_rate=None, **attributes):
+    """
+    Starts a trace for a request if it is sampled and makes it current until
+    end_trace(). An unsampled request leaves the current trace as it is, so
+    work nested in a traced operation is still recorded on it.
+
+    Args:
+        operation (str): Name of the request type, e.g. "answer"
+        sample_rate (float): Fraction of requests traced, TRACE_SAMPLE_RATE if None
+        **attributes: Recorded with the trace
+
+    Returns:
+        Trace: The trace, or None if the request is not sampled
+    """
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if not (rate > 0 and (rate >= 1 or random.random() < rate)):
+        return None
+    trace = Trace(operation, **attributes)
+    trace.token = _current_trace.set(trace)
+    return trace
+
+def end_trace(trace, status="ok"):
+    """Finishes a trace started with start_trace() and makes the enclosing trace, if any, current again."""
+    if trace is None:
+        return
+    trace.finish(status)
+    try:
+        _current_trace.reset(trace.token)
+    except ValueError:
+        # Ended in another context than it started in (a generator resumed by the sync wrapper),
+        # which never had the trace set
+        pass
+
+def current_trace():
+    """Returns the trace of the running request, or None."""
+    return _current_trace.get()
+
+def annotate(**attributes):
+    """Adds attributes to the current trace, if any."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.annotate(**attributes)
+
+class span:
+    """
+    Times a block as a stage of the current trace:
+
+        with span("retrieve"):
+            docs = retriever.invoke(question)
+
+    Without a current trace it only reads a context variable.
+    """
+
+    __slots__ = ("stage", "trace", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.trace = _current_trace.get()
+
+    def __enter__(self):
+        if self.trace is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.trace is not None:
+            self.trace.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+def start_metrics_server(port, host="0.0.0.0"):
+    """
+    Serves GET /metrics on a background thread, once per process. Used by the
+    Streamlit app; the HTTP API serves /metrics itself.
+
+    Args:
+        port (int): Port to listen on
+        host (str): Interface to bind
+    """
+    global _metrics_server
+    with _metrics_server_lock:
+        if _metrics_server is not None:
+            return
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        _metrics_server = ThreadingHTTPServer((host, port), Handler)
+        _metrics_server.daemon_threads = True
+        threading.Thread(target=_metrics_server.serve_forever, name="metrics-server", daemon=True).start()
+        logging.info(f"Serving Prometheus metrics on http://{host}:{port}/metrics")
@@ -5,6 +5,7 @@ Session state management for the Streamlit application
 import streamlit as st
 import uuid
 import logging
+from ..core.chat_memory import ChatMemory
 
 def initialize_session_state():
     """
@@ -22,28 +23,19 @@ def initialize_session_state():
     if "models_loaded" not in st.session_state:
         st.session_state.models_loaded = False
     
-    # Initialize embeddings model
-    if "embeddings_model" not in st.session_state:
-        st.session_state.embeddings_model = None
-    
-    # Initialize LLM
-    if "llm" not in st.session_state:
-        st.session_state.llm = None
-    
-    # Initialize vector store
-    if "vector_store" not in st.session_state:
-        st.session_state.vector_store = None
+    # Track whether the shared vector store is available (models and index live in app.core.resources)
+    if "vector_store_loaded" not in st.session_state:
         st.session_state.vector_store_loaded = False
     
     # Initialize chat sessions
     if "chat_sessions" not in st.session_state:
-        st.session_state.chat_sessions = {}  # Format: {session_id: {"name": str, "history": List[Tuple(str,str)]}}
+        st.session_state.chat_sessions = {}  # Format: {session_id: {"name": str, "history": List[Tuple(str,str)], "memory": ChatMemory}}
     
     # Initialize current session ID
     if "current_session_id" not in st.session_state:
         # Create first chat session
         first_session_id = str(uuid.uuid4())
-        st.session_state.chat_sessions[first_session_id] = {"name": "Chat 1", "history": []}
+        st.session_state.chat_sessions[first_session_id] = {"name": "Chat 1", "history": [], "memory": ChatMemory()}
         st.session_state.current_session_id = first_session_id
     
     # Initialize ChatGPT mode toggle
@@ -0,0 +1,65 @@
+"""
+Token counting utilities shared by ingestion and prompt building
+"""
+
+import logging
+from functools import lru_cache
+
+# Average characters per token for English text, used when tiktoken's
+# encoding files cannot be loaded (e.g. air-gapped machines)
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name="cl100k_base"):
+    """
+    Returns a cached tiktoken encoding, or None if it is unavailable.
+    Loading an encoding is expensive, so it is done once per process.
+
+    Args:
+        encoding_name (str): Name of the tiktoken encoding
+
+    Returns:
+        Encoding: The tiktoken encoding or None
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logging.warning(f"tiktoken encoding '{encoding_name}' unavailable ({e}); estimating tokens from characters.")
+        return None
+
+def count_tokens(text, encoding_name="cl100k_base"):
+    """
+    Counts the tokens in a text.
+
+    Args:
+        text (str): Text to measure
+        encoding_name (str): Name of the tiktoken encoding
+
+    Returns:
+        int: Number of tokens
+    """
+    encoding = get_encoding(encoding_name)
+    if encoding is None:
+        return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_tokens(text, max_tokens, encoding_name="cl100k_base"):
+    """
+    Cuts a text down to at most `max_tokens` tokens.
+
+    Args:
+        text (str): Text to truncate
+        max_tokens (int): Maximum number of tokens to keep
+        encoding_name (str): Name of the tiktoken encoding
+
+    Returns:
+        str: The text, shortened if needed
+    """
+    encoding = get_encoding(encoding_name)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
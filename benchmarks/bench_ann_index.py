@@ -0,0 +1,98 @@
+"""
+Recall vs latency of the FAISS index types the vector store can build.
+
+Vectors are synthetic: points scattered around random cluster centres and
+L2-normalized like OpenAI embeddings, so IVF partitions behave as they would on
+real chunks. Recall@k is measured against an exact Flat search. Quantized
+indexes (SQfp16, SQ8, PQ) are also measured with full-precision rerank
+("rerank=N" rescoring the best k*N candidates); MB is the in-memory index, the
+rerank vectors stay on disk.
+
+Run with:
+    python -m benchmarks.bench_ann_index --vectors 200000 --dim 256 --queries 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import faiss
+from app.core.ann_index import RerankIndex, build_index, is_lossy, set_search_params
+
+def synthetic_vectors(n, dim, clusters, rng):
+    """Clustered, L2-normalized float32 vectors."""
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, n)] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+def recall_at_k(found, truth):
+    """Fraction of the exact top-k neighbours that were found."""
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+def index_bytes(index):
+    return faiss.serialize_index(index).nbytes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=1024, help="Inverted lists for IVF indexes")
+    parser.add_argument("--pq-m", type=int, default=32, help="Sub-quantizers for IVF-PQ (must divide --dim)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--rerank-factor", type=int, nargs="+", default=[4], help="Rerank candidates per result for quantized indexes")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = synthetic_vectors(args.vectors, args.dim, clusters=max(16, args.vectors // 500), rng=rng)
+    queries = synthetic_vectors(args.queries, args.dim, clusters=max(16, args.vectors // 500), rng=rng)
+
+    configs = [
+        ("Flat", {}),
+        ("HNSW32", {"efSearch": args.ef_search}),
+        ("SQfp16", {}),
+        ("SQ8", {}),
+        ("HNSW32,SQ8", {"efSearch": args.ef_search}),
+        (f"IVF{args.nlist},SQ8", {"nprobe": args.nprobe}),
+        (f"IVF{args.nlist},Flat", {"nprobe": args.nprobe}),
+        (f"IVF{args.nlist},PQ{args.pq_m}", {"nprobe": args.nprobe}),
+    ]
+
+    print(f"{args.vectors} vectors x {args.dim} dims, {args.queries} queries, recall@{args.k}")
+    print(f"  {'index':22s} {'param':>22s} {'build s':>8s} {'MB':>8s} {'recall':>7s} {'ms/query':>9s}")
+    truth = None
+    for factory, sweeps in configs:
+        start = time.perf_counter()
+        index = build_index(vectors, factory)
+        build_seconds = time.perf_counter() - start
+        size_mb = index_bytes(index) / 1e6
+
+        settings = [(name, value) for name, values in sweeps.items() for value in values] or [(None, None)]
+        rerank_factors = [0] + (args.rerank_factor if is_lossy(factory) else [])
+        for name, value in settings:
+            if name == "nprobe":
+                set_search_params(index, nprobe=value, ef_search=0)
+            elif name == "efSearch":
+                set_search_params(index, nprobe=0, ef_search=value)
+
+            for rerank_factor in rerank_factors:
+                searched = RerankIndex(index, vectors, rerank_factor) if rerank_factor else index
+                start = time.perf_counter()
+                _, found = searched.search(queries, args.k)
+                ms_per_query = (time.perf_counter() - start) / args.queries * 1000
+                if truth is None:
+                    truth = found
+                label = ",".join(filter(None, [f"{name}={value}" if name else None, f"rerank={rerank_factor}" if rerank_factor else None])) or ("-" if is_lossy(factory) else "exact")
+                print(f"  {factory:22s} {label:>22s} {build_seconds:8.1f} {size_mb:8.1f} "
+                      f"{recall_at_k(found, truth):7.3f} {ms_per_query:9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Throughput and chunk shape of the structure-aware token splitter versus the
+previous character splitter (RecursiveCharacterTextSplitter, 1000/200 chars).
+
+Splits a synthetic policy corpus (numbered sections, one clause per line and
+benefit tables; --plain for paragraphs only) and reports chunks/s, chunk
+count, token sizes, how many chunks start at a heading or clause, and how
+many cut a clause or table row in two. The structured splitter is run with
+each --workers count; corpora under PARALLEL_SPLIT_MIN_CHARS are split inline
+whatever the count.
+
+Run with:
+    python -m benchmarks.bench_chunking --documents 500 --workers 1 4 8
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+from app.core.document_store import PARALLEL_SPLIT_MIN_CHARS, list_data_files, split_documents
+from app.utils.config import CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS
+from app.utils.tokens import count_tokens
+from benchmarks.corpus import generate_policy_corpus
+
+# A chunk starting like this begins at a section heading, a numbered clause or a table row
+_BOUNDARY_START = re.compile(r"^(SECTION \d+|\d+\.\d+ |\||\w[^\n]* Policy - Wording)", re.IGNORECASE)
+# Every line of the corpus ends a clause or a row; a chunk ending elsewhere cut one
+_COMPLETE_END = re.compile(r"[.|]$")
+
+def read_corpus(directory):
+    """Reads the corpus files into documents, so only splitting is timed."""
+    docs = []
+    for path in list_data_files(directory):
+        with open(path, encoding="utf-8") as f:
+            docs.append(Document(page_content=f.read(), metadata={"source": path}))
+    return docs
+
+def describe(chunks, seconds):
+    tokens = [count_tokens(chunk.page_content) for chunk in chunks]
+    return {
+        "chunks": len(chunks),
+        "chunks_per_second": len(chunks) / seconds,
+        "mean_tokens": sum(tokens) / len(tokens),
+        "max_tokens": max(tokens),
+        "over_budget": sum(count > CHUNK_TOKENS for count in tokens) / len(tokens),
+        "boundary_starts": sum(bool(_BOUNDARY_START.match(chunk.page_content)) for chunk in chunks) / len(chunks),
+        "cut_ends": sum(not _COMPLETE_END.search(chunk.page_content) for chunk in chunks) / len(chunks),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--sentences", type=int, default=6)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--plain", action="store_true", help="Paragraphs of clauses without headings, numbering or tables")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench_chunking_")
+    try:
+        generate_policy_corpus(data_dir, documents=args.documents, paragraphs=args.paragraphs,
+                               sentences=args.sentences, structured=not args.plain)
+        docs = read_corpus(data_dir)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    total_chars = sum(len(doc.page_content) for doc in docs)
+
+    runs = []
+    recursive = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200, length_function=len)
+    start = time.perf_counter()
+    chunks = recursive.split_documents(docs)
+    runs.append(("recursive 1000/200 chars", describe(chunks, time.perf_counter() - start)))
+    for workers in args.workers:
+        start = time.perf_counter()
+        chunks = split_documents(docs, workers=workers)
+        parallel = workers > 1 and total_chars >= PARALLEL_SPLIT_MIN_CHARS
+        label = f"structured {CHUNK_TOKENS}/{CHUNK_OVERLAP_TOKENS} tokens, {f'{workers} procs' if parallel else 'inline'}"
+        runs.append((label, describe(chunks, time.perf_counter() - start)))
+
+    print(f"{len(docs)} documents, {total_chars / 1e6:.1f}M chars, {'plain' if args.plain else 'structured'} corpus")
+    print(f"  {'splitter':34s} {'chunks':>8s} {'chunks/s':>10s} {'mean tok':>9s} {'max tok':>8s} "
+          f"{'>budget':>8s} {'starts@':>8s} {'cut':>6s}")
+    for label, stats in runs:
+        print(f"  {label:34s} {stats['chunks']:8d} {stats['chunks_per_second']:10.0f} {stats['mean_tokens']:9.1f} "
+              f"{stats['max_tokens']:8d} {stats['over_budget']:8.1%} {stats['boundary_starts']:8.1%} {stats['cut_ends']:6.1%}")
+
+if __name__ == "__main__":
+    main()
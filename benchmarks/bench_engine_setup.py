@@ -0,0 +1,82 @@
+"""
+Micro-benchmark of per-request setup overhead in the RAG engine.
+
+Compares the previous per-call construction (retriever + ConversationBufferMemory
+replay + ConversationalRetrievalChain.from_llm) with the compiled RagEngine,
+where a request only looks up the engine and formats the history.
+No LLM or embedding calls are made; only setup work is timed.
+
+Run with:
+    python -m benchmarks.bench_engine_setup --iterations 500 --turns 10
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain.memory import ConversationBufferMemory
+from langchain.chains import ConversationalRetrievalChain
+from langchain_community.vectorstores import FAISS
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from app.config.prompts import CONDENSE_QUESTION_PROMPT, ANSWER_PROMPT
+from app.core.rag_engine import get_rag_engine, format_chat_history
+
+def per_request_setup(vectorstore, llm, chat_history):
+    """The setup get_answer() used to repeat for every query."""
+    retriever = vectorstore.as_retriever(search_kwargs={"k": 5})
+    memory = ConversationBufferMemory(
+        memory_key='chat_history',
+        input_key='question',
+        output_key='answer',
+        return_messages=True
+    )
+    for human_msg, ai_msg in chat_history:
+        memory.chat_memory.add_user_message(human_msg)
+        memory.chat_memory.add_ai_message(ai_msg)
+    return ConversationalRetrievalChain.from_llm(
+        llm=llm,
+        retriever=retriever,
+        memory=memory,
+        return_source_documents=False,
+        condense_question_prompt=CONDENSE_QUESTION_PROMPT,
+        combine_docs_chain_kwargs={"prompt": ANSWER_PROMPT},
+        verbose=False
+    )
+
+def compiled_engine_setup(vectorstore, llm, chat_history):
+    """The per-request work left with a compiled RagEngine."""
+    engine = get_rag_engine(vectorstore, llm, chatgpt_enabled=True)
+    return engine, format_chat_history(chat_history)
+
+def time_setup(setup, vectorstore, llm, chat_history, iterations):
+    """Return mean microseconds per call."""
+    setup(vectorstore, llm, chat_history)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        setup(vectorstore, llm, chat_history)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--turns", type=int, default=10, help="Chat history length in turns")
+    args = parser.parse_args()
+
+    vectorstore = FAISS.from_texts([f"Policy clause {i}" for i in range(100)], DeterministicFakeEmbedding(size=64))
+    llm = FakeListChatModel(responses=["ok"])
+    chat_history = [(f"Question {i}?", f"Answer {i}.") for i in range(args.turns)]
+
+    before = time_setup(per_request_setup, vectorstore, llm, chat_history, args.iterations)
+    after = time_setup(compiled_engine_setup, vectorstore, llm, chat_history, args.iterations)
+
+    print(f"Per-request setup, {args.turns}-turn history, {args.iterations} iterations")
+    print(f"  per-call chain construction: {before:10.1f} us/request")
+    print(f"  compiled RagEngine:          {after:10.1f} us/request")
+    print(f"  overhead removed:            {before - after:10.1f} us/request ({before / max(after, 1e-9):.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+End-to-end offline benchmark suite.
+
+Generates a synthetic policy corpus and measures, with deterministic fake
+embeddings and LLM standing in for get_embeddings_model() / get_llm():
+- load_documents, split_documents and create_vector_store throughput
+- retrieval latency percentiles
+- time-to-first-token and total latency of get_streaming_answer
+
+Results are written as JSON; pass a previous results file as --baseline to
+print the change of every metric.
+
+Run with:
+    python -m benchmarks.bench_suite --documents 200 --output results.json
+    python -m benchmarks.bench_suite --documents 200 --baseline results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Measure the pipeline itself: no cached answers, no rate limiting of the fake embeddings
+os.environ.setdefault("ANSWER_CACHE_ENABLED", "false")
+os.environ.setdefault("EMBEDDING_REQUESTS_PER_MINUTE", "0")
+os.environ.setdefault("EMBEDDING_TOKENS_PER_MINUTE", "0")
+
+import numpy as np
+from app.core.document_store import load_documents, split_documents
+from app.core.vector_store import create_vector_store, load_vector_store, get_retriever
+from app.core.rag_engine import get_streaming_answer
+from benchmarks.corpus import generate_policy_corpus, sample_questions
+from benchmarks.fakes import FakeEmbeddings, FakeChatModel
+
+FOLLOW_UP_HISTORY = [("What does the Premium Motor policy cover?", "Accidental damage, theft and third-party liability.")]
+
+def percentiles(samples):
+    """p50/p95/p99 and mean of a list of seconds, in milliseconds."""
+    values = np.asarray(samples) * 1000
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "mean_ms": float(values.mean()),
+    }
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def bench_ingestion(data_dir, vectorstore_path, embeddings, corpus):
+    docs, load_seconds = timed(load_documents, data_dir)
+    chunks, split_seconds = timed(split_documents, docs)
+    vectorstore, index_seconds = timed(create_vector_store, docs, embeddings, vectorstore_path)
+    if vectorstore is None:
+        raise RuntimeError("create_vector_store failed; see the log.")
+    return {
+        "load_documents": {
+            "seconds": load_seconds,
+            "files_per_second": corpus["files"] / load_seconds,
+            "mb_per_second": corpus["bytes"] / 1e6 / load_seconds,
+        },
+        "split_documents": {
+            "seconds": split_seconds,
+            "chunks": len(chunks),
+            "chunks_per_second": len(chunks) / split_seconds,
+        },
+        "create_vector_store": {
+            "seconds": index_seconds,
+            "chunks_per_second": len(chunks) / index_seconds,
+        },
+    }
+
+def bench_retrieval(vectorstore, questions, k):
+    retriever = get_retriever(vectorstore, k=k)
+    retriever.invoke(questions[0])  # warm-up
+    samples = [timed(retriever.invoke, question)[1] for question in questions]
+    return {"queries": len(samples), "k": k, **percentiles(samples)}
+
+def bench_streaming(vectorstore, llm, questions, chat_history):
+    first_token, total, tokens = [], [], 0
+    for question in questions:
+        start = time.perf_counter()
+        ttft = None
+        for chunk in get_streaming_answer(question, chat_history, vectorstore, llm, chatgpt_enabled=True):
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            tokens += 1
+        total.append(time.perf_counter() - start)
+        first_token.append(ttft if ttft is not None else total[-1])
+    return {
+        "queries": len(questions),
+        "time_to_first_token": percentiles(first_token),
+        "total_latency": percentiles(total),
+        "tokens_per_second": tokens / sum(total),
+    }
+
+def run(args):
+    work_dir = tempfile.mkdtemp(prefix="rag-bench-")
+    try:
+        data_dir = os.path.join(work_dir, "data")
+        vectorstore_path = os.path.join(work_dir, "db_faiss")
+        corpus = generate_policy_corpus(data_dir, documents=args.documents, paragraphs=args.paragraphs, seed=args.seed)
+
+        embeddings = FakeEmbeddings(size=args.dim)
+        results = bench_ingestion(data_dir, vectorstore_path, embeddings, corpus)
+
+        # Latency is only injected for serving, so ingestion numbers measure the pipeline itself
+        embeddings.latency = args.embed_latency
+        vectorstore = load_vector_store(embeddings, vectorstore_path)
+        questions = sample_questions(args.queries, seed=args.seed)
+        results["retrieval"] = bench_retrieval(vectorstore, questions, args.k)
+
+        llm = FakeChatModel(first_token_latency=args.llm_latency, tokens_per_second=args.tokens_per_second)
+        results["streaming_first_question"] = bench_streaming(vectorstore, llm, questions[:args.answers], [])
+        results["streaming_follow_up"] = bench_streaming(vectorstore, llm, questions[:args.answers], FOLLOW_UP_HISTORY)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "corpus": corpus,
+        "results": results,
+    }
+
+def _flatten(tree, prefix=""):
+    for key, value in tree.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, name + ".")
+        elif isinstance(value, (int, float)):
+            yield name, value
+
+def compare(current, baseline):
+    """Print every metric next to its baseline value."""
+    before = dict(_flatten(baseline["results"]))
+    if baseline.get("config") != current["config"]:
+        print("  note: baseline was run with a different configuration")
+    print(f"  {'metric':55s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, value in _flatten(current["results"]):
+        if name not in before:
+            continue
+        change = f"{(value / before[name] - 1) * 100:+.1f}%" if before[name] else "n/a"
+        print(f"  {name:55s} {before[name]:12.2f} {value:12.2f} {change:>8s}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100, help="Synthetic policy files to generate")
+    parser.add_argument("--paragraphs", type=int, default=20, help="Paragraphs per file")
+    parser.add_argument("--dim", type=int, default=256, help="Fake embedding dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Retrieval queries")
+    parser.add_argument("--answers", type=int, default=20, help="Streamed answers per scenario")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="Seconds per query embedding call")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Seconds before the LLM's first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="LLM token rate (0 = instant)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    report = run(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+    else:
+        for name, value in _flatten(report["results"]):
+            print(f"  {name:55s} {value:12.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Time-to-first-token of follow-up questions with and without low-latency mode.
+
+Uses fake models: the LLM has a fixed first-token latency (applied to the
+condense call as well) and query embedding has a fixed round-trip latency,
+so the serial condense -> retrieve -> generate chain is visible.
+
+Run with:
+    python -m benchmarks.bench_ttft --llm-latency 0.3 --embed-latency 0.1
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import statistics
+from contextlib import aclosing
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_community.vectorstores import FAISS
+from app.core.rag_engine import RagEngine
+from benchmarks.fakes import FakeEmbeddings, FakeChatModel
+
+CHAT_HISTORY = [("How do I file a claim for my car insurance policy?", "Submit the claim form with photos of the damage.")]
+
+FOLLOW_UPS = [
+    "How long does it take?",
+    "What documents do I need for it?",
+    "Does comprehensive car insurance cover flood damage to the engine?",
+    "Can my spouse file it instead?",
+    "What is the deductible on the premium car insurance plan?",
+]
+
+async def time_to_first_token(engine, query):
+    start = time.perf_counter()
+    async with aclosing(engine.astream(query, CHAT_HISTORY)) as chunks:
+        async for _ in chunks:
+            break
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Seconds before the LLM's first token")
+    parser.add_argument("--embed-latency", type=float, default=0.1, help="Seconds per query embedding call")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    embeddings = FakeEmbeddings()
+    texts = [f"Clause {i}: claims for car insurance policies are settled within {i % 30 + 1} days." for i in range(200)]
+    vectorstore = FAISS.from_texts(texts, embeddings)
+    embeddings.latency = args.embed_latency
+    llm = FakeChatModel(first_token_latency=args.llm_latency)
+
+    print(f"Follow-up time-to-first-token (LLM latency {args.llm_latency}s, embed latency {args.embed_latency}s)")
+    results = {}
+    for label, low_latency in (("serial (before)", False), ("low-latency (after)", True)):
+        engine = RagEngine(vectorstore, llm, chatgpt_enabled=True, low_latency=low_latency)
+        samples = [asyncio.run(time_to_first_token(engine, query)) for _ in range(args.rounds) for query in FOLLOW_UPS]
+        results[label] = samples
+        print(f"  {label:22s} mean {statistics.mean(samples) * 1000:7.1f} ms   max {max(samples) * 1000:7.1f} ms")
+
+    before, after = (statistics.mean(samples) for samples in results.values())
+    print(f"  TTFT reduced by {(before - after) * 1000:.1f} ms ({(1 - after / before) * 100:.0f}%)")
+
+if __name__ == "__main__":
+    main()
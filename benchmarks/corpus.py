@@ -0,0 +1,119 @@
+"""
+Synthetic insurance policy corpus for offline benchmarks.
+Documents are generated from clause templates with a seeded RNG, so a given
+size and seed always produce the same files and the same questions.
+"""
+
+import os
+import random
+
+PRODUCTS = [
+    ("Motor", ["accidental damage", "theft of the vehicle", "third-party liability", "windscreen repair", "roadside assistance"]),
+    ("Home", ["fire damage", "burglary", "escape of water", "storm damage", "accidental breakage"]),
+    ("Health", ["hospitalisation", "day-care procedures", "maternity expenses", "ambulance charges", "pre-existing conditions"]),
+    ("Travel", ["trip cancellation", "lost baggage", "medical evacuation", "flight delay", "passport loss"]),
+    ("Life", ["death benefit", "terminal illness", "accidental death rider", "premium waiver", "maturity benefit"]),
+]
+
+CLAUSES = [
+    "Section {section}: The policy covers {cover} up to {amount} per claim, subject to a deductible of {deductible}.",
+    "Claims for {cover} must be reported within {days} days of the incident, quoting policy number {policy}.",
+    "The insurer settles approved {cover} claims within {settle} working days of receiving all documents.",
+    "Exclusion {section}.{sub}: {cover} caused by wilful misconduct, war or nuclear risks is not covered.",
+    "A waiting period of {days} days applies to {cover} for new {product} policies.",
+    "The annual premium for the {tier} {product} plan is {premium}, payable monthly or yearly.",
+    "To claim for {cover}, submit the claim form, proof of loss and identity documents to the nearest branch.",
+    "No-claim bonus: each claim-free year increases the sum insured for {cover} by {bonus} percent.",
+]
+
+TIERS = ["Basic", "Standard", "Premium", "Platinum"]
+
+SECTION_TITLES = ["COVER", "EXCLUSIONS", "CLAIMS PROCEDURE", "PREMIUM AND RENEWAL", "GENERAL CONDITIONS", "DEFINITIONS"]
+
+QUESTIONS = [
+    "What does the {tier} {product} policy cover for {cover}?",
+    "How many days do I have to report a {cover} claim?",
+    "Is {cover} excluded under the {product} policy?",
+    "What is the deductible for {cover}?",
+    "How long does the insurer take to settle {cover} claims?",
+    "What is the waiting period for {cover}?",
+]
+
+def _clause(rng, product, cover):
+    return rng.choice(CLAUSES).format(
+        section=rng.randint(1, 20),
+        sub=rng.randint(1, 9),
+        cover=cover,
+        product=product,
+        tier=rng.choice(TIERS),
+        amount=f"Rs. {rng.randint(1, 50) * 10000:,}",
+        deductible=f"Rs. {rng.randint(1, 20) * 500:,}",
+        days=rng.choice([7, 15, 30, 45, 90]),
+        settle=rng.choice([7, 10, 15, 30]),
+        policy=f"POL-{rng.randint(2018, 2025)}-{rng.randint(0, 9999):04d}",
+        premium=f"Rs. {rng.randint(20, 400) * 100:,}",
+        bonus=rng.choice([5, 10, 20]),
+    )
+
+def _benefit_table(rng, covers):
+    rows = ["| Benefit | Sum insured | Waiting period |"]
+    rows += [f"| {cover} | Rs. {rng.randint(1, 50) * 10000:,} | {rng.choice([0, 15, 30, 90])} days |" for cover in covers]
+    return "\n".join(rows)
+
+def generate_policy_corpus(directory, documents=100, paragraphs=20, sentences=6, seed=0, structured=False):
+    """
+    Writes synthetic policy documents as .txt files.
+    Plain documents are a title and paragraphs of clauses; structured ones
+    lay the same clauses out like a policy wording, as numbered sections of
+    one clause per line with a benefit table after every fifth section.
+
+    Args:
+        directory (str): Directory to write to (created if needed)
+        documents (int): Number of files
+        paragraphs (int): Paragraphs per file
+        sentences (int): Clauses per paragraph
+        seed (int): RNG seed
+        structured (bool): Write headings, numbered clauses and tables
+
+    Returns:
+        dict: files, bytes and paragraphs written
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    total_bytes = 0
+    for i in range(documents):
+        product, covers = PRODUCTS[i % len(PRODUCTS)]
+        title = f"{rng.choice(TIERS)} {product} Insurance Policy - Wording {i:05d}"
+        lines = [title.upper() if structured else title, ""]
+        for p in range(paragraphs):
+            if structured:
+                lines.append(f"SECTION {p + 1} - {SECTION_TITLES[p % len(SECTION_TITLES)]}")
+                lines.extend(f"{p + 1}.{s + 1} {_clause(rng, product, rng.choice(covers))}" for s in range(sentences))
+                if p % 5 == 4:
+                    lines.extend(["", _benefit_table(rng, covers)])
+            else:
+                lines.append(" ".join(_clause(rng, product, rng.choice(covers)) for _ in range(sentences)))
+            lines.append("")
+        text = "\n".join(lines)
+        with open(os.path.join(directory, f"{product.lower()}_policy_{i:05d}.txt"), "w", encoding="utf-8") as f:
+            f.write(text)
+        total_bytes += len(text.encode("utf-8"))
+    return {"files": documents, "bytes": total_bytes, "paragraphs": documents * paragraphs}
+
+def sample_questions(count, seed=0):
+    """
+    Returns questions about the synthetic corpus.
+
+    Args:
+        count (int): Number of questions
+        seed (int): RNG seed
+
+    Returns:
+        list: Question strings
+    """
+    rng = random.Random(seed + 1)
+    questions = []
+    for _ in range(count):
+        product, covers = rng.choice(PRODUCTS)
+        questions.append(rng.choice(QUESTIONS).format(tier=rng.choice(TIERS), product=product, cover=rng.choice(covers)))
+    return questions
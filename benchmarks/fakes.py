@@ -0,0 +1,97 @@
+"""
+Deterministic local stand-ins for the OpenAI embeddings and chat models.
+They let benchmarks exercise the real pipeline with controllable latency and no API key.
+"""
+
+import re
+import time
+import hashlib
+from typing import Any, Iterator, List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+def _hash_int(token):
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+class FakeEmbeddings(Embeddings):
+    """
+    Bag-of-words hashed embeddings: texts that share words get similar vectors,
+    so retrieval over a synthetic corpus behaves plausibly.
+
+    Args:
+        size (int): Vector dimension
+        latency (float): Seconds slept per embed call, simulating a network round-trip
+    """
+
+    def __init__(self, size=256, latency=0.0):
+        self.size = size
+        self.latency = latency
+        self.calls = 0
+
+    def _embed(self, text):
+        vector = np.zeros(self.size, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            h = _hash_int(word)
+            vector[h % self.size] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model with a configurable time-to-first-token and token rate.
+    Condense-question prompts are answered by echoing the follow-up input, so
+    the condensed question looks like a real rewrite; every other prompt gets
+    `answer_text`.
+    """
+
+    answer_text: str = "Based on the policy documents, claims are settled within 30 days of receiving all paperwork."
+    first_token_latency: float = 0.0
+    tokens_per_second: float = 0.0
+    streaming: bool = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def _response_for(self, messages):
+        prompt = messages[-1].content if messages else ""
+        match = re.search(r"Follow Up Input:\s*(.*?)\s*\nStandalone question:", prompt, re.S)
+        return match.group(1) if match else self.answer_text
+
+    def _tokens(self, text):
+        return re.findall(r"\S+\s*|\s+", text)
+
+    def _token_delay(self):
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _generate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        text = self._response_for(messages)
+        time.sleep(self.first_token_latency + self._token_delay() * max(0, len(self._tokens(text)) - 1))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        text = self._response_for(messages)
+        if self.first_token_latency:
+            time.sleep(self.first_token_latency)
+        for i, token in enumerate(self._tokens(text)):
+            if i and self._token_delay():
+                time.sleep(self._token_delay())
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
@@ -0,0 +1,198 @@
+"""
+Local fake of the OpenAI embeddings and chat completions APIs for tests.
+Supports injected latency and a simple requests-per-window rate limit that answers 429.
+"""
+
+import json
+import time
+import base64
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+def fake_embedding(text, size):
+    """Deterministic unit vector derived from the text's hash."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(size).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+class FakeOpenAIServer:
+    """
+    Threaded HTTP server implementing POST /v1/embeddings and
+    POST /v1/chat/completions (streamed as Server-Sent Events when asked).
+
+    Args:
+        latency (float): Seconds to sleep before answering each request
+        max_requests_per_window (int): Requests allowed per window before returning 429 (0 = unlimited)
+        window_seconds (float): Length of the rate-limit window
+        embedding_size (int): Dimension of returned vectors
+        chat_reply (str): Content of every chat completion
+        token_delay (float): Seconds between streamed chat tokens
+    """
+
+    def __init__(self, latency=0.0, max_requests_per_window=0, window_seconds=1.0, embedding_size=16,
+                 chat_reply="The policy covers accidental damage.", token_delay=0.0):
+        self.latency = latency
+        self.max_requests_per_window = max_requests_per_window
+        self.window_seconds = window_seconds
+        self.embedding_size = embedding_size
+        self.chat_reply = chat_reply
+        self.token_delay = token_delay
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _admit(self):
+        """
+        Count a request against the rate limit.
+
+        Returns:
+            float: None if admitted, otherwise seconds until the window resets
+        """
+        with self._lock:
+            self.request_count += 1
+            if not self.max_requests_per_window:
+                return None
+            now = time.monotonic()
+            if now - self._window_start >= self.window_seconds:
+                self._window_start, self._window_count = now, 0
+            if self._window_count >= self.max_requests_per_window:
+                self.rate_limited_count += 1
+                return self.window_seconds - (now - self._window_start)
+            self._window_count += 1
+            return None
+
+    def _embeddings_response(self, payload):
+        inputs = payload["input"]
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        data = []
+        for i, text in enumerate(inputs):
+            vector = fake_embedding(text if isinstance(text, str) else json.dumps(text), self.embedding_size)
+            if payload.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(len(str(text).split()) for text in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": payload.get("model", "fake"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def _chat_tokens(self):
+        """The reply split into word tokens that join back to it."""
+        words = self.chat_reply.split(" ")
+        return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+    def _chat_response(self, payload):
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.chat_reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": len(self._chat_tokens()), "total_tokens": 1 + len(self._chat_tokens())},
+        }
+
+    def _chat_chunks(self, payload):
+        """Streamed completion chunks, ending with the finish_reason chunk."""
+        base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": payload.get("model", "fake")}
+        for i, token in enumerate(self._chat_tokens()):
+            delta = {"role": "assistant", "content": token} if i == 0 else {"content": token}
+            yield dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}])
+        yield dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body, headers=None):
+                raw = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def _send_stream(self, chunks):
+                # No Content-Length: the stream ends when the connection closes
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                for chunk in chunks:
+                    if server.token_delay:
+                        time.sleep(server.token_delay)
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                retry_after = server._admit()
+                if retry_after is not None:
+                    self._send_json(429, {"error": {"message": "Rate limit exceeded", "type": "rate_limit"}},
+                                    headers={"Retry-After": f"{retry_after:.3f}"})
+                    return
+
+                with server._lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    if self.path.rstrip("/").endswith("/embeddings"):
+                        self._send_json(200, server._embeddings_response(payload))
+                    elif self.path.rstrip("/").endswith("/chat/completions"):
+                        if payload.get("stream"):
+                            self._send_stream(server._chat_chunks(payload))
+                        else:
+                            self._send_json(200, server._chat_response(payload))
+                    else:
+                        self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+        return Handler
@@ -0,0 +1,117 @@
+"""
+Tests for the configurable FAISS index types
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import faiss
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from app.core.ann_index import RerankIndex, build_index, effective_factory, min_training_vectors
+from app.core.vector_store import FULL_VECTORS_FILENAME, update_vector_store, load_vector_store, load_manifest
+
+class TestIndexFactory(unittest.TestCase):
+    """Tests for building and training ANN indexes"""
+
+    def test_ivf_index_finds_exact_neighbours(self):
+        """Test an IVF index trained on a sample returns each stored vector as its own nearest neighbour"""
+        # Arrange
+        vectors = np.random.default_rng(0).standard_normal((2000, 32)).astype(np.float32)
+
+        # Act
+        index = build_index(vectors, "IVF16,Flat", train_sample=500)
+        _, found = index.search(vectors[:50], 1)
+
+        # Assert
+        self.assertIsInstance(faiss.downcast_index(index), faiss.IndexIVFFlat)
+        self.assertEqual(found[:, 0].tolist(), list(range(50)))
+
+    def test_small_corpus_stays_flat(self):
+        """Test a corpus too small to train IVF-PQ is built as an exact flat index"""
+        # Act
+        index = build_index(np.ones((100, 16), dtype=np.float32), "IVF64,PQ4")
+
+        # Assert
+        self.assertEqual(min_training_vectors("IVF64,PQ4"), 256)
+        self.assertEqual(effective_factory("IVF64,PQ4", 100), "Flat")
+        self.assertIsInstance(faiss.downcast_index(index), faiss.IndexFlat)
+
+    def test_rerank_restores_exact_order_of_quantized_search(self):
+        """Test rescoring SQ8 candidates with full-precision vectors gives the exact top-k"""
+        # Arrange
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((2000, 32)).astype(np.float32)
+        queries = rng.standard_normal((20, 32)).astype(np.float32)
+        exact = build_index(vectors, "Flat")
+        reranked = RerankIndex(build_index(vectors, "SQ8"), vectors, rerank_factor=8)
+
+        # Act
+        exact_distances, exact_ids = exact.search(queries, 5)
+        distances, ids = reranked.search(queries, 5)
+
+        # Assert
+        self.assertEqual(ids.tolist(), exact_ids.tolist())
+        np.testing.assert_allclose(distances, exact_distances, rtol=1e-4)
+
+class TestIndexTypePersistence(unittest.TestCase):
+    """Tests for index types through indexing, re-indexing and loading"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.tmp_dir, "data")
+        self.vectorstore_path = os.path.join(self.tmp_dir, "db_faiss")
+        self.embeddings = DeterministicFakeEmbedding(size=16)
+        os.makedirs(self.data_path)
+        for name in ("a", "b"):
+            self._write(name, f"Policy {name} clause text. " * 100)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, name, text):
+        with open(os.path.join(self.data_path, f"{name}.txt"), "w") as f:
+            f.write(text)
+
+    def test_hnsw_index_survives_reindex_and_reload(self):
+        """Test an HNSW store is persisted as HNSW and a changed file can still be re-indexed"""
+        # Arrange
+        update_vector_store(self.embeddings, self.data_path, self.vectorstore_path, index_factory="HNSW16")
+        self._write("a", "Rewritten rider wording.")
+
+        # Act
+        updated = update_vector_store(self.embeddings, self.data_path, self.vectorstore_path, index_factory="HNSW16")
+        loaded = load_vector_store(self.embeddings, self.vectorstore_path)
+
+        # Assert
+        self.assertEqual(load_manifest(self.vectorstore_path)["index_factory"], "HNSW16")
+        self.assertIsInstance(faiss.downcast_index(loaded.index), faiss.IndexHNSWFlat)
+        self.assertEqual(loaded.index.ntotal, updated.index.ntotal)
+        self.assertEqual(loaded.similarity_search("Rewritten rider wording.", k=1)[0].page_content, "Rewritten rider wording.")
+
+    def test_quantized_index_keeps_full_vectors_for_rerank(self):
+        """Test an SQ8 store saves its exact vectors, reranks with them after loading and can still be re-indexed"""
+        # Arrange
+        update_vector_store(self.embeddings, self.data_path, self.vectorstore_path, index_factory="SQ8")
+        self._write("a", "Rewritten rider wording.")
+
+        # Act
+        updated = update_vector_store(self.embeddings, self.data_path, self.vectorstore_path, index_factory="SQ8")
+        loaded = load_vector_store(self.embeddings, self.vectorstore_path)
+
+        # Assert
+        self.assertEqual(load_manifest(self.vectorstore_path)["index_factory"], "SQ8")
+        self.assertTrue(os.path.isfile(os.path.join(self.vectorstore_path, FULL_VECTORS_FILENAME)))
+        self.assertIsInstance(loaded.index, RerankIndex)
+        self.assertIsInstance(faiss.downcast_index(loaded.index.base), faiss.IndexScalarQuantizer)
+        self.assertEqual(loaded.index.ntotal, updated.index.ntotal)
+        self.assertEqual(loaded.similarity_search("Rewritten rider wording.", k=1)[0].page_content, "Rewritten rider wording.")
+
+if __name__ == '__main__':
+    unittest.main()
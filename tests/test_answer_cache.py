@@ -0,0 +1,99 @@
+"""
+Tests for the answer cache
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.answer_cache import AnswerCache
+
+def _embed(query):
+    # Questions about claims point one way, everything else another
+    return [1.0, 0.1] if "claim" in query.lower() else [0.0, 1.0]
+
+class TestAnswerCache(unittest.TestCase):
+    """Tests for AnswerCache"""
+    
+    def setUp(self):
+        self.cache = AnswerCache(max_entries=2, ttl_seconds=60, similarity_threshold=0.9)
+    
+    def test_normalized_query_hits_exactly(self):
+        """Test case, spacing and trailing punctuation do not defeat the cache"""
+        # Arrange
+        self.cache.put("How do I file a claim?", "rag_only", "v1", "Use the claim form.")
+        
+        # Act
+        answer, _ = self.cache.get("  how do I  file a CLAIM ", "rag_only", "v1")
+        
+        # Assert
+        self.assertEqual(answer, "Use the claim form.")
+    
+    def test_similar_query_hits_by_embedding(self):
+        """Test a differently worded question reuses the answer when embeddings are close"""
+        # Arrange
+        self.cache.put("How do I file a claim?", "rag_only", "v1", "Use the claim form.", query_embedding=_embed("claim"))
+        
+        # Act
+        similar, _ = self.cache.get("Steps to submit a claim", "rag_only", "v1", embed_query=_embed)
+        unrelated, _ = self.cache.get("What does comprehensive cover?", "rag_only", "v1", embed_query=_embed)
+        
+        # Assert
+        self.assertEqual(similar, "Use the claim form.")
+        self.assertIsNone(unrelated)
+    
+    def test_entries_are_scoped_by_mode_and_index_version(self):
+        """Test answers are not shared across modes or index versions"""
+        # Arrange
+        self.cache.put("What is a rider?", "rag_llm", "v1", "An add-on.")
+        
+        # Act
+        other_mode, _ = self.cache.get("What is a rider?", "rag_only", "v1")
+        new_index, _ = self.cache.get("What is a rider?", "rag_llm", "v2")
+        
+        # Assert
+        self.assertIsNone(other_mode)
+        self.assertIsNone(new_index)
+    
+    def test_hot_swap_keeps_both_versions_until_a_third_arrives(self):
+        """Test requests on the previous index during a swap neither clear nor see the new version's answers"""
+        # Arrange
+        cache = AnswerCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.9)
+        cache.put("What is a rider?", "rag_llm", "v1", "An add-on (v1).")
+        cache.put("What is a rider?", "rag_llm", "v2", "An add-on (v2).")
+        
+        # Act
+        old_lease, _ = cache.get("What is a rider?", "rag_llm", "v1")
+        new_lease, _ = cache.get("What is a rider?", "rag_llm", "v2")
+        cache.get("What is a rider?", "rag_llm", "v3")
+        retired, _ = cache.get("What is a rider?", "rag_llm", "v1")
+        
+        # Assert
+        self.assertEqual(old_lease, "An add-on (v1).")
+        self.assertEqual(new_lease, "An add-on (v2).")
+        self.assertIsNone(retired)
+        self.assertEqual(cache.stats()["entries"], 0)
+    
+    def test_least_recently_used_and_expired_entries_are_evicted(self):
+        """Test the size cap evicts the oldest entry and the TTL expires entries"""
+        # Arrange
+        self.cache.put("q1", "rag_only", "v1", "a1")
+        self.cache.put("q2", "rag_only", "v1", "a2")
+        self.cache.get("q1", "rag_only", "v1")
+        self.cache.put("q3", "rag_only", "v1", "a3")
+        
+        # Act
+        evicted, _ = self.cache.get("q2", "rag_only", "v1")
+        with patch('app.core.answer_cache.time.time', return_value=10 ** 12):
+            expired, _ = self.cache.get("q1", "rag_only", "v1")
+        
+        # Assert
+        self.assertIsNone(evicted)
+        self.assertIsNone(expired)
+
+if __name__ == '__main__':
+    unittest.main()
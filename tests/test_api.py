@@ -0,0 +1,131 @@
+"""
+End-to-end tests for the HTTP API against the local fake OpenAI server
+"""
+
+import unittest
+import asyncio
+import json
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aiohttp.test_utils import TestClient, TestServer
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from app.api.server import create_app
+from app.core.resources import SharedResources
+from tests.fake_openai_server import FakeOpenAIServer
+
+REPLY = "Accidental damage is covered up to the insured value."
+
+def parse_events(body):
+    """Split an SSE body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+class TestApi(unittest.IsolatedAsyncioTestCase):
+    """Tests for indexing, answers and SSE streaming over HTTP"""
+
+    async def asyncSetUp(self):
+        self.fake = FakeOpenAIServer(chat_reply=REPLY, token_delay=0.01).start()
+        self.addCleanup(self.fake.stop)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        data_path = os.path.join(self.tmp_dir, "data")
+        os.makedirs(data_path)
+        with open(os.path.join(data_path, "motor.txt"), "w") as f:
+            f.write("Motor policy. Accidental damage to the insured vehicle is covered up to the insured value.")
+
+        resources = SharedResources(
+            os.path.join(self.tmp_dir, "db_faiss"),
+            embeddings_factory=lambda: OpenAIEmbeddings(
+                model="text-embedding-3-small", openai_api_key="test-key",
+                openai_api_base=self.fake.base_url, check_embedding_ctx_length=False
+            ),
+            llm_factory=lambda: ChatOpenAI(
+                model="gpt-4o-mini", api_key="test-key", base_url=self.fake.base_url, streaming=True
+            )
+        )
+        self.client = TestClient(TestServer(create_app(resources, data_path=data_path, workers=8)))
+        await self.client.start_server()
+        self.addAsyncCleanup(self.client.close)
+
+    async def test_answer_before_indexing_is_unavailable(self):
+        """Test questions are refused with 503 until an index exists"""
+        # Act
+        response = await self.client.post("/answer", json={"query": "Is accidental damage covered?"})
+
+        # Assert
+        self.assertEqual(response.status, 503)
+
+    async def test_invalid_request_is_rejected(self):
+        """Test a request without a query gets a 400"""
+        # Act
+        response = await self.client.post("/answer", json={"history": []})
+
+        # Assert
+        self.assertEqual(response.status, 400)
+
+    async def test_index_then_answer(self):
+        """Test indexing the data directory and answering from it"""
+        # Act
+        index_response = await self.client.post("/index?wait=true")
+        answer_response = await self.client.post("/answer", json={"query": "Is accidental damage covered?"})
+
+        # Assert
+        self.assertEqual(index_response.status, 200)
+        self.assertEqual((await index_response.json())["generation"], 1)
+        self.assertEqual((await answer_response.json())["answer"], REPLY)
+
+    async def test_index_job_runs_in_the_background(self):
+        """Test POST /index returns a job at once and the job reports its progress until it succeeds"""
+        # Act
+        response = await self.client.post("/index")
+        job = await response.json()
+        for _ in range(100):
+            status = await (await self.client.get(f"/index/jobs/{job['id']}")).json()
+            if status["state"] in ("succeeded", "failed"):
+                break
+            await asyncio.sleep(0.05)
+
+        # Assert
+        self.assertEqual(response.status, 202)
+        self.assertEqual(response.headers["Location"], f"/index/jobs/{job['id']}")
+        self.assertEqual(status["state"], "succeeded")
+        self.assertEqual((status["done"], status["total"]), (1, 1))
+        self.assertEqual(status["generation"], 1)
+        self.assertEqual((await self.client.get("/index/jobs/unknown")).status, 404)
+
+    async def test_concurrent_streams_share_one_index(self):
+        """Test many concurrent SSE streams each receive the whole answer token by token"""
+        # Arrange
+        await self.client.post("/index?wait=true")
+
+        async def stream(i):
+            response = await self.client.post("/answer/stream", json={
+                "query": f"Question {i}: is accidental damage covered?",
+                "history": [["What does the motor policy cover?", "Accidental damage."]],
+                "session_id": f"session-{i}"
+            })
+            self.assertEqual(response.headers["Content-Type"], "text/event-stream")
+            return parse_events(await response.text())
+
+        # Act
+        results = await asyncio.gather(*(stream(i) for i in range(10)))
+
+        # Assert
+        for events in results:
+            self.assertEqual(events[-1], ("done", {}))
+            tokens = [data["text"] for event, data in events if event == "token"]
+            self.assertGreater(len(tokens), 1)
+            self.assertEqual("".join(tokens), REPLY)
+        self.assertEqual((await (await self.client.get("/health")).json())["generation"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
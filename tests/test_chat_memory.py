@@ -0,0 +1,81 @@
+"""
+Tests for the rolling-summary chat memory
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.runnables import RunnableLambda
+from app.core.chat_memory import ChatMemory
+
+def make_history(turns):
+    return [(f"question {i}", f"answer {i}") for i in range(turns)]
+
+class TestChatMemory(unittest.TestCase):
+    """Tests for the verbatim window and the incremental summary"""
+
+    def setUp(self):
+        self.prompts = []
+
+        def summarize(prompt_value):
+            self.prompts.append(prompt_value.to_string())
+            return f"summary {len(self.prompts)}"
+
+        self.llm = RunnableLambda(summarize)
+
+    def _history_text(self, memory, history):
+        return asyncio.run(memory.ahistory_text(history, self.llm))
+
+    def test_short_history_is_kept_verbatim(self):
+        """Test histories within the window are rendered without summarizing"""
+        # Arrange
+        memory = ChatMemory(window_turns=3)
+
+        # Act
+        text = self._history_text(memory, make_history(2))
+
+        # Assert
+        self.assertEqual(text, "Human: question 0\nAI: answer 0\nHuman: question 1\nAI: answer 1")
+        self.assertEqual(self.prompts, [])
+
+    def test_summary_is_updated_once_per_turn(self):
+        """Test each turn leaving the window is folded in once and older turns are not resent"""
+        # Arrange
+        memory = ChatMemory(window_turns=2)
+        history = make_history(3)
+
+        # Act
+        self._history_text(memory, history)
+        self._history_text(memory, history)
+        history.append(("question 3", "answer 3"))
+        text = self._history_text(memory, history)
+
+        # Assert
+        self.assertEqual(len(self.prompts), 2)
+        self.assertIn("question 1", self.prompts[1])
+        self.assertNotIn("question 0", self.prompts[1])
+        self.assertTrue(text.startswith("Summary of earlier conversation: summary 2\n"))
+        self.assertNotIn("question 1", text)
+        self.assertIn("question 3", text)
+
+    def test_edited_history_restarts_summary(self):
+        """Test a history that no longer matches the summarized turns is summarized again"""
+        # Arrange
+        memory = ChatMemory(window_turns=1)
+        self._history_text(memory, make_history(3))
+
+        # Act
+        edited = [("new question", "new answer")] + make_history(3)[1:]
+        self._history_text(memory, edited)
+
+        # Assert
+        self.assertEqual(len(self.prompts), 2)
+        self.assertIn("new question", self.prompts[1])
+
+if __name__ == '__main__':
+    unittest.main()
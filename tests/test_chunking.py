@@ -0,0 +1,115 @@
+"""
+Tests for token-sized, structure-aware chunking
+"""
+
+import unittest
+import sys
+import os
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.documents import Document
+from app.core.chunking import StructuredTextSplitter
+from app.utils.tokens import count_tokens
+
+# Pieces are counted one at a time, so a chunk may exceed the budget by a token or two
+TOKEN_SLACK = 3
+
+def clause(number, sentences=3):
+    return " ".join(f"Clause {number} sentence {i} limits the cover for item {number}-{i}." for i in range(sentences))
+
+class TestStructuredTextSplitter(unittest.TestCase):
+    """Tests for chunk sizes and the boundaries chunks are cut at"""
+
+    def setUp(self):
+        self.splitter = StructuredTextSplitter(chunk_tokens=80, overlap_tokens=20)
+
+    def test_chunks_fit_the_token_budget(self):
+        # Arrange
+        text = " ".join(f"The insurer pays claim number {i} within thirty days of approval." for i in range(100))
+
+        # Act
+        chunks = self.splitter.split_text(text)
+
+        # Assert
+        self.assertGreater(len(chunks), 5)
+        for chunk in chunks:
+            self.assertLessEqual(count_tokens(chunk), 80 + TOKEN_SLACK)
+
+    def test_headings_start_chunks_and_name_their_section(self):
+        # Arrange
+        text = "SECTION 1 - COVER\nFire and theft are covered.\n\nSECTION 2 - EXCLUSIONS\nWar is not covered.\n"
+
+        # Act
+        chunks, last_section = self.splitter.split_text_with_sections(text)
+
+        # Assert
+        self.assertEqual(chunks, [
+            ("SECTION 1 - COVER\nFire and theft are covered.", "SECTION 1 - COVER"),
+            ("SECTION 2 - EXCLUSIONS\nWar is not covered.", "SECTION 2 - EXCLUSIONS"),
+        ])
+        self.assertEqual(last_section, "SECTION 2 - EXCLUSIONS")
+
+    def test_chunks_end_at_clause_boundaries(self):
+        # Arrange
+        text = "\n".join(f"4.{n} {clause(n, sentences=2)}" for n in range(1, 9))
+
+        # Act
+        chunks = self.splitter.split_text(text)
+
+        # Assert
+        self.assertGreater(len(chunks), 2)
+        for chunk in chunks:
+            self.assertRegex(chunk, r"^(4\.\d+ |Clause \d+ sentence 1 )")
+            self.assertTrue(chunk.endswith("."))
+
+    def test_consecutive_chunks_share_whole_sentences(self):
+        # Arrange
+        text = clause(7, sentences=30)
+
+        # Act
+        chunks = self.splitter.split_text(text)
+
+        # Assert
+        self.assertGreater(len(chunks), 2)
+        for left, right in zip(chunks, chunks[1:]):
+            overlap = max(i for i in range(len(right)) if left.endswith(right[:i]))
+            self.assertTrue(right[:overlap].endswith("."))
+            self.assertTrue(right.startswith("Clause 7 sentence"))
+            self.assertLessEqual(count_tokens(right[:overlap]), 20)
+
+    def test_table_rows_are_never_cut(self):
+        # Arrange
+        rows = [f"| Benefit {i} | Rs. {i * 1000:,} | {i} days |" for i in range(40)]
+        text = "| Benefit | Limit | Waiting period |\n" + "\n".join(rows)
+
+        # Act
+        chunks = self.splitter.split_text(text)
+
+        # Assert
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            for line in chunk.splitlines():
+                self.assertTrue(line.startswith("|") and line.endswith("|"), line)
+
+    def test_documents_keep_metadata_and_carry_sections_across_pages(self):
+        # Arrange
+        docs = [
+            Document(page_content="PART II - CLAIMS\nReport claims promptly.", metadata={"source": "policy.pdf", "page": 0}),
+            Document(page_content="Keep all receipts.", metadata={"source": "policy.pdf", "page": 1}),
+            Document(page_content="Premiums are due monthly.", metadata={"source": "other.pdf", "page": 0}),
+        ]
+
+        # Act
+        chunks = self.splitter.split_documents(docs)
+
+        # Assert
+        self.assertEqual([chunk.metadata for chunk in chunks], [
+            {"source": "policy.pdf", "page": 0, "section": "PART II - CLAIMS"},
+            {"source": "policy.pdf", "page": 1, "section": "PART II - CLAIMS"},
+            {"source": "other.pdf", "page": 0},
+        ])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Tests for token-budgeted context packing
+"""
+
+import unittest
+import sys
+import os
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.documents import Document
+from app.core.context_builder import build_context, merge_overlapping
+from app.utils.tokens import count_tokens
+
+POLICY_TEXT = (
+    "Section 4 covers accidental damage to the insured vehicle. "
+    "Claims must be reported within 30 days of the incident. "
+    "The insurer settles approved claims within 15 working days. "
+    "Section 5 excludes damage caused by driving under the influence. "
+    "Wear and tear, mechanical breakdown and consequential loss are not covered."
+)
+
+class TestContextBuilder(unittest.TestCase):
+    """Tests for overlap merging and budget packing"""
+
+    def test_overlapping_neighbours_are_merged(self):
+        """Test chunks sharing splitter overlap become one passage without repeated text"""
+        # Arrange
+        first = Document(page_content=POLICY_TEXT[:180], metadata={"source": "motor.pdf"})
+        second = Document(page_content=POLICY_TEXT[120:], metadata={"source": "motor.pdf"})
+        other = Document(page_content=POLICY_TEXT[120:], metadata={"source": "home.pdf"})
+
+        # Act
+        passages = merge_overlapping([second, first, other])
+
+        # Assert
+        self.assertEqual(len(passages), 2)
+        self.assertEqual(passages[0].text, POLICY_TEXT)
+
+    def test_context_fits_budget_and_reports_savings(self):
+        """Test packing stays within the token budget and keeps the sentence matching the query"""
+        # Arrange
+        docs = [
+            Document(page_content=POLICY_TEXT, metadata={"source": "motor.pdf"}),
+            Document(page_content=POLICY_TEXT, metadata={"source": "motor.pdf"}),
+            Document(page_content="Home insurance covers fire and theft. " * 20, metadata={"source": "home.pdf"}),
+        ]
+
+        # Act
+        context, stats = build_context(docs, "Within how many days are claims settled?", budget=60)
+
+        # Assert
+        self.assertLessEqual(count_tokens(context), 60)
+        self.assertIn("settles approved claims within 15 working days", context)
+        self.assertGreater(stats["tokens_saved"], 0)
+        self.assertEqual(stats["tokens_before"] - stats["tokens_after"], stats["tokens_saved"])
+
+    def test_smaller_passages_fill_the_budget_left_by_an_oversized_one(self):
+        """Test a passage too long to fit or trim does not stop later passages from being packed"""
+        # Arrange
+        oversized = Document(page_content="claims settlement " * 300, metadata={"source": "annexure.pdf"})
+        short = [
+            Document(page_content="Claims are settled within 15 working days.", metadata={"source": "motor.pdf"}),
+            Document(page_content="Claims must be reported within 30 days.", metadata={"source": "home.pdf"}),
+        ]
+
+        # Act
+        context, stats = build_context([oversized] + short, "How are claims settled?", budget=200, mmr_lambda=1.0)
+
+        # Assert
+        self.assertIn("15 working days", context)
+        self.assertIn("30 days", context)
+        self.assertEqual(stats["passages"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
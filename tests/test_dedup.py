@@ -0,0 +1,70 @@
+"""
+Tests for SimHash near-duplicate detection
+"""
+
+import unittest
+import sys
+import os
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.dedup import ChunkDeduplicator, hamming_distance, simhash
+
+DISCLAIMER = (
+    "This policy is subject to the terms, conditions and exclusions printed in the policy wording. "
+    "Insurance is the subject matter of solicitation. Please read the sales brochure carefully "
+    "before concluding a sale. The insurer reserves the right to revise premiums on renewal."
+)
+
+class TestSimHash(unittest.TestCase):
+    """Tests for the chunk signature"""
+
+    def test_formatting_differences_give_the_same_signature(self):
+        # Act / Assert
+        self.assertEqual(simhash(DISCLAIMER), simhash("  " + DISCLAIMER.upper().replace(". ", ".\n")))
+
+    def test_small_edit_is_closer_than_other_text(self):
+        # Arrange
+        edited = DISCLAIMER.replace("on renewal", "at renewal")
+        other = "Cashless hospitalisation is available at network hospitals for planned and emergency admissions."
+
+        # Act
+        near = hamming_distance(simhash(DISCLAIMER), simhash(edited))
+        far = hamming_distance(simhash(DISCLAIMER), simhash(other))
+
+        # Assert
+        self.assertLess(near, far)
+        self.assertGreater(far, 10)
+
+class TestChunkDeduplicator(unittest.TestCase):
+    """Tests for the banded signature lookup"""
+
+    def test_finds_signatures_within_the_distance(self):
+        # Arrange
+        dedup = ChunkDeduplicator(max_distance=3)
+        signature = simhash(DISCLAIMER)
+        dedup.add("chunk-1", signature)
+
+        # Act / Assert
+        self.assertEqual(dedup.find(signature), "chunk-1")
+        self.assertEqual(dedup.find(signature ^ 0b10000000_00000001_00000000_00000001), "chunk-1")
+        self.assertIsNone(dedup.find(signature ^ 0b1111))
+
+    def test_rebuilds_from_manifest_entries(self):
+        # Arrange
+        signature = simhash(DISCLAIMER)
+        entries = [
+            {"chunk_ids": ["chunk-1", "chunk-2"], "signatures": [f"{signature:016x}", f"{simhash('other text here'):016x}"]},
+            {"chunk_ids": ["chunk-3"]},
+        ]
+
+        # Act
+        dedup = ChunkDeduplicator.from_manifest_entries(entries, max_distance=0)
+
+        # Assert
+        self.assertEqual(dedup.find(signature), "chunk-1")
+        self.assertIsNone(dedup.find(signature ^ 1))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests for the SQLite docstore and the memory-mapped store format
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.documents import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from app.core.docstore import SQLiteDocstore, SQLitePositions
+from app.core.vector_store import create_vector_store, load_vector_store
+
+class TestSQLiteDocstore(unittest.TestCase):
+    """Tests for buffered writes to the SQLite docstore"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "docstore.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_changes_reach_the_file_only_on_commit(self):
+        """Test buffered adds and deletes are invisible to other readers until committed"""
+        # Arrange
+        store = SQLiteDocstore(self.path)
+        store.add({"a": Document(page_content="Rider A", metadata={"page": 1}), "b": Document(page_content="Rider B")})
+        store.commit({0: "a", 1: "b"})
+        store.delete(["a"])
+        store.add({"c": Document(page_content="Rider C")})
+
+        # Act
+        reader = SQLiteDocstore(self.path)
+        before = sorted(reader.mget(["a", "b", "c"]))
+        store.commit({0: "b", 1: "c"})
+        after = sorted(reader.mget(["a", "b", "c"]))
+
+        # Assert
+        self.assertEqual(before, ["a", "b"])
+        self.assertEqual(after, ["b", "c"])
+        self.assertEqual(store.search("a"), "ID a not found.")
+        self.assertEqual(dict(reader.positions().items()), {0: "b", 1: "c"})
+
+    def test_commit_appends_only_new_positions(self):
+        """Test a commit without deletions writes only the new chunks and positions"""
+        # Arrange
+        store = SQLiteDocstore(self.path)
+        store.add({"a": Document(page_content="Rider A"), "b": Document(page_content="Rider B")})
+        store.commit({0: "a", 1: "b"})
+        store.add({"c": Document(page_content="Rider C")})
+        changes = store._conn.total_changes
+
+        # Act
+        store.commit({0: "a", 1: "b", 2: "c"})
+
+        # Assert
+        self.assertEqual(store._conn.total_changes - changes, 2)
+        self.assertEqual(dict(SQLiteDocstore(self.path).positions().items()), {0: "a", 1: "b", 2: "c"})
+
+class TestStoreFormat(unittest.TestCase):
+    """Tests for saving and memory-mapped loading of the vector store"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.vectorstore_path = os.path.join(self.tmp_dir, "db_faiss")
+        self.embeddings = DeterministicFakeEmbedding(size=16)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_memory_mapped_store_returns_the_same_hits(self):
+        """Test a store loaded lazily from SQLite answers searches like the one that was built"""
+        # Arrange
+        docs = [Document(page_content=f"Clause {i} of the motor policy.", metadata={"source": f"doc{i}.txt"}) for i in range(20)]
+        created = create_vector_store(docs, self.embeddings, vectorstore_path=self.vectorstore_path)
+
+        # Act
+        loaded = load_vector_store(self.embeddings, self.vectorstore_path, mmap=True)
+        expected = created.similarity_search("Clause 7 of the motor policy.", k=3)
+        results = loaded.similarity_search("Clause 7 of the motor policy.", k=3)
+
+        # Assert
+        self.assertFalse(os.path.exists(os.path.join(self.vectorstore_path, "index.pkl")))
+        self.assertIsInstance(loaded.docstore, SQLiteDocstore)
+        self.assertIsInstance(loaded.index_to_docstore_id, SQLitePositions)
+        self.assertEqual([(d.page_content, d.metadata) for d in results], [(d.page_content, d.metadata) for d in expected])
+
+if __name__ == '__main__':
+    unittest.main()
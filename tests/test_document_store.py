@@ -0,0 +1,119 @@
+"""
+Tests for document loading
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import time
+import shutil
+import tempfile
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.documents import Document
+from app.core.document_store import LOADER_MAPPING, iter_load_files, load_documents
+
+class SlowLoader:
+    """Loader that never finishes in time, standing in for a pathological PDF"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def load(self):
+        time.sleep(30)
+        return [Document(page_content="never returned", metadata={"source": self.file_path})]
+
+class CrashingLoader:
+    """Loader that kills its process, standing in for a parser killed by the OOM killer"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def load(self):
+        os._exit(1)
+
+class TestDocumentLoading(unittest.TestCase):
+    """Tests for process-pool document parsing"""
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def _write(self, name, text):
+        path = os.path.join(self.data_path, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_loaders_are_chosen_by_extension(self):
+        """Test text and markdown files are loaded verbatim with their source path"""
+        # Arrange
+        self._write("terms.txt", "Claims must be filed within 30 days.")
+        self._write("rider.md", "# Accident Rider\n\nCovers hospitalisation.")
+
+        # Act
+        docs = load_documents(self.data_path)
+
+        # Assert
+        contents = {os.path.basename(doc.metadata["source"]): doc.page_content for doc in docs}
+        self.assertEqual(contents["terms.txt"], "Claims must be filed within 30 days.")
+        self.assertTrue(contents["rider.md"].startswith("# Accident Rider"))
+
+    @patch.dict(LOADER_MAPPING, {".slow": (SlowLoader, {})})
+    def test_slow_file_times_out_without_blocking_others(self):
+        """Test a file over its time budget is reported as failed while others still load"""
+        # Arrange
+        good_path = self._write("good.txt", "Premium is due monthly.")
+        slow_path = self._write("bad.slow", "stalls the parser")
+
+        # Act
+        start_time = time.time()
+        results = {result.file_path: result for result in iter_load_files([good_path, slow_path], max_workers=2, timeout=1)}
+        elapsed = time.time() - start_time
+
+        # Assert
+        self.assertLess(elapsed, 10)
+        self.assertIsNone(results[good_path].error)
+        self.assertEqual(results[good_path].docs[0].page_content, "Premium is due monthly.")
+        self.assertIn("timed out", results[slow_path].error)
+        self.assertGreaterEqual(results[slow_path].seconds, 1)
+
+    @patch.dict(LOADER_MAPPING, {".slow": (SlowLoader, {})})
+    def test_single_file_is_parsed_under_the_timeout(self):
+        """Test the time budget also applies when only one file is re-indexed"""
+        # Arrange
+        slow_path = self._write("bad.slow", "stalls the parser")
+
+        # Act
+        start_time = time.time()
+        results = list(iter_load_files([slow_path], max_workers=1, timeout=1))
+
+        # Assert
+        self.assertLess(time.time() - start_time, 10)
+        self.assertEqual(len(results), 1)
+        self.assertIn("timed out", results[0].error)
+
+    @patch.dict(LOADER_MAPPING, {".crash": (CrashingLoader, {})})
+    def test_worker_crash_only_fails_the_crashing_file(self):
+        """Test files in flight next to a file that kills its worker are parsed again, not failed"""
+        # Arrange
+        good_paths = [self._write(f"good{i}.txt", f"Clause {i} applies.") for i in range(4)]
+        crash_path = self._write("bad.crash", "kills the parser")
+
+        # Act
+        results = {result.file_path: result for result in iter_load_files(good_paths + [crash_path], max_workers=2, timeout=10)}
+
+        # Assert
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[crash_path].error, "parse worker crashed")
+        for i, path in enumerate(good_paths):
+            self.assertIsNone(results[path].error)
+            self.assertEqual(results[path].docs[0].page_content, f"Clause {i} applies.")
+
+if __name__ == '__main__':
+    unittest.main()
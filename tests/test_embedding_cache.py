@@ -0,0 +1,89 @@
+"""
+Tests for the embedding cache
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from app.core.embedding_cache import CachedEmbeddings
+
+class TestCachedEmbeddings(unittest.TestCase):
+    """Tests for CachedEmbeddings"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tmp_dir, "cache.sqlite")
+        self.underlying = DeterministicFakeEmbedding(size=8)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _cache(self, model_name="test-model", max_entries=100):
+        return CachedEmbeddings(self.underlying, model_name, self.cache_path, max_entries=max_entries)
+
+    def test_repeated_texts_are_served_from_disk(self):
+        """Test vectors survive a new cache instance and count as hits"""
+        # Arrange
+        texts = ["claim form", "rider terms", "claim form"]
+        expected = self.underlying.embed_documents(texts)
+        self._cache().embed_documents(texts)
+
+        # Act
+        cache = self._cache()
+        vectors = cache.embed_documents(texts)
+
+        # Assert
+        for vector, reference in zip(vectors, expected):
+            self.assertEqual(len(vector), len(reference))
+            for value, ref_value in zip(vector, reference):
+                self.assertAlmostEqual(value, ref_value, places=5)
+        self.assertEqual(cache.stats()["hits"], 3)
+        self.assertEqual(cache.stats()["misses"], 0)
+
+    def test_cache_is_keyed_by_model(self):
+        """Test a different model name does not reuse cached vectors"""
+        # Arrange
+        self._cache("model-a").embed_documents(["deductible"])
+
+        # Act
+        cache = self._cache("model-b")
+        cache.embed_documents(["deductible"])
+
+        # Assert
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_size_cap_evicts_least_recently_used(self):
+        """Test the cache never grows past its cap"""
+        # Arrange
+        cache = self._cache(max_entries=10)
+
+        # Act
+        cache.embed_documents([f"clause {i}" for i in range(25)])
+
+        # Assert
+        self.assertLessEqual(cache.stats()["entries"], 10)
+
+    def test_inserts_below_the_cap_do_not_count_the_table(self):
+        """Test query misses are stored without scanning the cache to decide on eviction"""
+        # Arrange
+        cache = self._cache(max_entries=1000)
+        statements = []
+        cache._conn.set_trace_callback(statements.append)
+
+        # Act
+        for i in range(5):
+            cache.embed_query(f"question {i}")
+
+        # Assert
+        self.assertFalse([statement for statement in statements if "COUNT(*)" in statement])
+        self.assertEqual(cache.stats()["entries"], 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Tests for the concurrent embedding scheduler
+"""
+
+import unittest
+import sys
+import os
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_openai import OpenAIEmbeddings
+from app.core.embedding_pipeline import EmbeddingScheduler, pack_batches
+from app.core.llm import without_client_retries
+from tests.fake_openai_server import FakeOpenAIServer, fake_embedding
+
+class TestEmbeddingScheduler(unittest.TestCase):
+    """Tests for EmbeddingScheduler against a local fake embeddings server"""
+
+    def _client(self, server):
+        # The client's own retries are disabled so the scheduler handles 429s
+        return OpenAIEmbeddings(
+            model="text-embedding-3-small",
+            openai_api_key="test-key",
+            openai_api_base=server.base_url,
+            check_embedding_ctx_length=False,
+            max_retries=0
+        )
+
+    def _start(self, **kwargs):
+        server = FakeOpenAIServer(**kwargs).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def test_pack_batches_respects_size_limit(self):
+        """Test batches never exceed the configured number of texts"""
+        # Act
+        batches = pack_batches(["policy clause"] * 10, max_batch_tokens=10000, max_batch_size=4)
+
+        # Assert
+        self.assertEqual([len(indices) for indices, _ in batches], [4, 4, 2])
+
+    def test_batches_are_sent_concurrently(self):
+        """Test several batches are in flight at once and every text gets its own vector"""
+        # Arrange
+        server = self._start(latency=0.1)
+        texts = [f"clause {i}" for i in range(40)]
+        scheduler = EmbeddingScheduler(self._client(server), max_workers=4, max_batch_size=5)
+
+        # Act
+        results = {}
+        for indices, vectors in scheduler.iter_embeddings(texts):
+            results.update(zip(indices, vectors))
+
+        # Assert
+        self.assertEqual(sorted(results), list(range(40)))
+        self.assertAlmostEqual(results[7][0], float(fake_embedding("clause 7", 16)[0]), places=5)
+        self.assertGreater(server.max_in_flight, 1)
+
+    def test_rate_limited_batches_are_retried(self):
+        """Test 429 responses are retried until every batch succeeds"""
+        # Arrange
+        server = self._start(max_requests_per_window=2, window_seconds=0.2)
+        texts = [f"rider {i}" for i in range(30)]
+        scheduler = EmbeddingScheduler(self._client(server), max_workers=4, max_batch_size=3, max_retries=20)
+
+        # Act
+        embedded = sum(len(indices) for indices, _ in scheduler.iter_embeddings(texts))
+
+        # Assert
+        self.assertEqual(embedded, 30)
+        self.assertGreater(server.rate_limited_count, 0)
+        self.assertEqual(scheduler.retries, server.rate_limited_count)
+
+    def test_only_the_scheduler_retries_rate_limited_batches(self):
+        """Test the scheduler gets a client without SDK retries, so every 429 is retried exactly once by it"""
+        # Arrange
+        server = self._start(max_requests_per_window=2, window_seconds=0.2)
+        client = OpenAIEmbeddings(
+            model="text-embedding-3-small",
+            openai_api_key="test-key",
+            openai_api_base=server.base_url,
+            check_embedding_ctx_length=False
+        )
+        scheduler = EmbeddingScheduler(without_client_retries(client), max_workers=4, max_batch_size=3, max_retries=20)
+
+        # Act
+        embedded = sum(len(indices) for indices, _ in scheduler.iter_embeddings([f"rider {i}" for i in range(30)]))
+
+        # Assert
+        self.assertEqual(embedded, 30)
+        self.assertGreater(server.rate_limited_count, 0)
+        self.assertEqual(scheduler.retries, server.rate_limited_count)
+        self.assertEqual(client.max_retries, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Tests for versioned index directories
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import closing
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.index_versions import (
+    VERSIONS_DIRNAME, current_version, resolve_index_path, stage_version,
+    finish_version, publish_version, prune_versions
+)
+
+def _write(path, content):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+class TestIndexVersions(unittest.TestCase):
+    """Tests for staging, publishing and pruning index versions"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.vectorstore_path = os.path.join(self.tmp_dir, "db_faiss")
+        os.makedirs(self.vectorstore_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _publish(self, files):
+        staging_path = stage_version(self.vectorstore_path)
+        for name, content in files.items():
+            _write(os.path.join(staging_path, name + ".tmp"), content)
+            os.replace(os.path.join(staging_path, name + ".tmp"), os.path.join(staging_path, name))
+        version_path = finish_version(staging_path)
+        publish_version(self.vectorstore_path, version_path)
+        return version_path
+
+    def test_unversioned_store_is_served_from_the_root(self):
+        # Arrange
+        _write(os.path.join(self.vectorstore_path, "index.faiss"), "legacy")
+
+        # Act
+        served = resolve_index_path(self.vectorstore_path)
+
+        # Assert
+        self.assertIsNone(current_version(self.vectorstore_path))
+        self.assertEqual(served, self.vectorstore_path)
+
+    def test_staged_version_is_seeded_from_the_served_one(self):
+        # Arrange
+        _write(os.path.join(self.vectorstore_path, "index.faiss"), "legacy")
+        _write(os.path.join(self.vectorstore_path, "index.faiss.tmp"), "partial")
+        with closing(sqlite3.connect(os.path.join(self.vectorstore_path, "docstore.sqlite"))) as conn:
+            conn.execute("CREATE TABLE docs (id TEXT)")
+            conn.execute("INSERT INTO docs VALUES ('a')")
+            conn.commit()
+
+        # Act
+        staging_path = stage_version(self.vectorstore_path)
+
+        # Assert
+        self.assertEqual(sorted(os.listdir(staging_path)), ["docstore.sqlite", "index.faiss"])
+        self.assertEqual(_read(os.path.join(staging_path, "index.faiss")), "legacy")
+        with closing(sqlite3.connect(os.path.join(staging_path, "docstore.sqlite"))) as conn:
+            self.assertEqual(conn.execute("SELECT id FROM docs").fetchall(), [("a",)])
+        self.assertEqual(resolve_index_path(self.vectorstore_path), self.vectorstore_path)
+
+    def test_publish_switches_the_served_version_and_keeps_the_old_one_intact(self):
+        # Arrange
+        first = self._publish({"index.faiss": "one"})
+
+        # Act
+        second = self._publish({"index.faiss": "two"})
+
+        # Assert
+        self.assertEqual(resolve_index_path(self.vectorstore_path), second)
+        self.assertEqual(_read(os.path.join(first, "index.faiss")), "one")
+        self.assertEqual(_read(os.path.join(second, "index.faiss")), "two")
+
+    def test_interrupted_build_is_resumed(self):
+        # Arrange
+        self._publish({"index.faiss": "one"})
+        interrupted = stage_version(self.vectorstore_path)
+        _write(os.path.join(interrupted, "manifest.json"), "checkpoint")
+
+        # Act
+        resumed = stage_version(self.vectorstore_path)
+
+        # Assert
+        self.assertEqual(resumed, interrupted)
+        self.assertEqual(_read(os.path.join(resumed, "manifest.json")), "checkpoint")
+
+    def test_prune_keeps_recent_versions_and_newer_builds(self):
+        # Arrange
+        versions = [self._publish({"index.faiss": str(i)}) for i in range(4)]
+        abandoned = stage_version(self.vectorstore_path)
+        os.replace(abandoned, os.path.join(os.path.dirname(abandoned), "0" + os.path.basename(abandoned)))
+        in_progress = stage_version(self.vectorstore_path)
+
+        # Act
+        prune_versions(self.vectorstore_path, keep=2)
+
+        # Assert
+        remaining = sorted(os.listdir(os.path.join(self.vectorstore_path, VERSIONS_DIRNAME)))
+        self.assertEqual(remaining, sorted(os.path.basename(path) for path in versions[2:] + [in_progress]))
+
+if __name__ == "__main__":
+    unittest.main()
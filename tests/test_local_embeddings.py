@@ -0,0 +1,65 @@
+"""
+Tests for the local hashed n-gram embeddings
+"""
+
+import unittest
+import sys
+import os
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from app.core.local_embeddings import HashingEmbeddings
+
+class TestHashingEmbeddings(unittest.TestCase):
+    """Tests for determinism and similarity of the local embeddings"""
+
+    def setUp(self):
+        self.embeddings = HashingEmbeddings(dim=256, batch_size=2)
+
+    def test_vectors_are_deterministic_and_normalized(self):
+        # Arrange
+        text = "Claims must be reported within 30 days."
+
+        # Act
+        first = self.embeddings.embed_query(text)
+        second = HashingEmbeddings(dim=256).embed_query(text)
+
+        # Assert
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 256)
+        self.assertAlmostEqual(float(np.linalg.norm(first)), 1.0, places=5)
+
+    def test_batched_documents_match_single_queries(self):
+        # Arrange
+        texts = ["theft of the vehicle", "storm damage to the roof", "", "lost baggage"]
+
+        # Act
+        vectors = self.embeddings.embed_documents(texts)
+
+        # Assert
+        self.assertEqual(len(vectors), 4)
+        for text, vector in zip(texts, vectors):
+            np.testing.assert_allclose(vector, self.embeddings.embed_query(text), rtol=1e-6)
+        self.assertEqual(vectors[2], [0.0] * 256)
+
+    def test_related_texts_are_closer_than_unrelated_ones(self):
+        # Arrange
+        query = np.array(self.embeddings.embed_query("How do I claim for windscreen repair?"))
+        related, unrelated = (np.array(v) for v in self.embeddings.embed_documents([
+            "To claim for windscreen repairs, submit the claim form.",
+            "The maturity benefit is paid at the end of the policy term.",
+        ]))
+
+        # Act / Assert
+        self.assertGreater(query @ related, query @ unrelated)
+
+    def test_backend_identifies_the_vector_space(self):
+        # Arrange / Act / Assert
+        self.assertEqual(HashingEmbeddings(dim=256).backend, self.embeddings.backend)
+        self.assertNotEqual(HashingEmbeddings(dim=256, seed=1).backend, self.embeddings.backend)
+        self.assertNotEqual(HashingEmbeddings(dim=128).backend, self.embeddings.backend)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests for request tracing and the Prometheus exposition
+"""
+
+import unittest
+import sys
+import os
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.metrics import Counter, Histogram, STAGE_SECONDS, annotate, current_trace, end_trace, span, start_trace
+
+class TestTracing(unittest.TestCase):
+    """Tests for sampled traces and stage spans"""
+
+    def test_spans_are_recorded_on_a_sampled_trace(self):
+        # Arrange
+        trace = start_trace("test_sampled", sample_rate=1, mode="RAG+LLM")
+
+        # Act
+        with span("retrieve"):
+            pass
+        with span("retrieve"):
+            pass
+        with span("generate"):
+            pass
+        annotate(context_tokens=42)
+        with self.assertLogs("rag.trace", level="INFO") as logs:
+            end_trace(trace, "ok")
+
+        # Assert
+        self.assertEqual(set(trace.stages), {"retrieve", "generate"})
+        self.assertEqual(STAGE_SECONDS.snapshot()[("test_sampled", "retrieve")]["count"], 2)
+        self.assertIn('"context_tokens": 42', logs.output[0])
+        self.assertIn('"status": "ok"', logs.output[0])
+        self.assertIsNone(current_trace())
+
+    def test_nothing_is_recorded_when_sampling_is_off(self):
+        # Arrange
+        trace = start_trace("test_unsampled", sample_rate=0)
+
+        # Act
+        with span("retrieve"):
+            pass
+        annotate(context_tokens=42)
+        end_trace(trace)
+
+        # Assert
+        self.assertIsNone(trace)
+        self.assertNotIn(("test_unsampled", "retrieve"), STAGE_SECONDS.snapshot())
+
+    def test_span_records_the_stage_when_the_block_raises(self):
+        # Arrange
+        trace = start_trace("test_error", sample_rate=1)
+
+        # Act
+        with self.assertRaises(RuntimeError):
+            with span("retrieve"):
+                raise RuntimeError("search failed")
+        end_trace(trace, "error")
+
+        # Assert
+        self.assertIn("retrieve", trace.stages)
+
+    def test_nested_trace_restores_the_outer_one(self):
+        # Arrange
+        outer = start_trace("test_outer", sample_rate=1)
+
+        # Act
+        inner = start_trace("test_inner", sample_rate=1)
+        end_trace(inner)
+        unsampled = start_trace("test_unsampled_inner", sample_rate=0)
+        with span("retrieve"):
+            pass
+        end_trace(unsampled)
+        during = current_trace()
+        end_trace(outer)
+
+        # Assert
+        self.assertIs(during, outer)
+        self.assertIn("retrieve", outer.stages)
+        self.assertIsNone(current_trace())
+
+class TestPrometheusRendering(unittest.TestCase):
+    """Tests for the text exposition format"""
+
+    def test_counter_series_are_labelled(self):
+        # Arrange
+        counter = Counter("test_requests_total", "Requests.", ["mode"])
+
+        # Act
+        counter.inc(mode="RAG-only")
+        counter.inc(2, mode="RAG-only")
+
+        # Assert
+        self.assertEqual(counter.render(), [
+            "# HELP test_requests_total Requests.",
+            "# TYPE test_requests_total counter",
+            'test_requests_total{mode="RAG-only"} 3',
+        ])
+
+    def test_histogram_buckets_are_cumulative(self):
+        # Arrange
+        histogram = Histogram("test_seconds", "Latency.", buckets=(0.1, 1.0))
+
+        # Act
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5.0)
+
+        # Assert
+        lines = histogram.render()
+        self.assertIn('test_seconds_bucket{le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{le="1.0"} 2', lines)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 3', lines)
+        self.assertIn("test_seconds_sum 5.55", lines)
+        self.assertIn("test_seconds_count 3", lines)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,14 +3,34 @@ Tests for the RAG engine
 """
 
 import unittest
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 import sys
 import os
 
 # Add the project root to the Python path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.core.rag_engine import create_rag_only_chain
+from langchain_core.documents import Document
+from app.core.answer_cache import AnswerCache
+from app.core.rag_engine import (
+    aget_answer,
+    create_rag_only_chain,
+    get_streaming_answer,
+    get_rag_engine,
+    is_self_contained,
+    RagEngine
+)
+
+def mock_vectorstore():
+    """A vector store double without a keyword index, so retrieval goes through as_retriever()."""
+    vectorstore = MagicMock()
+    vectorstore.sparse_index = None
+    return vectorstore
+
+async def async_tokens(tokens):
+    for token in tokens:
+        yield token
 
 class TestRagEngine(unittest.TestCase):
     """Tests for the RAG engine"""
@@ -29,5 +49,130 @@ class TestRagEngine(unittest.TestCase):
         self.assertIsNone(result)
         mock_logging.error.assert_called_once_with("Vector store is None for RAG-only chain.")
 
+    @patch('app.core.rag_engine.get_answer_cache')
+    def test_streaming_answer_is_replayed_from_cache(self, mock_get_cache):
+        """Test a repeated question streams the cached answer without calling the LLM"""
+        # Arrange
+        mock_get_cache.return_value = AnswerCache()
+        vectorstore = mock_vectorstore()
+        vectorstore.index_version = "v1"
+        vectorstore.embeddings.aembed_query = AsyncMock(return_value=[1.0, 0.0])
+        vectorstore.as_retriever.return_value.ainvoke = AsyncMock(return_value=[Document(page_content="Claims take 7 days.")])
+        llm = MagicMock()
+        llm.astream.side_effect = lambda prompt: async_tokens(["Claims ", "take ", "7 days."])
+        first = "".join(get_streaming_answer("How long do claims take?", [], vectorstore, llm, chatgpt_enabled=False))
+        
+        # Act
+        chunks = list(get_streaming_answer("how long do claims take", [], vectorstore, llm, chatgpt_enabled=False))
+        
+        # Assert
+        self.assertEqual(first, "Claims take 7 days.")
+        self.assertEqual("".join(chunks), first)
+        self.assertGreater(len(chunks), 1)
+        llm.astream.assert_called_once()
+
+    @patch('app.core.rag_engine.get_answer_cache')
+    def test_closing_stream_cancels_generation(self, mock_get_cache):
+        """Test a consumer that stops reading closes the LLM stream instead of draining it"""
+        # Arrange
+        mock_get_cache.return_value = AnswerCache()
+        vectorstore = mock_vectorstore()
+        vectorstore.index_version = "v1"
+        vectorstore.embeddings.aembed_query = AsyncMock(return_value=[1.0, 0.0])
+        vectorstore.as_retriever.return_value.ainvoke = AsyncMock(return_value=[Document(page_content="Claims take 7 days.")])
+        produced, closed = [], []
+
+        async def endless_tokens(prompt):
+            try:
+                while True:
+                    produced.append("token ")
+                    yield "token "
+                    await asyncio.sleep(0)
+            finally:
+                closed.append(True)
+
+        llm = MagicMock()
+        llm.astream.side_effect = endless_tokens
+        stream = get_streaming_answer("How long do claims take?", [], vectorstore, llm, chatgpt_enabled=False)
+
+        # Act
+        first = next(stream)
+        stream.close()
+
+        # Assert
+        self.assertEqual(first, "token ")
+        self.assertEqual(closed, [True])
+        self.assertLess(len(produced), 3)
+
+    def test_aget_answer_runs_condensation_and_retrieval_asynchronously(self):
+        """Test follow-ups are condensed and answered through the async interfaces"""
+        # Arrange
+        vectorstore = mock_vectorstore()
+        vectorstore.index_version = "v-async"
+        retriever = vectorstore.as_retriever.return_value
+        retriever.ainvoke = AsyncMock(return_value=[Document(page_content="Claims settle in 30 days.")])
+        engine = get_rag_engine(vectorstore, MagicMock(), chatgpt_enabled=True)
+        engine.condense_chain = MagicMock()
+        engine.condense_chain.ainvoke = AsyncMock(return_value="How long do claims take to settle?")
+        engine.answer_chain = MagicMock()
+        engine.answer_chain.ainvoke = AsyncMock(return_value="30 days.")
+        history = [("How do I file a claim?", "Use the form.")]
+
+        # Act
+        answer, updated_history = asyncio.run(aget_answer("And how long does it take?", history, vectorstore, engine.llm))
+
+        # Assert
+        self.assertEqual(answer, "30 days.")
+        self.assertEqual(updated_history[-1], ("And how long does it take?", "30 days."))
+        engine.condense_chain.ainvoke.assert_awaited_once()
+        retriever.invoke.assert_not_called()
+        prompt_inputs = engine.answer_chain.ainvoke.await_args.args[0]
+        self.assertEqual(prompt_inputs["question"], "How long do claims take to settle?")
+
+    def test_rag_engine_is_compiled_once_per_index_version(self):
+        """Test engines are reused across requests and rebuilt after a re-index"""
+        # Arrange
+        vectorstore = mock_vectorstore()
+        vectorstore.index_version = "v1"
+        llm = MagicMock()
+        first = get_rag_engine(vectorstore, llm, chatgpt_enabled=True)
+        
+        # Act
+        second = get_rag_engine(vectorstore, llm, chatgpt_enabled=True)
+        vectorstore.index_version = "v2"
+        third = get_rag_engine(vectorstore, llm, chatgpt_enabled=True)
+        
+        # Assert
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(vectorstore.as_retriever.call_count, 2)
+
+    def test_is_self_contained(self):
+        """Test follow-ups with back-references need condensing and full questions do not"""
+        self.assertTrue(is_self_contained("Does comprehensive cover include flood damage?"))
+        self.assertFalse(is_self_contained("How long does it take?"))
+        self.assertFalse(is_self_contained("And the deductible?"))
+    
+    def test_speculative_retrieval_is_reused_for_close_condensed_question(self):
+        """Test retrieval on the raw follow-up is reused when the condensed question matches it"""
+        # Arrange
+        vectorstore = mock_vectorstore()
+        docs = [Document(page_content="Claims settle in 30 days.")]
+        retriever = vectorstore.as_retriever.return_value
+        retriever.ainvoke = AsyncMock(return_value=docs)
+        engine = RagEngine(vectorstore, MagicMock(), chatgpt_enabled=True, low_latency=True)
+        engine.condense_chain = MagicMock()
+        engine.condense_chain.ainvoke = AsyncMock(return_value="How long does a claim take to settle?")
+        
+        # Act
+        question, result = asyncio.run(engine.acondense_and_retrieve(
+            "how long does it take to settle a claim", [("How do I file a claim?", "Use the form.")], "Human: ..."))
+        
+        # Assert
+        self.assertEqual(question, "How long does a claim take to settle?")
+        self.assertIs(result, docs)
+        retrieved_queries = [call.args[0] for call in retriever.ainvoke.await_args_list]
+        self.assertNotIn(question, retrieved_queries)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
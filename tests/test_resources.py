@@ -0,0 +1,120 @@
+"""
+Tests for the process-wide shared resources
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.documents import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from app.core.resources import SharedResources
+from app.core.vector_store import create_vector_store
+from app.core.index_versions import VERSIONS_DIRNAME, current_version
+
+def _docs(label):
+    return [Document(page_content=f"{label} clause {i}.", metadata={"source": f"{label}{i}.txt"}) for i in range(5)]
+
+class TestSharedResources(unittest.TestCase):
+    """Tests for shared models, leases and hot reload"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.vectorstore_path = os.path.join(self.tmp_dir, "db_faiss")
+        self.embeddings = DeterministicFakeEmbedding(size=16)
+        self.created = 0
+
+        def embeddings_factory():
+            self.created += 1
+            return self.embeddings
+
+        self.resources = SharedResources(self.vectorstore_path, embeddings_factory=embeddings_factory, llm_factory=object)
+        create_vector_store(_docs("Motor"), self.embeddings, vectorstore_path=self.vectorstore_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_sessions_share_one_index_and_one_model(self):
+        """Test concurrent sessions get the same vector store and models are created once"""
+        # Act
+        def session(_):
+            self.resources.ensure_index_loaded()
+            return self.resources.vector_store, self.resources.embeddings_model
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(session, range(32)))
+
+        # Assert
+        self.assertEqual(len({id(vectorstore) for vectorstore, _ in results}), 1)
+        self.assertEqual(self.created, 1)
+        self.assertEqual(self.resources.stats()["generation"], 1)
+
+    def test_reindex_keeps_leased_index_open_until_released(self):
+        """Test a request holding the old index can finish while a re-index swaps in the new one"""
+        # Arrange
+        self.resources.ensure_index_loaded()
+
+        # Act
+        with self.resources.lease() as old_store:
+            swapped = self.resources.reindex(lambda embeddings, path: create_vector_store(_docs("Home"), embeddings, path))
+            during = old_store.similarity_search("Motor clause 1.", k=1)[0].page_content
+        new_result = self.resources.vector_store.similarity_search("Home clause 1.", k=1)[0].page_content
+
+        # Assert
+        self.assertTrue(swapped)
+        self.assertEqual(during, "Motor clause 1.")
+        self.assertEqual(new_result, "Home clause 1.")
+        self.assertEqual(self.resources.stats(), {"generation": 2, "active_leases": 0, "index_loaded": True})
+        with self.assertRaises(sqlite3.ProgrammingError):
+            old_store.docstore.search("any")
+
+    def test_failed_build_keeps_serving_the_published_version(self):
+        """Test a build that fails or crashes part-way leaves the served index and the version pointer untouched"""
+        # Arrange
+        self.assertTrue(self.resources.reindex(lambda embeddings, path: create_vector_store(_docs("Home"), embeddings, path)))
+        published = current_version(self.vectorstore_path)
+        staged = []
+
+        def crashing_build(embeddings, path):
+            staged.append(path)
+            with open(os.path.join(path, "index.faiss.tmp"), "wb") as f:
+                f.write(b"half-written")
+            raise RuntimeError("killed mid-build")
+
+        # Act
+        failed = self.resources.reindex(lambda embeddings, path: None)
+        with self.assertRaises(RuntimeError):
+            self.resources.reindex(crashing_build)
+        self.resources.reload()
+        served = self.resources.vector_store.similarity_search("Home clause 1.", k=1)[0].page_content
+        self.resources.reindex(lambda embeddings, path: staged.append(path))
+
+        # Assert
+        self.assertFalse(failed)
+        self.assertEqual(current_version(self.vectorstore_path), published)
+        self.assertEqual(served, "Home clause 1.")
+        # The crashed build is resumed by the next re-index rather than started over
+        self.assertEqual(staged[0], staged[1])
+        self.assertEqual(os.listdir(os.path.join(self.vectorstore_path, VERSIONS_DIRNAME)), [published])
+
+    def test_old_versions_are_pruned(self):
+        """Test each re-index publishes a new version directory and only the configured number are kept"""
+        # Act
+        for label in ("Home", "Travel", "Health"):
+            self.resources.reindex(lambda embeddings, path: create_vector_store(_docs(label), embeddings, path))
+
+        # Assert
+        versions = sorted(os.listdir(os.path.join(self.vectorstore_path, VERSIONS_DIRNAME)))
+        self.assertEqual(len(versions), 2)
+        self.assertEqual(current_version(self.vectorstore_path), versions[-1])
+        self.assertEqual(self.resources.stats()["generation"], 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Tests for the sharded vector store
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from app.core.sharding import (
+    ShardedVectorStore, shard_for_file, list_shards, update_sharded_vector_store, load_sharded_vector_store
+)
+from app.core.vector_store import load_manifest
+
+class TestShardedVectorStore(unittest.TestCase):
+    """Tests for per-collection shards, fan-out search and per-shard rebuilds"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.tmp_dir, "data")
+        self.vectorstore_path = os.path.join(self.tmp_dir, "db_faiss")
+        self.embeddings = DeterministicFakeEmbedding(size=16)
+        self._write("health/cashless.txt", "Cashless hospitalisation is available at network hospitals.")
+        self._write("auto/zero_dep.txt", "Zero depreciation cover pays the full cost of replaced parts.")
+        self._write("faq.txt", "Call the helpline to renew a policy.")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, name, text):
+        path = os.path.join(self.data_path, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _update(self, **kwargs):
+        return update_sharded_vector_store(self.embeddings, self.data_path, self.vectorstore_path, mode="collection", **kwargs)
+
+    def test_files_are_sharded_by_collection(self):
+        """Test top-level folders become shards and loose files go to the default shard"""
+        # Act
+        self._update()
+
+        # Assert
+        self.assertEqual(list_shards(self.vectorstore_path), ["auto", "default", "health"])
+        self.assertEqual(shard_for_file(os.path.join(self.data_path, "auto", "x.pdf"), self.data_path, mode="collection"), "auto")
+
+    def test_fan_out_search_merges_shards_and_respects_subsets(self):
+        """Test a query searches every shard unless restricted to a subset"""
+        # Arrange
+        self._update()
+        query = "Zero depreciation cover pays the full cost of replaced parts."
+
+        # Act
+        vectorstore = load_sharded_vector_store(self.embeddings, self.vectorstore_path)
+        everywhere = vectorstore.similarity_search(query, k=3)
+        health_only = vectorstore.select(["health"]).similarity_search(query, k=3)
+
+        # Assert
+        self.assertEqual(everywhere[0].page_content, query)
+        self.assertEqual(len(everywhere), 3)
+        self.assertEqual([doc.page_content for doc in health_only], ["Cashless hospitalisation is available at network hospitals."])
+
+    def test_rebuilding_one_shard_leaves_the_others_untouched(self):
+        """Test a shard can be rebuilt on its own"""
+        # Arrange
+        self._update()
+        auto_version = load_manifest(os.path.join(self.vectorstore_path, "shards", "auto"))["index_version"]
+        health_version = load_manifest(os.path.join(self.vectorstore_path, "shards", "health"))["index_version"]
+
+        # Act
+        self._update(shards=["health"], rebuild=True)
+
+        # Assert
+        self.assertEqual(load_manifest(os.path.join(self.vectorstore_path, "shards", "auto"))["index_version"], auto_version)
+        self.assertNotEqual(load_manifest(os.path.join(self.vectorstore_path, "shards", "health"))["index_version"], health_version)
+
+    def test_added_texts_are_routed_to_the_shard_of_their_source(self):
+        """Test add_texts() embeds into the source's shard, creating new shards as needed"""
+        # Arrange
+        vectorstore = self._update()
+        version = vectorstore.index_version
+        texts = ["Room rent is capped at one percent of the sum insured.", "Trip cancellation cover refunds prepaid bookings."]
+        sources = [os.path.join(self.data_path, "health", "room_rent.txt"), os.path.join(self.data_path, "travel", "trip.txt")]
+
+        # Act
+        ids = vectorstore.add_texts(texts, metadatas=[{"source": source} for source in sources])
+        health_hits = vectorstore.select(["health"]).similarity_search(texts[0], k=1)
+
+        # Assert
+        self.assertEqual(sorted(vectorstore.shards), ["auto", "default", "health", "travel"])
+        self.assertEqual(health_hits[0].page_content, texts[0])
+        self.assertEqual(vectorstore.docstore.search(ids[1]).page_content, texts[1])
+        self.assertNotEqual(vectorstore.index_version, version)
+
+    def test_memory_mapped_shards_reject_added_texts(self):
+        """Test adding to a memory-mapped shard fails cleanly instead of writing to a read-only index"""
+        # Arrange
+        self._update()
+        vectorstore = load_sharded_vector_store(self.embeddings, self.vectorstore_path, mmap=True, directory_path=self.data_path, mode="collection")
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            vectorstore.add_texts(["New rider."], metadatas=[{"source": os.path.join(self.data_path, "auto", "rider.txt")}])
+
+    def test_from_texts_builds_one_shard_per_collection(self):
+        """Test from_texts() groups chunks into shards the way indexing does"""
+        # Act
+        vectorstore = ShardedVectorStore.from_texts(
+            ["Cashless claims.", "Engine protection.", "Renewal reminders."],
+            self.embeddings,
+            metadatas=[{"source": os.path.join(self.data_path, name)} for name in ("health/a.txt", "auto/b.txt", "c.txt")],
+            directory_path=self.data_path,
+            mode="collection"
+        )
+
+        # Assert
+        self.assertEqual(sorted(vectorstore.shards), ["auto", "default", "health"])
+        self.assertEqual(vectorstore.select(["auto"]).similarity_search("Engine protection.", k=1)[0].page_content, "Engine protection.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Tests for the BM25 index and hybrid retrieval
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.documents import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from app.core.sparse_index import BM25Index, HybridRetriever, reciprocal_rank_fusion, tokenize
+from app.core.vector_store import build_sparse_index, create_vector_store, load_vector_store
+
+CHUNKS = [
+    "Policy POL-2023-0042 covers accidental damage to the insured vehicle.",
+    "The premium is payable monthly by direct debit.",
+    "Rider B extends hospital cover to dependants of the policy holder.",
+    "Claims must be filed within 30 days of the incident.",
+]
+
+class TestBM25Index(unittest.TestCase):
+    """Tests for the sparse inverted index"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_identifiers_are_single_terms(self):
+        """Test policy numbers and clause IDs are not split into fragments"""
+        # Act
+        terms = tokenize("See POL-2023-0042, clause 4.2.1.")
+
+        # Assert
+        self.assertIn("pol-2023-0042", terms)
+        self.assertIn("4.2.1", terms)
+
+    def test_exact_term_ranks_first_after_reload(self):
+        """Test a saved and memory-mapped index still ranks the exact-match chunk first"""
+        # Arrange
+        index = BM25Index.build(CHUNKS, ["a", "b", "c", "d"], index_version="v1")
+        index.save(self.tmp_dir)
+
+        # Act
+        loaded = BM25Index.load(self.tmp_dir)
+        results = loaded.search("what does pol-2023-0042 cover", k=2)
+
+        # Assert
+        self.assertEqual(loaded.index_version, "v1")
+        self.assertEqual(results[0][0], "a")
+        self.assertEqual(results, index.search("what does pol-2023-0042 cover", k=2))
+
+    def test_vocabulary_is_memory_mapped_after_reload(self):
+        """Test the vocabulary and chunk IDs are read from memory-mapped arrays, not parsed JSON"""
+        # Arrange
+        BM25Index.build(CHUNKS, ["a", "b", "c", "d"]).save(self.tmp_dir)
+
+        # Act
+        loaded = BM25Index.load(self.tmp_dir)
+
+        # Assert
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, "terms.json")))
+        self.assertIsInstance(loaded.terms.data, np.memmap)
+        self.assertIsInstance(loaded.doc_ids.data, np.memmap)
+        self.assertEqual([loaded.doc_ids[i] for i in range(len(loaded.doc_ids))], ["a", "b", "c", "d"])
+        self.assertEqual(loaded.search("unknownterm"), [])
+        self.assertEqual(loaded.search("rider dependants", k=1)[0][0], "c")
+
+    def test_index_with_json_vocabulary_still_loads(self):
+        """Test an index saved with terms.json is still searchable until it is rebuilt"""
+        # Arrange
+        index = BM25Index.build(CHUNKS, ["a", "b", "c", "d"])
+        index.save(self.tmp_dir)
+        vocab = {index.terms[i]: int(index.term_ids[i]) for i in range(len(index.terms))}
+        with open(os.path.join(self.tmp_dir, "terms.json"), "w", encoding="utf-8") as f:
+            json.dump({"vocab": vocab, "doc_ids": ["a", "b", "c", "d"]}, f)
+
+        # Act
+        loaded = BM25Index.load(self.tmp_dir)
+
+        # Assert
+        self.assertEqual(loaded.search("premium debit"), index.search("premium debit"))
+
+    def test_reciprocal_rank_fusion_rewards_agreement(self):
+        """Test an ID ranked well by both retrievers beats one ranked first by only one"""
+        # Act
+        fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "w", "x"]])
+
+        # Assert
+        self.assertEqual(fused[0], "y")
+
+class TestHybridRetrieval(unittest.TestCase):
+    """Tests for the BM25 index persisted with the FAISS index"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.vectorstore_path = os.path.join(self.tmp_dir, "db_faiss")
+        self.embeddings = DeterministicFakeEmbedding(size=16)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_hybrid_retriever_finds_exact_policy_number(self):
+        """Test the loaded store gets a hybrid retriever that surfaces the keyword match"""
+        # Arrange
+        docs = [Document(page_content=text, metadata={"source": f"doc{i}.txt"}) for i, text in enumerate(CHUNKS)]
+        create_vector_store(docs, self.embeddings, vectorstore_path=self.vectorstore_path)
+
+        # Act
+        vectorstore = load_vector_store(self.embeddings, self.vectorstore_path)
+        retriever = HybridRetriever(vectorstore=vectorstore, sparse_index=vectorstore.sparse_index, k=2, fetch_k=2)
+        results = retriever.invoke("POL-2023-0042")
+
+        # Assert
+        self.assertEqual(vectorstore.sparse_index.index_version, vectorstore.index_version)
+        self.assertIn(CHUNKS[0], [doc.page_content for doc in results])
+
+    def test_sparse_index_is_built_from_streamed_batches(self):
+        """Test the BM25 index is built from the docstore file in batches without loading every chunk"""
+        # Arrange
+        docs = [Document(page_content=text, metadata={"source": f"doc{i}.txt"}) for i, text in enumerate(CHUNKS)]
+        vectorstore = create_vector_store(docs, self.embeddings, vectorstore_path=self.vectorstore_path)
+        doc_ids = list(vectorstore.index_to_docstore_id.values())
+        expected = BM25Index.build([vectorstore.docstore.search(doc_id).page_content for doc_id in doc_ids], doc_ids)
+
+        # Act
+        with patch('app.core.docstore.SQLiteDocstore.mget', side_effect=AssertionError("corpus loaded at once")):
+            sparse_index = build_sparse_index(vectorstore, self.vectorstore_path, batch_size=3)
+
+        # Assert
+        self.assertEqual([sparse_index.doc_ids[i] for i in range(len(sparse_index.doc_ids))], doc_ids)
+        for query in ("POL-2023-0042", "hospital cover dependants", "monthly premium"):
+            self.assertEqual(sparse_index.search(query), expected.search(query))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Tests for the frame-rate-capped stream renderer
+"""
+
+import unittest
+import sys
+import os
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.ui.streaming import StreamRenderer
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestStreamRenderer(unittest.TestCase):
+    """Tests for chunk coalescing"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.frames = []
+        self.renderer = StreamRenderer(self.frames.append, max_fps=10, clock=self.clock)
+
+    def write(self, chunk, at):
+        self.clock.now = at
+        self.renderer.write(chunk)
+
+    def test_chunks_within_a_frame_are_coalesced(self):
+        # Arrange / Act
+        self.write("The", 0.0)
+        self.write(" policy", 0.01)
+        self.write(" covers", 0.02)
+        self.write(" theft", 0.11)
+
+        # Assert
+        self.assertEqual(self.frames, ["The▌", "The policy covers theft▌"])
+
+    def test_sentence_end_renders_after_half_a_frame(self):
+        # Arrange / Act
+        self.write("Yes", 0.0)
+        self.write(" it does.", 0.06)
+
+        # Assert
+        self.assertEqual(self.frames[-1], "Yes it does.▌")
+
+    def test_close_renders_pending_text_without_cursor(self):
+        # Arrange
+        self.write("Claims", 0.0)
+        self.write(" within 30 days", 0.01)
+
+        # Act
+        answer = self.renderer.close()
+
+        # Assert
+        self.assertEqual(answer, "Claims within 30 days")
+        self.assertEqual(self.frames[-1], "Claims within 30 days")
+        self.assertEqual(self.renderer.frames, 2)
+
+    def test_tokens_per_second(self):
+        # Arrange / Act
+        for i in range(11):
+            self.write("x", 1.0 + i * 0.1)
+
+        # Assert
+        self.assertAlmostEqual(self.renderer.tokens_per_second(), 10.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+"""
+Tests for the vector store
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add the project root to the Python path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.embeddings import Embeddings
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from app.core.local_embeddings import HashingEmbeddings
+from app.core import vector_store
+from app.core.vector_store import update_vector_store, load_manifest, load_vector_store
+
+class RecordingEmbeddings(Embeddings):
+    """Deterministic fake embeddings that remember which texts were embedded"""
+    
+    def __init__(self):
+        self.fake = DeterministicFakeEmbedding(size=16)
+        self.embedded_texts = []
+    
+    def embed_documents(self, texts):
+        self.embedded_texts.extend(texts)
+        return self.fake.embed_documents(texts)
+    
+    def embed_query(self, text):
+        return self.fake.embed_query(text)
+
+class InterruptedEmbeddings(RecordingEmbeddings):
+    """Fake embeddings that fail once a number of texts have been embedded"""
+    
+    def __init__(self, fail_after):
+        super().__init__()
+        self.fail_after = fail_after
+    
+    def embed_documents(self, texts):
+        if len(self.embedded_texts) + len(texts) > self.fail_after:
+            raise RuntimeError("Simulated crash during indexing")
+        return super().embed_documents(texts)
+
+class TestIncrementalIndexing(unittest.TestCase):
+    """Tests for manifest-driven incremental re-indexing"""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.tmp_dir, "data")
+        self.vectorstore_path = os.path.join(self.tmp_dir, "vectorstore", "db_faiss")
+        os.makedirs(self.data_path)
+        self.embeddings = RecordingEmbeddings()
+        for name in ("a", "b", "c"):
+            self._write(name, " ".join(f"Policy {name} clause {i} text." for i in range(100)))
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+    
+    def _write(self, name, text):
+        with open(os.path.join(self.data_path, f"{name}.txt"), "w") as f:
+            f.write(text)
+    
+    def _update(self, embeddings=None, **kwargs):
+        return update_vector_store(embeddings or self.embeddings, self.data_path, self.vectorstore_path, **kwargs)
+    
+    def test_unchanged_corpus_is_not_reembedded(self):
+        """Test a second run with no file changes embeds nothing"""
+        # Arrange
+        first = self._update()
+        self.embeddings.embedded_texts.clear()
+        
+        # Act
+        second = self._update()
+        
+        # Assert
+        self.assertEqual(self.embeddings.embedded_texts, [])
+        self.assertEqual(first.index.ntotal, second.index.ntotal)
+    
+    def test_changed_and_removed_files_are_reindexed(self):
+        """Test only changed files are embedded and removed files lose their vectors"""
+        # Arrange
+        self._update()
+        os.remove(os.path.join(self.data_path, "a.txt"))
+        self._write("b", "Rewritten rider wording.")
+        self.embeddings.embedded_texts.clear()
+        
+        # Act
+        vectorstore = self._update()
+        
+        # Assert
+        self.assertEqual(self.embeddings.embedded_texts, ["Rewritten rider wording."])
+        manifest = load_manifest(self.vectorstore_path)
+        indexed_ids = set(vectorstore.index_to_docstore_id.values())
+        expected_ids = {chunk_id for entry in manifest["files"].values() for chunk_id in entry["chunk_ids"]}
+        self.assertEqual(indexed_ids, expected_ids)
+        self.assertEqual(sorted(os.path.basename(path) for path in manifest["files"]), ["b.txt", "c.txt"])
+
+    def test_interrupted_build_resumes_from_checkpoint(self):
+        """Test a crashed run keeps its checkpoint and the next run only embeds the remaining chunks"""
+        # Arrange
+        full = self._update(RecordingEmbeddings())
+        total_chunks = full.index.ntotal
+        shutil.rmtree(self.vectorstore_path)
+        crashing = InterruptedEmbeddings(fail_after=total_chunks // 2)
+        
+        # Act
+        interrupted = self._update(crashing, batch_size=2, checkpoint_every=2)
+        resumed = self._update(batch_size=2, checkpoint_every=2)
+        
+        # Assert
+        self.assertIsNone(interrupted)
+        self.assertGreater(len(crashing.embedded_texts), 0)
+        self.assertLess(len(self.embeddings.embedded_texts), total_chunks)
+        self.assertEqual(resumed.index.ntotal, total_chunks)
+        manifest = load_manifest(self.vectorstore_path)
+        self.assertEqual(len(manifest["files"]), 3)
+        expected_ids = {chunk_id for entry in manifest["files"].values() for chunk_id in entry["chunk_ids"]}
+        self.assertEqual(set(resumed.index_to_docstore_id.values()), expected_ids)
+
+    def test_checkpoints_are_spaced_as_the_index_grows(self):
+        """Test checkpoints wait for the index to grow by a fraction of its size, not a fixed chunk count"""
+        # Arrange
+        save = vector_store._save_vector_store
+        
+        # Act
+        with patch('app.core.vector_store._save_vector_store', wraps=save) as fixed:
+            self._update(batch_size=2, checkpoint_every=1, checkpoint_growth=0)
+        shutil.rmtree(self.vectorstore_path)
+        with patch('app.core.vector_store._save_vector_store', wraps=save) as growing:
+            self._update(batch_size=2, checkpoint_every=1, checkpoint_growth=1)
+        
+        # Assert
+        self.assertEqual(fixed.call_count, 4)
+        self.assertEqual(growing.call_count, 2)
+
+    def test_index_is_not_loaded_with_another_embedding_backend(self):
+        """Test the manifest records the embedding backend and a mismatching model is rejected at load"""
+        # Arrange
+        self._update(HashingEmbeddings(dim=16))
+        
+        # Act
+        same = load_vector_store(HashingEmbeddings(dim=16), self.vectorstore_path)
+        other = load_vector_store(HashingEmbeddings(dim=16, seed=1), self.vectorstore_path)
+        
+        # Assert
+        self.assertEqual(load_manifest(self.vectorstore_path)["embedding_backend"], HashingEmbeddings(dim=16).backend)
+        self.assertIsNotNone(same)
+        self.assertIsNone(other)
+
+    def test_shared_boilerplate_is_indexed_once_with_every_source(self):
+        """Test a chunk repeated across files is embedded once and kept until no file contains it"""
+        # Arrange
+        rider = "Standard rider: the insurer is not liable for losses caused by war, nuclear risks or wilful misconduct."
+        self._write("a", rider)
+        self._write("b", rider)
+        
+        # Act
+        vectorstore = self._update()
+        chunk_ids = {key: entry["chunk_ids"] for key, entry in load_manifest(self.vectorstore_path)["files"].items()}
+        shared = vectorstore.docstore.search(chunk_ids[os.path.join(self.data_path, "a.txt")][0])
+        os.remove(os.path.join(self.data_path, "a.txt"))
+        after_removal = self._update()
+        remaining = after_removal.docstore.search(chunk_ids[os.path.join(self.data_path, "b.txt")][0])
+        
+        # Assert
+        self.assertEqual(self.embeddings.embedded_texts.count(rider), 1)
+        self.assertEqual(chunk_ids[os.path.join(self.data_path, "a.txt")], chunk_ids[os.path.join(self.data_path, "b.txt")])
+        self.assertEqual(sorted(os.path.basename(ref["source"]) for ref in shared.metadata["sources"]), ["a.txt", "b.txt"])
+        self.assertEqual(remaining.page_content, rider)
+        self.assertEqual([os.path.basename(ref["source"]) for ref in remaining.metadata["sources"]], ["b.txt"])
+        self.assertEqual(os.path.basename(remaining.metadata["source"]), "b.txt")
+
+if __name__ == '__main__':
+    unittest.main()